@@ -0,0 +1,36 @@
+# Arabic normalization shared by the loaders (normalized shadow columns) and
+# the API (search queries). One str.translate pass, no regex chains.
+
+_TABLE = {}
+
+# harakat (fathatan .. sukun), superscript alef, tatweel -> removed
+for cp in range(0x064B, 0x0653):
+    _TABLE[cp] = None
+_TABLE[0x0670] = None
+_TABLE[0x0640] = None
+
+# alef variants -> bare alef
+for ch in "أإآٱ":
+    _TABLE[ord(ch)] = "ا"
+
+# alef maqsura -> yaa, taa marbuta -> haa
+_TABLE[ord("ى")] = "ي"
+_TABLE[ord("ة")] = "ه"
+
+# Arabic-Indic and Eastern Arabic-Indic digits -> ASCII
+for d in range(10):
+    _TABLE[0x0660 + d] = str(d)
+    _TABLE[0x06F0 + d] = str(d)
+
+# Latin case folding (reference numbers, mixed-language titles)
+for cp in range(ord("A"), ord("Z") + 1):
+    _TABLE[cp] = chr(cp + 32)
+
+
+def normalize_ar(s: str | None) -> str | None:
+    """
+    Fold a string for matching: إعتبارا -> اعتبارا, النهائى -> النهائي, المحكمة -> المحكمه.
+    """
+    if s is None:
+        return None
+    return s.translate(_TABLE)
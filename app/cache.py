@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+
+
+class PayloadCache:
+    """
+    Bounded LRU of serialized payloads, keyed by (collection, id) and tagged
+    with the row version they were built from.
+
+    An entry is only served while its version matches the one in the database,
+    so a loader UPDATE (which bumps the rowversion) invalidates it across processes.
+    """
+
+    def __init__(self, max_items: int = 2000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()     # key -> (version, body)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version) -> bytes | None:
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._items[key] = (version, body)
+            self._bytes += len(body)
+            while len(self._items) > self.max_items or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def invalidate(self, key):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
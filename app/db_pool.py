@@ -0,0 +1,211 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection could be borrowed within the acquire timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of DB-API connections (used with pyodbc).
+
+    - at most `max_size` connections exist at any time (idle + in use)
+    - idle connections older than `max_idle_seconds` are closed and replaced
+    - every borrowed connection is health-checked with a cheap query first
+    """
+
+    def __init__(self, factory, max_size: int = 10, min_size: int = 0,
+                 max_idle_seconds: float = 300, acquire_timeout: float = 30,
+                 ping_sql: str = "SELECT 1"):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self._factory = factory
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.max_idle_seconds = max_idle_seconds
+        self.acquire_timeout = acquire_timeout
+        self.ping_sql = ping_sql
+
+        self._lock = threading.Condition()
+        self._idle = deque()        # (conn, last_used) - most recent on the right
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._closed_count = 0
+        self._failed_checks = 0
+        self._closed = True
+
+    # ------------------------- lifecycle -------------------------
+
+    def open(self):
+        with self._lock:
+            self._closed = False
+        # warm up the minimum number of connections outside the lock
+        for _ in range(self.min_size):
+            conn = self._new_connection()
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._closed_count += len(idle)
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    # ------------------------- borrow / return -------------------------
+
+    def acquire(self, timeout: float | None = None):
+        """
+        Borrow a healthy connection. Blocks while the pool is exhausted.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn, last_used = self._reserve(deadline)
+            if conn is None:
+                # a slot was reserved for a fresh connection
+                try:
+                    return self._new_connection()
+                except Exception:
+                    self._unreserve()
+                    raise
+
+            if time.monotonic() - last_used > self.max_idle_seconds:
+                self._discard(conn)
+                continue
+
+            if self._healthy(conn):
+                return conn
+
+            with self._lock:
+                self._failed_checks += 1
+            self._discard(conn)
+
+    def release(self, conn, discard: bool = False):
+        """
+        Return a borrowed connection. Broken connections should be discarded.
+        """
+        if not discard:
+            try:
+                # never hand an open transaction to the next borrower
+                conn.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+            if self._closed:
+                self._closed_count += 1
+                close_it = True
+            else:
+                self._idle.append((conn, time.monotonic()))
+                close_it = False
+            self._lock.notify()
+        if close_it:
+            self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout: float | None = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except Exception:
+            self.release(conn, discard=self._is_broken(conn))
+            raise
+        else:
+            self.release(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "size": self._in_use + len(self._idle),
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "created": self._created,
+                "closed": self._closed_count,
+                "failed_health_checks": self._failed_checks,
+            }
+
+    # ------------------------- internals -------------------------
+
+    def _reserve(self, deadline: float):
+        """
+        Take an idle connection, or reserve a slot for a new one (returns (None, None)).
+        """
+        with self._lock:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("connection pool is closed")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        self._in_use += 1
+                        return conn, last_used
+                    if self._in_use < self.max_size:
+                        self._in_use += 1
+                        return None, None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"no connection available within pool of {self.max_size}")
+                    self._lock.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def _unreserve(self):
+        with self._lock:
+            self._in_use -= 1
+            self._lock.notify()
+
+    def _new_connection(self):
+        conn = self._factory()
+        with self._lock:
+            self._created += 1
+        return conn
+
+    def _discard(self, conn):
+        with self._lock:
+            self._in_use -= 1
+            self._closed_count += 1
+            self._lock.notify()
+        self._close_quietly(conn)
+
+    def _healthy(self, conn) -> bool:
+        try:
+            cur = conn.cursor()
+            cur.execute(self.ping_sql).fetchone()
+            cur.close()
+            return True
+        except Exception:
+            return False
+
+    def _is_broken(self, conn) -> bool:
+        try:
+            conn.rollback()
+            return not self._healthy(conn)
+        except Exception:
+            return True
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -1,52 +1,240 @@
+import io
+import os
+import hashlib
+from itertools import islice
 from zipfile import ZipFile
 import xml.etree.ElementTree as ET
 
+from app import profiling
+
 W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 NS = {"w": W_NS}
 
+_P = f"{{{W_NS}}}p"
+_T = f"{{{W_NS}}}t"
+_BODY = f"{{{W_NS}}}body"
 
-def docx_paragraphs(path: str) -> list[str]:
+
+def iter_docx_paragraphs(path):
     """
-    Extract paragraphs (roughly) from a .docx without external libs.
+    Stream paragraphs from a .docx (a path or a binary file object) without
+    building the whole XML tree.
+
+    Parses word/document.xml incrementally straight from the zip member and
+    drops each paragraph from <w:body> once read, so memory stays bounded by
+    the largest paragraph (or table), not by the document.
+    Yields the same paragraphs, in the same order, as docx_paragraphs().
     """
     with ZipFile(path) as z:
-        xml = z.read("word/document.xml")
+        with z.open(_DOCUMENT) as member:
+            watch = _TextBoxWatch(member)
+            yielded = 0
+            for para in _flat_paragraphs(_timed(watch), watch):
+                yield para
+                yielded += 1
+            if not watch.seen:
+                return
+        # a text box nests paragraphs inside a paragraph: parse again, tracking
+        # the nesting, and continue after what the flat pass already yielded
+        with z.open(_DOCUMENT) as member:
+            yield from islice(_nested_paragraphs(_timed(member)), yielded, None)
+
+
+_DOCUMENT = "word/document.xml"
+
+
+def _timed(xml):
+    return profiling.TimedReader(xml, "inflate") if profiling.active is not None else xml
+
+
+class _TextBoxWatch(io.RawIOBase):
+    """
+    Reader that flags the first text box (<w:txbxContent>) in the bytes it passes on.
+    The parser reads ahead of the events it reports, so the flag is set before
+    any event from inside the text box is seen.
+    """
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.seen = False
+        self._tail = b""
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        data = self.raw.read(n)
+        if not self.seen:
+            # keep a few bytes so a tag split across two reads is still found
+            self.seen = b"txbxContent" in self._tail + data
+            self._tail = data[-16:]
+        return data
+
+
+def _flat_paragraphs(xml, watch: _TextBoxWatch):
+    # no paragraph nests in another until a text box shows up, so each <w:p> is
+    # complete at its end event; stop as soon as one does
+    events = ET.iterparse(xml, events=("start", "end"))
+    body = None
+    for _, elem in events:
+        if elem.tag == _BODY:
+            body = elem
+            break
+        if elem.tag == _P:
+            # no <w:body> around the paragraphs: let the nested pass do it
+            watch.seen = True
+            return
+    for event, elem in events:
+        if elem.tag == _P and event == "end":
+            if watch.seen:
+                return
+            para_text = "".join([t.text for t in elem.iter(_T) if t.text]).strip()
+            # drop everything built so far; a table still open keeps filling
+            # its (now detached) element until it ends and is freed
+            body.clear()
+            if para_text:
+                yield para_text
+
+
+def _nested_paragraphs(xml):
+    # start and end events: tracks open paragraphs, for text boxes
+    body = None
+    depth = 0
+    # one entry per open <w:p>: [text parts, finished nested paragraphs]
+    open_paras = []
+
+    for event, elem in ET.iterparse(xml, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if elem.tag == _P:
+                open_paras.append([[], []])
+            elif elem.tag == _BODY:
+                body = elem
+            continue
+
+        depth -= 1
+        if elem.tag == _T:
+            if elem.text:
+                # a paragraph's text includes any nested paragraph (text boxes)
+                for texts, _ in open_paras:
+                    texts.append(elem.text)
+        elif elem.tag == _P:
+            texts, nested = open_paras.pop()
+            para_text = "".join(texts).strip()
+            done = ([para_text] if para_text else []) + nested
+            if open_paras:
+                # outer paragraph comes first, as in a document-order walk
+                open_paras[-1][1].extend(done)
+            else:
+                yield from done
+
+        if body is not None and depth == 2:
+            # finished a direct child of <w:body>; drop what was built so far
+            body.clear()
+
+
+def detect_doc_type(first_paragraph: str) -> str:
+    """
+    Guess law / judgment / fatwa from a document's first paragraph.
+    """
+    # the title line is dash-separated: "جمهورية مصر العربية - قانون - رقم 1 ...",
+    # "... - محكمة النقض - مدني"; a law title may name a court after بشأن,
+    # so the law marker goes first and a court only counts as its own segment
+    segments = [s.strip() for s in first_paragraph.split("-")]
+    if "قانون" in segments:
+        return "law"
+    if "الفتوى" in first_paragraph:
+        return "fatwa"
+    if "الطعن" in first_paragraph or any(s.startswith("محكمة") for s in segments):
+        return "judgment"
+    if "قانون" in first_paragraph:
+        return "law"
+    return "unknown"
+
+
+class DocxDocument:
+    """
+    One .docx read from disk exactly once.
+
+    The raw bytes serve both the content hash and the paragraph stream, so
+    hashing and parsing a file costs a single read (which matters on a network
+    share). Paragraphs are still parsed lazily, from memory.
+
+        doc = DocxDocument(path)
+        doc.sha256, doc.doc_type, list(doc.paragraphs())
+    """
+
+    __slots__ = ("path", "name", "data", "_sha256", "_first")
+
+    def __init__(self, path: str, data: bytes | None = None):
+        self.path = path
+        self.name = os.path.basename(path)
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        self.data = data
+        self._sha256 = None
+        self._first = None
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    def paragraphs(self):
+        """
+        A fresh lazy paragraph iterator (same output as iter_docx_paragraphs).
+        """
+        paras = iter_docx_paragraphs(io.BytesIO(self.data))
+        if profiling.active is not None:
+            paras = profiling.timed_iter(paras, "xml")
+        return paras
 
-    root = ET.fromstring(xml)
+    @property
+    def first_paragraph(self) -> str:
+        # only the XML up to the first paragraph is parsed
+        if self._first is None:
+            paras = iter_docx_paragraphs(io.BytesIO(self.data))
+            self._first = next(paras, "")
+            paras.close()
+        return self._first
 
-    paras = []
-    for p in root.findall(".//w:p", NS):
-        texts = []
-        for t in p.findall(".//w:t", NS):
-            if t.text:
-                texts.append(t.text)
-        para_text = "".join(texts).strip()
-        if para_text:
-            paras.append(para_text)
-    return paras
+    @property
+    def doc_type(self) -> str:
+        return detect_doc_type(self.first_paragraph)
+
+
+def as_document(source) -> DocxDocument:
+    """
+    Accept a DocxDocument or a path (what the parsers take).
+    """
+    return source if isinstance(source, DocxDocument) else DocxDocument(source)
+
+
+def docx_paragraphs(path: str) -> list[str]:
+    """
+    Extract paragraphs (roughly) from a .docx without external libs.
+    """
+    return list(iter_docx_paragraphs(path))
 
 
 def docx_text(path: str) -> str:
     """
     Extract all text from the .docx file, returns it as a single string.
     """
-    return "\n".join(docx_paragraphs(path))
+    return "\n".join(iter_docx_paragraphs(path))
 
 
 def extract_text_for_all(path: str):
     """
     A unified function that extracts text for law, judgment, and fatwa documents.
     """
-    paragraphs = docx_paragraphs(path)
-
-    # Define the type based on the first few lines or headings (example approach)
-    first_paragraph = paragraphs[0] if paragraphs else ""
-
-    if "قانون" in first_paragraph:
-        return "Law Document", paragraphs
-    elif "الطعن" in first_paragraph:
-        return "Judgment Document", paragraphs
-    elif "الفتوى" in first_paragraph:
-        return "Fatwa Document", paragraphs
-    else:
-        return "Unknown Document Type", paragraphs
+    doc = as_document(path)
+    labels = {"law": "Law Document", "judgment": "Judgment Document", "fatwa": "Fatwa Document"}
+    # the type comes from the first paragraph alone; the full text is read after
+    return labels.get(doc.doc_type, "Unknown Document Type"), list(doc.paragraphs())
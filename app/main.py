@@ -1,6 +1,25 @@
 import os
+import hmac
+import json
+import math
+import asyncio
+import logging
+import threading
+from typing import Literal
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from contextlib import contextmanager, asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 import pyodbc
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, Header, HTTPException
+from fastapi.responses import Response, StreamingResponse
+
+from app.cache import PayloadCache
+from app.db_pool import ConnectionPool, PoolTimeout
+from app.search import COLLECTIONS, build_index, refresh_index
+from app.pagination import CursorError, encode_cursor, decode_cursor, keyset_query, rank_page
 
 
 DB_SERVER = os.getenv("DB_SERVER", r"MAHOZZ\SQLEXPRESS")
@@ -8,7 +27,39 @@ DB_NAME = os.getenv("DB_NAME", "model")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 
-
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "15"))
+
+# Blocking pyodbc work runs on dedicated executors ("lanes"), not Starlette's
+# shared threadpool. Slow list/search queries and fast detail lookups get
+# separate lanes so one cannot starve the other.
+DB_LIST_WORKERS = int(os.getenv("DB_LIST_WORKERS", "4"))
+DB_DETAIL_WORKERS = int(os.getenv("DB_DETAIL_WORKERS", "6"))
+DB_LIST_TIMEOUT = float(os.getenv("DB_LIST_TIMEOUT", "10"))
+DB_DETAIL_TIMEOUT = float(os.getenv("DB_DETAIL_TIMEOUT", "5"))
+DB_EXPORT_WORKERS = int(os.getenv("DB_EXPORT_WORKERS", "2"))
+DB_EXPORT_TIMEOUT = float(os.getenv("DB_EXPORT_TIMEOUT", "60"))   # per batch
+
+# every lane thread may hold a connection at once, plus one for the search index
+# build/refresh (timer or /search/reindex, one at a time);
+# a smaller pool would make lane work wait in pool.acquire past the lane timeout
+DB_LANE_WORKERS = DB_LIST_WORKERS + DB_DETAIL_WORKERS + DB_EXPORT_WORKERS
+DB_POOL_SIZE = max(int(os.getenv("DB_POOL_SIZE", "0")), DB_LANE_WORKERS + 1)
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", "200"))
+
+DETAIL_CACHE_ITEMS = int(os.getenv("DETAIL_CACHE_ITEMS", "2000"))
+DETAIL_CACHE_MB = int(os.getenv("DETAIL_CACHE_MB", "64"))
+
+SEARCH_LIMIT = int(os.getenv("SEARCH_LIMIT", "1000"))
+SEARCH_CACHE_ITEMS = int(os.getenv("SEARCH_CACHE_ITEMS", "256"))
+# seconds between incremental search index refreshes; 0 turns the timer off
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "60"))
+# POST /search/reindex needs this in X-Admin-Token; unset, the endpoint is off
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+PAGE_MAX = 500
+
+log = logging.getLogger(__name__)
 
 
 def connect():
@@ -25,7 +76,254 @@ def connect():
     return pyodbc.connect(conn_str)
 
 
-app = FastAPI(title="SynQanun API")
+pool = ConnectionPool(
+    connect,
+    max_size=DB_POOL_SIZE,
+    min_size=DB_POOL_MIN,
+    max_idle_seconds=DB_POOL_MAX_IDLE,
+    acquire_timeout=DB_POOL_TIMEOUT,
+)
+
+db_lanes = {
+    "list": (ThreadPoolExecutor(DB_LIST_WORKERS, thread_name_prefix="db-list"), DB_LIST_TIMEOUT),
+    "detail": (ThreadPoolExecutor(DB_DETAIL_WORKERS, thread_name_prefix="db-detail"), DB_DETAIL_TIMEOUT),
+    "export": (ThreadPoolExecutor(DB_EXPORT_WORKERS, thread_name_prefix="db-export"), DB_EXPORT_TIMEOUT),
+}
+
+# collection -> SearchIndex, built from the database and refreshed from row_version
+search_indexes = {}
+# one build or refresh at a time, whoever starts it (timer or /search/reindex)
+search_refresh_lock = threading.Lock()
+
+# serialized detail documents, keyed by (collection, id) and tagged with the ETag
+detail_cache = PayloadCache(DETAIL_CACHE_ITEMS, DETAIL_CACHE_MB * 1024 * 1024)
+
+
+def build_search_indexes():
+    with search_refresh_lock, pool.connection() as conn:
+        cur = conn.cursor()
+        fresh = {name: build_index(cur, name) for name in COLLECTIONS}
+        # swap in one step so readers never see a half-built index
+        search_indexes.update(fresh)
+    # results are keyed by index, so this only frees the ones of the old indexes
+    _search.cache_clear()
+
+
+def refresh_search_indexes() -> dict:
+    """
+    Re-index the rows written since the last build or refresh; a collection
+    without an index yet (the database was down at startup) is built.
+    Returns collection -> rows re-indexed.
+    """
+    changed = {}
+    with search_refresh_lock, pool.connection() as conn:
+        cur = conn.cursor()
+        for name in COLLECTIONS:
+            index = search_indexes.get(name)
+            if index is None:
+                search_indexes[name] = index = build_index(cur, name)
+                changed[name] = len(index)
+            else:
+                changed[name] = refresh_index(cur, name, index)
+    return changed
+
+
+async def refresh_search_periodically():
+    while True:
+        await asyncio.sleep(SEARCH_REFRESH_SECONDS)
+        try:
+            await asyncio.to_thread(refresh_search_indexes)
+        except Exception:
+            log.exception("search index refresh failed; retrying in %ss", SEARCH_REFRESH_SECONDS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # the API still starts when the database is down: search answers 503
+    # until the refresh timer (or /search/reindex) manages to build the index
+    try:
+        await asyncio.to_thread(pool.open)
+        await asyncio.to_thread(build_search_indexes)
+    except Exception:
+        log.exception("search indexes not built at startup")
+    refresher = None
+    if SEARCH_REFRESH_SECONDS > 0:
+        refresher = asyncio.create_task(refresh_search_periodically())
+
+    yield
+
+    if refresher is not None:
+        refresher.cancel()
+    for executor, _ in db_lanes.values():
+        executor.shutdown(wait=True, cancel_futures=True)
+    pool.close()
+
+
+app = FastAPI(title="SynQanun API", lifespan=lifespan)
+
+
+@contextmanager
+def db():
+    """
+    Borrow a pooled connection; an exhausted pool answers 503 instead of hanging.
+    Connections that raised a driver error are discarded instead of reused.
+    """
+    try:
+        conn = pool.acquire()
+    except PoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, try again")
+
+    try:
+        yield conn
+    except pyodbc.Error:
+        pool.release(conn, discard=True)
+        raise
+    except BaseException:
+        pool.release(conn)
+        raise
+    else:
+        pool.release(conn)
+
+
+async def run_db(work, lane: str = "detail"):
+    """
+    Run work(cursor) on the lane's executor with a pooled connection.
+
+    The lane timeout covers queueing + execution. When it expires, or the client
+    disconnects and the request task is cancelled, the running statement is
+    aborted with cursor.cancel() so the worker thread and connection come back.
+    """
+    executor, timeout = db_lanes[lane]
+    state = {"cursor": None, "cancelled": False}
+
+    def job():
+        if state["cancelled"]:
+            return None
+        with db() as conn:
+            # server-side safety net in case the client-side cancel is lost
+            conn.timeout = max(1, math.ceil(timeout))
+            cur = conn.cursor()
+            state["cursor"] = cur
+            return work(cur)
+
+    def cancel():
+        state["cancelled"] = True
+        cur = state["cursor"]
+        if cur is not None:
+            try:
+                cur.cancel()
+            except pyodbc.Error:
+                pass
+
+    future = asyncio.get_running_loop().run_in_executor(executor, job)
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        cancel()
+        raise HTTPException(status_code=504, detail="Database query timed out")
+    except asyncio.CancelledError:
+        cancel()
+        raise
+
+
+@lru_cache(maxsize=SEARCH_CACHE_ITEMS)
+def _search(index, version: int, q: str) -> list[tuple[int, float]]:
+    # keyed by index.version, so a refresh that changed the index misses the cache;
+    # one extra hit tells whether SEARCH_LIMIT cut the results
+    return index.search(q, limit=SEARCH_LIMIT + 1)
+
+
+def ranked_ids(collection: str, q: str) -> tuple[list[tuple[int, float]], bool]:
+    """
+    The relevance list for q, capped at SEARCH_LIMIT, and whether the cap cut it.
+    Ranked once per (index, q): later pages of the same query reuse the list.
+    """
+    index = search_indexes.get(collection)
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search index is not ready")
+    hits = _search(index, index.version, q)
+    return hits[:SEARCH_LIMIT], len(hits) > SEARCH_LIMIT
+
+
+def in_rank_order(rows, ranked):
+    """
+    Re-apply the relevance order to rows fetched with WHERE id IN (...).
+    """
+    pos = {doc_id: i for i, (doc_id, _) in enumerate(ranked)}
+    return sorted(rows, key=lambda r: pos[r[0]])
+
+
+# collection -> (table, id column, date column, list columns)
+# the id is always column 0; the date column is part of the list columns
+LISTS = {
+    "judgments": ("dbo.Judgment", "judgment_id", "session_date",
+                  "judgment_id, reference_number, appeal_number, judicial_year, "
+                  "session_date, court_name, case_type"),
+    "fatwas": ("dbo.Fatwa", "fatwa_id", "issued_date",
+               "fatwa_id, fatwa_number, fatwa_year, issued_date, session_date, "
+               "subject, authority, file_number"),
+    "laws": ("dbo.Law", "law_id", "issue_date",
+             "law_id, law_year, issue_date, publication_date, effective_date, title, gazette_reference"),
+}
+
+
+async def list_page(collection: str, q: str | None, order: str, after: str | None, limit: int):
+    """
+    One page of a list endpoint using keyset (cursor) pagination.
+
+    Without q, pages walk (id) or (date, id) newest first with an index seek.
+    With q, pages walk the relevance list from the full-text index. It is
+    ranked off the list lane, before a connection is borrowed, and only the
+    page's ids are fetched. Returns (rows, scores, next_cursor, truncated);
+    truncated is True when SEARCH_LIMIT cut the relevance list.
+    """
+    table, id_col, date_col, cols = LISTS[collection]
+    cursor_order = "rank" if q else order
+    try:
+        key = decode_cursor(after, cursor_order) if after else None
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    date_pos = [c.strip() for c in cols.split(",")].index(date_col)
+    page = []
+    truncated = False
+    if q:
+        ranked, truncated = await asyncio.to_thread(ranked_ids, collection, q)
+        page = rank_page(ranked, key, limit)
+        if not page:
+            return [], {}, None, truncated
+
+    def work(cur):
+        if q:
+            hits = page[:limit]
+            marks = ", ".join("?" * len(hits))
+            rows = cur.execute(
+                f"SELECT {cols} FROM {table} WHERE {id_col} IN ({marks})",
+                *[doc_id for doc_id, _ in hits]
+            ).fetchall()
+            return in_rank_order(rows, hits)
+
+        sql, params = keyset_query(table, cols, id_col, date_col, order, key, limit)
+        return cur.execute(sql, *params).fetchall()
+
+    rows = await run_db(work, lane="list")
+    scores = dict(page)
+
+    next_cursor = None
+    if q:
+        if len(page) > limit:
+            last_id, last_score = page[limit - 1]
+            next_cursor = encode_cursor("rank", [last_score, last_id])
+    elif len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if order == "date":
+            d = last[date_pos]
+            next_cursor = encode_cursor("date", [d.isoformat() if d else None, last[0]])
+        else:
+            next_cursor = encode_cursor("id", [None, last[0]])
+
+    return rows, scores, next_cursor, truncated
 
 
 @app.get("/")
@@ -37,97 +335,114 @@ def home():
     }
 
 
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "pool": pool.stats(),
+        "lanes": {
+            "list": {"workers": DB_LIST_WORKERS, "timeout": DB_LIST_TIMEOUT},
+            "detail": {"workers": DB_DETAIL_WORKERS, "timeout": DB_DETAIL_TIMEOUT},
+            "export": {"workers": DB_EXPORT_WORKERS, "timeout": DB_EXPORT_TIMEOUT},
+        },
+        "search": {name: index.stats() for name, index in search_indexes.items()},
+        "detail_cache": detail_cache.stats(),
+    }
 
-# ------------------------- Judgments -------------------------
 
-@app.get("/judgments")
-def list_judgments(q: str | None = Query(default=None, description="Search term")):
+@app.post("/search/reindex")
+async def reindex(
+    full: bool = Query(False, description="Rebuild from scratch instead of refreshing"),
+    x_admin_token: str | None = Header(default=None),
+):
     """
-    List judgments. If q is provided, performs a simple LIKE search across key fields.
+    Refresh the in-memory search indexes now instead of waiting for the timer
+    (e.g. right after running the loaders); full=true rebuilds them.
+    Needs X-Admin-Token; disabled when ADMIN_TOKEN is not set.
     """
-    conn = connect()
-    cur = conn.cursor()
-
-    if q:
-        like = f"%{q}%"
-        rows = cur.execute(
-            """
-            SELECT TOP 100
-                judgment_id, reference_number, appeal_number, judicial_year,
-                session_date, court_name, case_type
-            FROM dbo.Judgment
-            WHERE
-                reference_number LIKE ?
-                OR court_name LIKE ?
-                OR facts LIKE ?
-                OR reasons LIKE ?
-            ORDER BY judgment_id DESC
-            """,
-            like, like, like, like
-        ).fetchall()
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Reindex is disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    if full:
+        await asyncio.to_thread(build_search_indexes)
     else:
-        rows = cur.execute(
-            """
-            SELECT TOP 100
-                judgment_id, reference_number, appeal_number, judicial_year,
-                session_date, court_name, case_type
-            FROM dbo.Judgment
-            ORDER BY judgment_id DESC
-            """
-        ).fetchall()
+        await asyncio.to_thread(refresh_search_indexes)
+    return {name: index.stats() for name, index in search_indexes.items()}
 
-    conn.close()
 
-    result = []
-    for r in rows:
-        result.append({
-            "judgment_id": r[0],
-            "reference_number": r[1],
-            "appeal_number": r[2],
-            "judicial_year": r[3],
-            "session_date": r[4].isoformat() if r[4] else None,
-            "court_name": r[5],
-            "case_type": r[6],
-        })
-    return result
 
+# ------------------------- Conditional GET -------------------------
 
-@app.get("/judgments/{judgment_id}")
-def get_judgment(judgment_id: int):
+def validators(row_version, updated_at) -> dict:
     """
-    Fetch a single judgment with its principles.
+    ETag / Last-Modified headers from a row's rowversion and updated_at (UTC).
     """
-    conn = connect()
-    cur = conn.cursor()
+    return {
+        "ETag": f'"{bytes(row_version).hex()}"',
+        "Last-Modified": format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True),
+        "Cache-Control": "no-cache",
+    }
 
-    j = cur.execute(
-        """
-        SELECT
-            judgment_id, court_name, case_type, appeal_number, judicial_year, session_date,
-            technical_office_number, volume_number, page_number, rule_number, reference_number,
-            judicial_panel, facts, reasons
-        FROM dbo.Judgment
-        WHERE judgment_id = ?
-        """,
-        judgment_id
-    ).fetchone()
 
-    if not j:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Judgment not found")
+def not_modified(headers: dict, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"] in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False
 
-    principles = cur.execute(
-        """
-        SELECT principle_number, principle_text
-        FROM dbo.Judgment_Principle
-        WHERE judgment_id = ?
-        ORDER BY principle_number
-        """,
-        judgment_id
-    ).fetchall()
 
-    conn.close()
+async def conditional_detail(collection: str, doc_id: int, if_none_match: str | None,
+                             if_modified_since: str | None, work, build) -> Response:
+    """
+    Serve a detail document with ETag / Last-Modified.
+
+    A cheap primary-key lookup of (row_version, updated_at) comes first: matching
+    validators answer 304 without reading the document. Otherwise the serialized
+    payload comes from detail_cache while its version is current, and only on a
+    miss does work(cur) run the full detail queries (returning the row with
+    row_version, updated_at as its last two columns, plus the child rows).
+    """
+    table, id_col = LISTS[collection][:2]
+
+    def probe(cur):
+        return cur.execute(
+            f"SELECT row_version, updated_at FROM {table} WHERE {id_col} = ?",
+            doc_id
+        ).fetchone()
 
+    v = await run_db(probe, lane="detail")
+    if not v:
+        raise HTTPException(status_code=404, detail=f"{collection[:-1].capitalize()} not found")
+
+    headers = validators(v[0], v[1])
+    if not_modified(headers, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+
+    key = (collection, doc_id)
+    body = detail_cache.get(key, headers["ETag"])
+    if body is None:
+        row, children = await run_db(work, lane="detail")
+        # the row may have changed since the probe; describe what we actually read
+        headers = validators(row[-2], row[-1])
+        body = json.dumps(build(row, children), ensure_ascii=False).encode("utf-8")
+        detail_cache.put(key, headers["ETag"], body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# ------------------------- Documents -------------------------
+
+def judgment_doc(j, principles) -> dict:
+    """
+    Shape a judgment row and its principle rows (detail column order) into the API document.
+    """
     return {
         "judgment": {
             "judgment_id": j[0],
@@ -149,49 +464,146 @@ def get_judgment(judgment_id: int):
     }
 
 
-# ------------------------- Fatwas -------------------------
+def fatwa_doc(f, principles) -> dict:
+    """
+    Shape a fatwa row and its principle rows (detail column order) into the API document.
+    """
+    return {
+        "fatwa": {
+            "fatwa_id": f[0],
+            "fatwa_number": f[1],
+            "fatwa_year": f[2],
+            "issued_date": f[3].isoformat() if f[3] else None,
+            "session_date": f[4].isoformat() if f[4] else None,
+            "file_number": f[5],
+            "subject": f[6],
+            "authority": f[7],
+            "facts": f[8],
+            "application": f[9],
+            "opinion": f[10],
+        },
+        "principles": [{"principle_number": p[0], "principle_text": p[1]} for p in principles],
+    }
 
-@app.get("/fatwas")
-def list_fatwas(q: str | None = Query(default=None, description="Search term")):
+
+def law_doc(l, articles) -> dict:
     """
-    List fatwas. If q is provided, performs a simple LIKE search across key fields.
+    Shape a law row and its article rows (detail column order) into the API document.
     """
-    conn = connect()
-    cur = conn.cursor()
+    return {
+        "law": {
+            "law_id": l[0],
+            "law_year": l[1],
+            "issue_date": l[2].isoformat() if l[2] else None,
+            "publication_date": l[3].isoformat() if l[3] else None,
+            "effective_date": l[4].isoformat() if l[4] else None,
+            "title": l[5],
+            "gazette_reference": l[6],
+        },
+        "articles": [
+            {
+                "article_number": a[0],
+                "article_type": a[1],
+                "is_repeated": bool(a[2]),
+                "original_text": a[3],
+                "final_text": a[4],
+                "final_text_date": a[5].isoformat() if a[5] else None,
+            }
+            for a in articles
+        ],
+    }
 
-    if q:
-        like = f"%{q}%"
-        rows = cur.execute(
+
+# ------------------------- Judgments -------------------------
+
+@app.get("/judgments")
+async def list_judgments(
+    q: str | None = Query(default=None, description="Search term"),
+    order: Literal["id", "date"] = Query(default="id", description="id or session_date, newest first"),
+    after: str | None = Query(default=None, description="`next` cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=PAGE_MAX),
+):
+    """
+    List judgments, one keyset page at a time. If q is provided, results come from
+    the full-text index ranked by relevance (BM25); use "double quotes" for phrases.
+    """
+    rows, scores, next_cursor, truncated = await list_page("judgments", q, order, after, limit)
+
+    items = []
+    for r in rows:
+        item = {
+            "judgment_id": r[0],
+            "reference_number": r[1],
+            "appeal_number": r[2],
+            "judicial_year": r[3],
+            "session_date": r[4].isoformat() if r[4] else None,
+            "court_name": r[5],
+            "case_type": r[6],
+        }
+        if q:
+            item["score"] = round(scores[r[0]], 4)
+        items.append(item)
+    return {"items": items, "next": next_cursor, "truncated": truncated}
+
+
+@app.get("/judgments/{judgment_id}")
+async def get_judgment(
+    judgment_id: int,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+):
+    """
+    Fetch a single judgment with its principles.
+    """
+    def work(cur):
+        j = cur.execute(
             """
-            SELECT TOP 100
-                fatwa_id, fatwa_number, fatwa_year, issued_date, session_date,
-                subject, authority, file_number
-            FROM dbo.Fatwa
-            WHERE
-                subject LIKE ?
-                OR authority LIKE ?
-                OR facts LIKE ?
-                OR opinion LIKE ?
-            ORDER BY fatwa_id DESC
+            SELECT
+                judgment_id, court_name, case_type, appeal_number, judicial_year, session_date,
+                technical_office_number, volume_number, page_number, rule_number, reference_number,
+                judicial_panel, facts, reasons, row_version, updated_at
+            FROM dbo.Judgment
+            WHERE judgment_id = ?
             """,
-            like, like, like, like
-        ).fetchall()
-    else:
-        rows = cur.execute(
-            """
-            SELECT TOP 100
-                fatwa_id, fatwa_number, fatwa_year, issued_date, session_date,
-                subject, authority, file_number
-            FROM dbo.Fatwa
-            ORDER BY fatwa_id DESC
+            judgment_id
+        ).fetchone()
+
+        if not j:
+            raise HTTPException(status_code=404, detail="Judgment not found")
+
+        principles = cur.execute(
             """
+            SELECT principle_number, principle_text
+            FROM dbo.Judgment_Principle
+            WHERE judgment_id = ?
+            ORDER BY principle_number
+            """,
+            judgment_id
         ).fetchall()
+        return j, principles
 
-    conn.close()
+    return await conditional_detail(
+        "judgments", judgment_id, if_none_match, if_modified_since, work, judgment_doc)
 
-    result = []
+
+# ------------------------- Fatwas -------------------------
+
+@app.get("/fatwas")
+async def list_fatwas(
+    q: str | None = Query(default=None, description="Search term"),
+    order: Literal["id", "date"] = Query(default="id", description="id or issued_date, newest first"),
+    after: str | None = Query(default=None, description="`next` cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=PAGE_MAX),
+):
+    """
+    List fatwas, one keyset page at a time. If q is provided, results come from
+    the full-text index ranked by relevance (BM25); use "double quotes" for phrases.
+    """
+    rows, scores, next_cursor, truncated = await list_page("fatwas", q, order, after, limit)
+
+    items = []
     for r in rows:
-        result.append({
+        item = {
             "fatwa_id": r[0],
             "fatwa_number": r[1],
             "fatwa_year": r[2],
@@ -200,100 +612,70 @@ def list_fatwas(q: str | None = Query(default=None, description="Search term")):
             "subject": r[5],
             "authority": r[6],
             "file_number": r[7],
-        })
-    return result
+        }
+        if q:
+            item["score"] = round(scores[r[0]], 4)
+        items.append(item)
+    return {"items": items, "next": next_cursor, "truncated": truncated}
 
 
 @app.get("/fatwas/{fatwa_id}")
-def get_fatwa(fatwa_id: int):
+async def get_fatwa(
+    fatwa_id: int,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+):
     """
     Fetch a single fatwa with its principles.
     """
-    conn = connect()
-    cur = conn.cursor()
-
-    f = cur.execute(
-        """
-        SELECT
-            fatwa_id, fatwa_number, fatwa_year, issued_date, session_date, file_number,
-            subject, authority, facts, application, opinion
-        FROM dbo.Fatwa
-        WHERE fatwa_id = ?
-        """,
-        fatwa_id
-    ).fetchone()
+    def work(cur):
+        f = cur.execute(
+            """
+            SELECT
+                fatwa_id, fatwa_number, fatwa_year, issued_date, session_date, file_number,
+                subject, authority, facts, application, opinion, row_version, updated_at
+            FROM dbo.Fatwa
+            WHERE fatwa_id = ?
+            """,
+            fatwa_id
+        ).fetchone()
 
-    if not f:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Fatwa not found")
+        if not f:
+            raise HTTPException(status_code=404, detail="Fatwa not found")
 
-    principles = cur.execute(
-        """
-        SELECT principle_number, principle_text
-        FROM dbo.Fatwa_Principle
-        WHERE fatwa_id = ?
-        ORDER BY principle_number
-        """,
-        fatwa_id
-    ).fetchall()
+        principles = cur.execute(
+            """
+            SELECT principle_number, principle_text
+            FROM dbo.Fatwa_Principle
+            WHERE fatwa_id = ?
+            ORDER BY principle_number
+            """,
+            fatwa_id
+        ).fetchall()
+        return f, principles
 
-    conn.close()
-
-    return {
-        "fatwa": {
-            "fatwa_id": f[0],
-            "fatwa_number": f[1],
-            "fatwa_year": f[2],
-            "issued_date": f[3].isoformat() if f[3] else None,
-            "session_date": f[4].isoformat() if f[4] else None,
-            "file_number": f[5],
-            "subject": f[6],
-            "authority": f[7],
-            "facts": f[8],
-            "application": f[9],
-            "opinion": f[10],
-        },
-        "principles": [{"principle_number": p[0], "principle_text": p[1]} for p in principles],
-    }
+    return await conditional_detail(
+        "fatwas", fatwa_id, if_none_match, if_modified_since, work, fatwa_doc)
 
 
 # ------------------------- Laws -------------------------
 
 @app.get("/laws")
-def list_laws(q: str | None = Query(default=None, description="Search term")):
+async def list_laws(
+    q: str | None = Query(default=None, description="Search term"),
+    order: Literal["id", "date"] = Query(default="id", description="id or issue_date, newest first"),
+    after: str | None = Query(default=None, description="`next` cursor of the previous page"),
+    limit: int = Query(default=100, ge=1, le=PAGE_MAX),
+):
     """
-    List laws. If q is provided, searches on the title/gazette reference.
+    List laws, one keyset page at a time. If q is provided, searches the
+    title/gazette reference through the full-text index, ranked by relevance (BM25).
     """
-    conn = connect()
-    cur = conn.cursor()
-
-    if q:
-        like = f"%{q}%"
-        rows = cur.execute(
-            """
-            SELECT TOP 100
-                law_id, law_year, issue_date, publication_date, effective_date, title,gazette_reference
-            FROM dbo.Law
-            WHERE title LIKE ? OR gazette_reference LIKE ?
-            ORDER BY law_id DESC
-            """,
-            like, like
-        ).fetchall()
-    else:
-        rows = cur.execute(
-            """
-            SELECT TOP 100
-                law_id, law_year, issue_date, publication_date, effective_date, title, gazette_reference
-            FROM dbo.Law
-            ORDER BY law_id DESC
-            """
-        ).fetchall()
+    rows, scores, next_cursor, truncated = await list_page("laws", q, order, after, limit)
 
-    conn.close()
-
-    result = []
+    items = []
     for r in rows:
-        result.append({
+        item = {
             "law_id": r[0],
             "law_year": r[1],
             "issue_date": r[2].isoformat() if r[2] else None,
@@ -301,65 +683,166 @@ def list_laws(q: str | None = Query(default=None, description="Search term")):
             "effective_date": r[4].isoformat() if r[4] else None,
             "title": r[5],
             "gazette_reference": r[6],
-
-        })
-    return result
+        }
+        if q:
+            item["score"] = round(scores[r[0]], 4)
+        items.append(item)
+    return {"items": items, "next": next_cursor, "truncated": truncated}
 
 
 @app.get("/laws/{law_id}")
-def get_law(law_id: int):
+async def get_law(
+    law_id: int,
+    if_none_match: str | None = Header(default=None),
+    if_modified_since: str | None = Header(default=None),
+):
     """
     Fetch a single law with its articles.
     """
-    conn = connect()
-    cur = conn.cursor()
+    def work(cur):
+        l = cur.execute(
+            """
+            SELECT law_id, law_year, issue_date, publication_date, effective_date, title, gazette_reference,
+                row_version, updated_at
+            FROM dbo.Law
+            WHERE law_id = ?
+            """,
+            law_id
+        ).fetchone()
+
+        if not l:
+            raise HTTPException(status_code=404, detail="Law not found")
+
+        articles = cur.execute(
+            """
+            SELECT article_number, article_type, is_repeated, original_text, final_text, final_text_date
+            FROM dbo.Law_Article
+            WHERE law_id = ?
+            ORDER BY
+              TRY_CONVERT(int, REPLACE(article_number, N' مكرر', '')),
+              article_number
+            """,
+            law_id
+        ).fetchall()
+        return l, articles
 
-    l = cur.execute(
+    return await conditional_detail(
+        "laws", law_id, if_none_match, if_modified_since, work, law_doc)
+
+
+# ------------------------- Bulk export -------------------------
+
+# collection -> (document builder, parent batch query, children query for a batch)
+# Parent columns follow the detail endpoints; children are prefixed with the parent id.
+EXPORTS = {
+    "judgments": (
+        judgment_doc,
+        """
+        SELECT TOP ({batch})
+            judgment_id, court_name, case_type, appeal_number, judicial_year, session_date,
+            technical_office_number, volume_number, page_number, rule_number, reference_number,
+            judicial_panel, facts, reasons
+        FROM dbo.Judgment
+        WHERE judgment_id > ?
+        ORDER BY judgment_id
+        """,
+        """
+        SELECT judgment_id, principle_number, principle_text
+        FROM dbo.Judgment_Principle
+        WHERE judgment_id IN ({marks})
+        ORDER BY judgment_id, principle_number
+        """,
+    ),
+    "fatwas": (
+        fatwa_doc,
+        """
+        SELECT TOP ({batch})
+            fatwa_id, fatwa_number, fatwa_year, issued_date, session_date, file_number,
+            subject, authority, facts, application, opinion
+        FROM dbo.Fatwa
+        WHERE fatwa_id > ?
+        ORDER BY fatwa_id
+        """,
         """
-        SELECT law_id, law_year, issue_date, publication_date, effective_date, title, gazette_reference
+        SELECT fatwa_id, principle_number, principle_text
+        FROM dbo.Fatwa_Principle
+        WHERE fatwa_id IN ({marks})
+        ORDER BY fatwa_id, principle_number
+        """,
+    ),
+    "laws": (
+        law_doc,
+        """
+        SELECT TOP ({batch})
+            law_id, law_year, issue_date, publication_date, effective_date, title, gazette_reference
         FROM dbo.Law
-        WHERE law_id = ?
+        WHERE law_id > ?
+        ORDER BY law_id
         """,
-        law_id
-    ).fetchone()
-
-    if not l:
-        conn.close()
-        raise HTTPException(status_code=404, detail="Law not found")
-
-    articles = cur.execute(
         """
-        SELECT article_number, article_type, is_repeated, original_text, final_text, final_text_date
+        SELECT law_id, article_number, article_type, is_repeated, original_text, final_text, final_text_date
         FROM dbo.Law_Article
-        WHERE law_id = ?
+        WHERE law_id IN ({marks})
         ORDER BY
+          law_id,
           TRY_CONVERT(int, REPLACE(article_number, N' مكرر', '')),
           article_number
         """,
-        law_id
-    ).fetchall()
+    ),
+}
 
-    conn.close()
 
-    return {
-        "law": {
-            "law_id": l[0],
-            "law_year": l[1],
-            "issue_date": l[2].isoformat() if l[2] else None,
-            "publication_date": l[3].isoformat() if l[3] else None,
-            "effective_date": l[4].isoformat() if l[4] else None,
-            "title": l[5],
-            "gazette_reference": l[6],
-        },
-        "articles": [
-            {
-                "article_number": a[0],
-                "article_type": a[1],
-                "is_repeated": bool(a[2]),
-                "original_text": a[3],
-                "final_text": a[4],
-                "final_text_date": a[5].isoformat() if a[5] else None,
-            }
-            for a in articles
-        ],
-    }
+async def export_batches(collection: str, since_id: int):
+    """
+    Yield NDJSON chunks, one per batch of documents, in id order.
+
+    Each batch is a keyset seek on the primary key plus one query for all the
+    batch's children, on a connection borrowed only for that batch. Memory stays
+    at one batch and a slow reader never pins a pooled connection.
+    """
+    build, parent_sql, child_sql = EXPORTS[collection]
+    parent_sql = parent_sql.format(batch=EXPORT_BATCH)
+    last_id = since_id
+
+    while True:
+        def work(cur):
+            parents = cur.execute(parent_sql, last_id).fetchall()
+            if not parents:
+                return [], {}
+            ids = [r[0] for r in parents]
+            children = {i: [] for i in ids}
+            marks = ", ".join("?" * len(ids))
+            cur.execute(child_sql.format(marks=marks), *ids)
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    break
+                for c in rows:
+                    children[c[0]].append(c[1:])
+            return parents, children
+
+        parents, children = await run_db(work, lane="export")
+        if not parents:
+            return
+
+        yield "".join(
+            json.dumps(build(r, children[r[0]]), ensure_ascii=False) + "\n"
+            for r in parents
+        )
+        last_id = parents[-1][0]
+
+
+@app.get("/export/{collection}.ndjson")
+async def export_ndjson(
+    collection: Literal["judgments", "fatwas", "laws"],
+    since_id: int = Query(default=0, ge=0, description="Only documents with a larger id"),
+):
+    """
+    Stream a whole collection as NDJSON: one detail document (with its
+    principles/articles) per line, ordered by id. Pass the last id you received
+    as since_id to continue incrementally.
+    """
+    return StreamingResponse(
+        export_batches(collection, since_id),
+        media_type="application/x-ndjson",
+    )
@@ -0,0 +1,95 @@
+-- Bring a database created from an older schema.sql up to date, keeping its data.
+-- Idempotent: every step checks first, so it is safe to run again.
+-- Afterwards fill the *_norm columns: python "load files/backfill_norm.py"
+
+-- ------------------------- dbo.Law -------------------------
+IF COL_LENGTH('dbo.Law', 'row_version') IS NULL
+    ALTER TABLE dbo.Law ADD row_version ROWVERSION;
+IF COL_LENGTH('dbo.Law', 'updated_at') IS NULL
+    ALTER TABLE dbo.Law ADD updated_at DATETIME2(0) NOT NULL
+        CONSTRAINT DF_Law_UpdatedAt DEFAULT SYSUTCDATETIME();
+IF COL_LENGTH('dbo.Law', 'source_sha256') IS NULL
+    ALTER TABLE dbo.Law ADD source_sha256 CHAR(64) NULL;
+IF COL_LENGTH('dbo.Law', 'parser_version') IS NULL
+    ALTER TABLE dbo.Law ADD parser_version NVARCHAR(20) NULL;
+IF COL_LENGTH('dbo.Law', 'title_norm') IS NULL
+    ALTER TABLE dbo.Law ADD title_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Law', 'gazette_reference_norm') IS NULL
+    ALTER TABLE dbo.Law ADD gazette_reference_norm NVARCHAR(MAX) NULL;
+
+IF COL_LENGTH('dbo.Law_Article', 'content_hash') IS NULL
+    ALTER TABLE dbo.Law_Article ADD content_hash BINARY(32) NULL;
+
+-- ------------------------- dbo.Fatwa -------------------------
+IF COL_LENGTH('dbo.Fatwa', 'row_version') IS NULL
+    ALTER TABLE dbo.Fatwa ADD row_version ROWVERSION;
+IF COL_LENGTH('dbo.Fatwa', 'updated_at') IS NULL
+    ALTER TABLE dbo.Fatwa ADD updated_at DATETIME2(0) NOT NULL
+        CONSTRAINT DF_Fatwa_UpdatedAt DEFAULT SYSUTCDATETIME();
+IF COL_LENGTH('dbo.Fatwa', 'source_sha256') IS NULL
+    ALTER TABLE dbo.Fatwa ADD source_sha256 CHAR(64) NULL;
+IF COL_LENGTH('dbo.Fatwa', 'parser_version') IS NULL
+    ALTER TABLE dbo.Fatwa ADD parser_version NVARCHAR(20) NULL;
+IF COL_LENGTH('dbo.Fatwa', 'subject_norm') IS NULL
+    ALTER TABLE dbo.Fatwa ADD subject_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Fatwa', 'authority_norm') IS NULL
+    ALTER TABLE dbo.Fatwa ADD authority_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Fatwa', 'facts_norm') IS NULL
+    ALTER TABLE dbo.Fatwa ADD facts_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Fatwa', 'opinion_norm') IS NULL
+    ALTER TABLE dbo.Fatwa ADD opinion_norm NVARCHAR(MAX) NULL;
+
+IF COL_LENGTH('dbo.Fatwa_Principle', 'content_hash') IS NULL
+    ALTER TABLE dbo.Fatwa_Principle ADD content_hash BINARY(32) NULL;
+
+-- ------------------------- dbo.Judgment -------------------------
+IF COL_LENGTH('dbo.Judgment', 'row_version') IS NULL
+    ALTER TABLE dbo.Judgment ADD row_version ROWVERSION;
+IF COL_LENGTH('dbo.Judgment', 'updated_at') IS NULL
+    ALTER TABLE dbo.Judgment ADD updated_at DATETIME2(0) NOT NULL
+        CONSTRAINT DF_Judgment_UpdatedAt DEFAULT SYSUTCDATETIME();
+IF COL_LENGTH('dbo.Judgment', 'source_sha256') IS NULL
+    ALTER TABLE dbo.Judgment ADD source_sha256 CHAR(64) NULL;
+IF COL_LENGTH('dbo.Judgment', 'parser_version') IS NULL
+    ALTER TABLE dbo.Judgment ADD parser_version NVARCHAR(20) NULL;
+IF COL_LENGTH('dbo.Judgment', 'court_name_norm') IS NULL
+    ALTER TABLE dbo.Judgment ADD court_name_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Judgment', 'facts_norm') IS NULL
+    ALTER TABLE dbo.Judgment ADD facts_norm NVARCHAR(MAX) NULL;
+IF COL_LENGTH('dbo.Judgment', 'reasons_norm') IS NULL
+    ALTER TABLE dbo.Judgment ADD reasons_norm NVARCHAR(MAX) NULL;
+
+IF COL_LENGTH('dbo.Judgment_Principle', 'content_hash') IS NULL
+    ALTER TABLE dbo.Judgment_Principle ADD content_hash BINARY(32) NULL;
+GO
+
+-- ------------------------- indexes -------------------------
+-- Keyset pagination by date (newest first); id order uses the clustered PK
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Judgment_SessionDate' AND object_id = OBJECT_ID('dbo.Judgment'))
+    CREATE INDEX IX_Judgment_SessionDate
+    ON dbo.Judgment(session_date DESC, judgment_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Fatwa_IssuedDate' AND object_id = OBJECT_ID('dbo.Fatwa'))
+    CREATE INDEX IX_Fatwa_IssuedDate
+    ON dbo.Fatwa(issued_date DESC, fatwa_id DESC);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Law_IssueDate' AND object_id = OBJECT_ID('dbo.Law'))
+    CREATE INDEX IX_Law_IssueDate
+    ON dbo.Law(issue_date DESC, law_id DESC);
+
+-- Child sync reads (id, key, content_hash) per parent; keep that read index-only
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Judgment_Principle_Judgment'
+                 AND object_id = OBJECT_ID('dbo.Judgment_Principle'))
+    CREATE INDEX IX_Judgment_Principle_Judgment
+    ON dbo.Judgment_Principle(judgment_id, principle_number) INCLUDE (content_hash);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes
+               WHERE name = 'IX_Fatwa_Principle_Fatwa'
+                 AND object_id = OBJECT_ID('dbo.Fatwa_Principle'))
+    CREATE INDEX IX_Fatwa_Principle_Fatwa
+    ON dbo.Fatwa_Principle(fatwa_id, principle_number) INCLUDE (content_hash);
+GO
@@ -0,0 +1,112 @@
+import json
+import math
+import base64
+import binascii
+from datetime import date
+
+
+class CursorError(ValueError):
+    """
+    Raised for an `after` token that is malformed or belongs to another ordering.
+    """
+
+
+def encode_cursor(order: str, key: list) -> str:
+    raw = json.dumps({"o": order, "k": key}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, order: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        key = data["k"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise CursorError("invalid cursor")
+    if data.get("o") != order or not isinstance(key, list) or len(key) != 2:
+        raise CursorError(f"cursor does not belong to order={order}")
+    if not _KEY_CHECKS[order](*key):
+        raise CursorError("invalid cursor")
+    return key
+
+
+def _is_int(v) -> bool:
+    # ids are bound as BIGINT at most
+    return isinstance(v, int) and not isinstance(v, bool) and -2**63 <= v < 2**63
+
+
+def _is_score(v) -> bool:
+    return (_is_int(v) or isinstance(v, float)) and math.isfinite(v)
+
+
+def _is_date_or_null(v) -> bool:
+    if v is None:
+        return True
+    if not isinstance(v, str) or len(v) != 10:
+        return False
+    try:
+        date.fromisoformat(v)
+    except ValueError:
+        return False
+    return True
+
+
+# order -> check of its key [first, last_id], as encode_cursor writes them
+_KEY_CHECKS = {
+    "id": lambda first, last_id: first is None and _is_int(last_id),
+    "date": lambda last_date, last_id: _is_date_or_null(last_date) and _is_int(last_id),
+    "rank": lambda last_score, last_id: _is_score(last_score) and _is_int(last_id),
+}
+
+
+def keyset_query(table: str, cols: str, id_col: str, date_col: str,
+                 order: str, key: list | None, limit: int):
+    """
+    Build a keyset page query, newest first.
+
+    order="id":   ORDER BY id DESC, key = [None, last_id]
+    order="date": ORDER BY date DESC, id DESC (NULL dates last), key = [last_date, last_id]
+
+    Both orders are backed by an index, so every page costs one index seek.
+    Fetches limit + 1 rows so the caller knows whether a next page exists.
+    """
+    where = ""
+    params = []
+
+    if order == "id":
+        if key is not None:
+            where = f"WHERE {id_col} < ?"
+            params = [key[1]]
+        order_by = f"{id_col} DESC"
+    else:
+        if key is not None:
+            last_date, last_id = key
+            if last_date is None:
+                where = f"WHERE {date_col} IS NULL AND {id_col} < ?"
+                params = [last_id]
+            else:
+                # two seek ranges on the (date, id) index: date <= last, date IS NULL
+                where = (
+                    f"WHERE ({date_col} <= ? AND ({date_col} < ? OR {id_col} < ?)) "
+                    f"OR {date_col} IS NULL"
+                )
+                params = [last_date, last_date, last_id]
+        # SQL Server sorts NULL lowest, so DESC already puts NULL dates last
+        order_by = f"{date_col} DESC, {id_col} DESC"
+
+    sql = f"SELECT TOP ({int(limit) + 1}) {cols} FROM {table} {where} ORDER BY {order_by}"
+    return sql, params
+
+
+def rank_page(ranked: list[tuple[int, float]], key: list | None, limit: int):
+    """
+    Keyset paging over an in-memory relevance list [(doc_id, score)] sorted by
+    (score DESC, doc_id DESC). key = [last_score, last_id].
+    """
+    if key is not None:
+        last_score, last_id = key
+        ranked = [
+            (doc_id, score) for doc_id, score in ranked
+            if (-score, -doc_id) > (-last_score, -last_id)
+        ]
+    return ranked[:limit + 1]
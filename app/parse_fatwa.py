@@ -1,122 +1,91 @@
 import re
-from app.docx_text import docx_paragraphs
+from app.docx_text import DocxDocument, as_document
+from app.records import Fatwa, Principle
+from app.rules import HeaderRules, as_int, as_str, date_any
 
-SECTION_HEADS = ["الجهة", "موضوع الفتوى", "الوقائع", "التطبيق", "الرأى"]
+# heading line -> section it opens
+SECTION_HEADS = {
+    "الجهة": "authority",
+    "موضوع الفتوى": "subject",
+    "الوقائع": "facts",
+    "التطبيق": "application",
+    "الرأى": "opinion",
+}
 
+FATWA_HEADER = HeaderRules(
+    fatwa_number=(r"الفتوى\s+رقم\s+(\d+)", as_int),
+    fatwa_year=(r"لسنة\s+(\d{4})", as_int),
+    file_number=(r"رقم\s+الملف\s+([0-9/]+)", as_str),
+    issued_date=(r"بتاريخ\s+([0-9\-\/]+)", date_any),
+    session_date=(r"تاريخ\s+الجلسة\s+([0-9\-\/]+)", date_any),
+)
 
-def _date_any(s: str):
-    # يقبل YYYY-MM-DD أو DD/MM/YYYY
-    if not s:
-        return None
-    s = s.strip()
-    m = re.search(r"\d{4}-\d{2}-\d{2}", s)
-    if m:
-        return m.group(0)
-    m = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", s)
-    if m:
-        d, mo, y = m.groups()
-        return f"{y}-{int(mo):02d}-{int(d):02d}"
-    return None
+# principle header like: "مبدأ 1" or "مبدأ رقم 1"
+_PRINCIPLE = re.compile(r"^مبدأ(?:\s+رقم)?\s+(\d+)\s*$")
 
 
-def parse_fatwa(path: str):
-    paras = [p.strip() for p in docx_paragraphs(path) if p.strip()]
-    if not paras:
-        return {}, []
+def parse_fatwa(path: str | DocxDocument):
+    return parse_fatwa_paragraphs(as_document(path).paragraphs())
 
-    title = paras[0]
 
-    fatwa_number = None
-    fatwa_year = None
-    issued_date = None
-    session_date = None
-    file_number = None
+def parse_fatwa_paragraphs(paras):
+    # paragraphs arrive stripped and non-empty, one at a time
+    paras = iter(paras)
+    title = next(paras, None)
+    if title is None:
+        return Fatwa(), []
 
-    m = re.search(r"الفتوى\s+رقم\s+(\d+)", title)
-    if m:
-        fatwa_number = int(m.group(1))
-
-    m = re.search(r"لسنة\s+(\d{4})", title)
-    if m:
-        fatwa_year = int(m.group(1))
-
-    m = re.search(r"رقم\s+الملف\s+([0-9/]+)", title)
-    if m:
-        file_number = m.group(1).strip()
-
-    m = re.search(r"بتاريخ\s+([0-9\-\/]+)", title)
-    if m:
-        issued_date = _date_any(m.group(1))
-
-    m = re.search(r"تاريخ\s+الجلسة\s+([0-9\-\/]+)", title)
-    if m:
-        session_date = _date_any(m.group(1))
+    header = FATWA_HEADER.extract(title)
 
     # sections + principles
-    sections = {k: "" for k in ["authority",
+    # text is collected as parts and joined once at the end
+    sections = {k: [] for k in ["authority",
                                 "subject", "facts", "application", "opinion"]}
     principles = []
     mode = None
     current_principle = None
+    principle_parts = []
 
-    i = 1
-    while i < len(paras):
-        t = paras[i]
+    def close_principle():
+        nonlocal current_principle
+        if current_principle is not None:
+            current_principle.principle_text = " ".join(principle_parts)
+            principles.append(current_principle)
+            current_principle = None
 
+    for t in paras:
         # headings
-        if t in SECTION_HEADS:
+        section = SECTION_HEADS.get(t)
+        if section is not None:
             # close any open principle
-            if current_principle:
-                principles.append(current_principle)
-                current_principle = None
-
-            if t == "الجهة":
-                mode = "authority"
-            elif t == "موضوع الفتوى":
-                mode = "subject"
-            elif t == "الوقائع":
-                mode = "facts"
-            elif t == "التطبيق":
-                mode = "application"
-            elif t == "الرأى":
-                mode = "opinion"
-            i += 1
+            close_principle()
+            mode = section
             continue
 
-        # principle header like: "مبدأ 1" or "مبدأ رقم 1"
-        pm = re.match(r"^مبدأ(?:\s+رقم)?\s+(\d+)\s*$", t)
+        pm = _PRINCIPLE.match(t)
         if pm:
-            if current_principle:
-                principles.append(current_principle)
-            current_principle = {"principle_number": int(
-                pm.group(1)), "principle_text": ""}
+            close_principle()
+            current_principle = Principle(principle_number=int(pm.group(1)))
+            principle_parts = []
             mode = "principle"
-            i += 1
             continue
 
         # collect text
-        if mode == "principle" and current_principle:
-            current_principle["principle_text"] = (
-                current_principle["principle_text"] + " " + t).strip()
+        if mode == "principle" and current_principle is not None:
+            principle_parts.append(t)
         elif mode in sections:
-            sections[mode] = (sections[mode] + " " + t).strip()
-
-        i += 1
-
-    if current_principle:
-        principles.append(current_principle)
-
-    fatwa = {
-        "fatwa_number": fatwa_number,
-        "fatwa_year": fatwa_year,
-        "issued_date": issued_date,
-        "session_date": session_date,
-        "file_number": file_number,
-        "authority": sections["authority"] or None,
-        "subject": sections["subject"] or None,
-        "facts": sections["facts"] or None,
-        "application": sections["application"] or None,
-        "opinion": sections["opinion"] or None,
-    }
+            sections[mode].append(t)
+
+    close_principle()
+    sections = {k: " ".join(parts) for k, parts in sections.items()}
+
+    fatwa = Fatwa(
+        **header,
+        authority=sections["authority"] or None,
+        subject=sections["subject"] or None,
+        facts=sections["facts"] or None,
+        application=sections["application"] or None,
+        opinion=sections["opinion"] or None,
+    )
 
     return fatwa, principles
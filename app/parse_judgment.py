@@ -1,18 +1,33 @@
 import re
 from datetime import datetime
-from app.docx_text import docx_paragraphs
+from itertools import chain, islice
+from app.docx_text import DocxDocument, as_document
+from app.records import Judgment, Principle
+from app.rules import HeaderRules, as_int, as_str
 
-HEADINGS = {"الهيئة", "المبادئ القانونية", "الوقائع", "الحيثيات"}
+# heading line -> section it opens
+HEADINGS = {
+    "الهيئة": "panel",
+    "المبادئ القانونية": "principles",
+    "الوقائع": "facts",
+    "الحيثيات": "reasons",
+}
+
+_SPACES = re.compile(r"[ \t]+")
+_DATE_AR = re.compile(r"(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})")
+_PRINCIPLE = re.compile(r"مبدأ\s+رقم\s+(\d+)")
 
 
 def clean(s: str) -> str:
     s = (s or "").strip()
-    s = re.sub(r"[ \t]+", " ", s)
+    if "  " in s or "\t" in s:
+        # most paragraphs have single spaces only; skip the regex for them
+        s = _SPACES.sub(" ", s)
     return s
 
 
 def parse_date_ar(s: str):
-    m = re.search(r"(\d{1,2})\s*/\s*(\d{1,2})\s*/\s*(\d{4})", s)
+    m = _DATE_AR.search(s)
     if not m:
         return None
     d, mo, y = map(int, m.groups())
@@ -22,12 +37,28 @@ def parse_date_ar(s: str):
         return None
 
 
-def parse_judgment(path: str):
-    paras = [clean(p) for p in docx_paragraphs(path) if clean(p)]
+JUDGMENT_HEADER = HeaderRules(
+    appeal_number=(r"الطعن\s+رقم\s+(\d+)", as_int),
+    judicial_year=(r"لسنة\s+(\d+)", as_int),
+    session_date=(r"تاريخ\s+الجلسة\s*:?\s*([0-9\s/]+)", parse_date_ar),
+    technical_office_number=(r"مكتب\s+فني\s+(\d+)", as_str),
+    volume_number=(r"رقم\s+الجزء\s+(\d+)", as_str),
+    page_number=(r"رقم\s+الصفحة\s+(\d+)", as_str),
+    rule_number=(r"القاعدة\s+رقم\s+(\d+)", as_str),
+    reference_number=(r"الرقم\s+المرجعي\s*:\s*(\d+)", as_str),
+)
+
+
+def parse_judgment(path: str | DocxDocument):
+    return parse_judgment_paragraphs(as_document(path).paragraphs())
 
-    header_block = "\n".join(paras[:12])
 
-    line1 = paras[0] if paras else ""
+def parse_judgment_paragraphs(paras):
+    # paragraphs arrive stripped and non-empty; only the header is held in memory
+    paras = (clean(p) for p in paras)
+    head = list(islice(paras, 12))
+
+    line1 = head[0] if head else ""
     parts = [p.strip() for p in line1.split("-") if p.strip()]
     court_name = None
     case_type = None
@@ -37,26 +68,7 @@ def parse_judgment(path: str):
     elif len(parts) == 2:
         court_name = parts[1]
 
-    def rx_int(pat):
-        m = re.search(pat, header_block)
-        return int(m.group(1)) if m else None
-
-    def rx_str(pat):
-        m = re.search(pat, header_block)
-        return m.group(1).strip() if m else None
-
-    appeal_number = rx_int(r"الطعن\s+رقم\s+(\d+)")
-    judicial_year = rx_int(r"لسنة\s+(\d+)")
-    session_date = None
-    m = re.search(r"تاريخ\s+الجلسة\s*:?\s*([0-9\s/]+)", header_block)
-    if m:
-        session_date = parse_date_ar(m.group(1))
-
-    technical_office_number = rx_str(r"مكتب\s+فني\s+(\d+)")
-    volume_number = rx_str(r"رقم\s+الجزء\s+(\d+)")
-    page_number = rx_str(r"رقم\s+الصفحة\s+(\d+)")
-    rule_number = rx_str(r"القاعدة\s+رقم\s+(\d+)")
-    reference_number = rx_str(r"الرقم\s+المرجعي\s*:\s*(\d+)")
+    header = JUDGMENT_HEADER.extract("\n".join(head))
 
     judicial_panel = None
     principles = []
@@ -65,26 +77,23 @@ def parse_judgment(path: str):
 
     mode = None
     current_principle = None
-
-    for t in paras:
-        if t in HEADINGS:
-            if t == "الهيئة":
-                mode = "panel"
-            elif t == "المبادئ القانونية":
-                if current_principle:
-                    principles.append(current_principle)
-                    current_principle = None
-                mode = "principles"
-            elif t == "الوقائع":
-                if current_principle:
-                    principles.append(current_principle)
-                    current_principle = None
-                mode = "facts"
-            elif t == "الحيثيات":
-                if current_principle:
-                    principles.append(current_principle)
-                    current_principle = None
-                mode = "reasons"
+    principle_parts = []
+
+    def close_principle():
+        # the text is joined once, when the principle ends
+        nonlocal current_principle
+        if current_principle is not None:
+            current_principle.principle_text = " ".join(principle_parts)
+            principles.append(current_principle)
+            current_principle = None
+
+    for t in chain(head, paras):
+        section = HEADINGS.get(t)
+        if section is not None:
+            # the panel sits before the principles; every other heading closes one
+            if section != "panel":
+                close_principle()
+            mode = section
             continue
 
         if mode == "panel":
@@ -93,16 +102,15 @@ def parse_judgment(path: str):
             continue
 
         if mode == "principles":
-            m = re.match(r"مبدأ\s+رقم\s+(\d+)", t)
+            m = _PRINCIPLE.match(t)
             if m:
-                if current_principle:
-                    principles.append(current_principle)
-                current_principle = {"principle_number": int(
-                    m.group(1)), "principle_text": ""}
+                close_principle()
+                current_principle = Principle(principle_number=int(m.group(1)))
+                principle_parts = []
             else:
-                if current_principle:
-                    current_principle["principle_text"] = clean(
-                        current_principle["principle_text"] + " " + t)
+                if current_principle is not None:
+                    # paragraphs are already clean(); single spaces join them
+                    principle_parts.append(t)
             continue
 
         if mode == "facts":
@@ -113,23 +121,15 @@ def parse_judgment(path: str):
             reasons_parts.append(t)
             continue
 
-    if current_principle:
-        principles.append(current_principle)
-
-    judgment = {
-        "court_name": court_name,
-        "case_type": case_type,
-        "appeal_number": appeal_number,
-        "judicial_year": judicial_year,
-        "session_date": session_date,
-        "technical_office_number": technical_office_number,
-        "volume_number": volume_number,
-        "page_number": page_number,
-        "rule_number": rule_number,
-        "reference_number": reference_number,
-        "judicial_panel": judicial_panel,
-        "facts": "\n".join(facts_parts).strip() if facts_parts else None,
-        "reasons": "\n".join(reasons_parts).strip() if reasons_parts else None,
-    }
+    close_principle()
+
+    judgment = Judgment(
+        court_name=court_name,
+        case_type=case_type,
+        **header,
+        judicial_panel=judicial_panel,
+        facts="\n".join(facts_parts).strip() if facts_parts else None,
+        reasons="\n".join(reasons_parts).strip() if reasons_parts else None,
+    )
 
     return judgment, principles
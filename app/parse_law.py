@@ -1,107 +1,76 @@
 import re
-from app.docx_text import docx_paragraphs
-
-
-def _date_any(s: str):
-    if not s:
-        return None
-    s = s.strip()
-    m = re.search(r"\d{4}-\d{2}-\d{2}", s)
-    if m:
-        return m.group(0)
-    m = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", s)
-    if m:
-        d, mo, y = m.groups()
-        return f"{y}-{int(mo):02d}-{int(d):02d}"
-    m = re.search(r"(\d{1,2})-(\d{1,2})-(\d{4})", s)
-    if m:
-        d, mo, y = m.groups()
-        return f"{y}-{int(mo):02d}-{int(d):02d}"
-    return None
-
-
-def parse_law(path: str):
-    paras = [p.strip() for p in docx_paragraphs(path) if p.strip()]
-    if not paras:
-        return {}, []
-
-    title_line = paras[0]
+from itertools import chain, islice
+from app.docx_text import DocxDocument, as_document
+from app.records import Law, LawArticle
+from app.rules import HeaderRules, as_int, date_any
+
+_GAZETTE = re.compile(r"(الجريدة الرسمية.*?)(\d.*)")
+
+LAW_HEADER = HeaderRules(
+    law_number=(r"قانون\s*-\s*رقم\s*(\d+)", as_int),
+    law_year=(r"لسنة\s*(\d{4})", as_int),
+    issue_date=(r"الصادر\s+بتاريخ\s+([0-9\-\/]+)", date_any),
+    publication_date=(r"نشر\s+بتاريخ\s+([0-9\-\/]+)", date_any),
+    effective_date=(r"يعمل\s+به\s+إ?عتبارا\s+من\s+([0-9\-\/]+)", date_any),
+    title=(r"بشأن\s+(.+)$", str.strip),
+)
+
+_ART_HEADER = re.compile(r"^(?:المادة|مادة)\s+(\d+)(?:\s+(اصدار|مكرر))?$")
+_FINAL_DATE = re.compile(r"(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2})")
+
+
+def parse_law(path: str | DocxDocument):
+    return parse_law_paragraphs(as_document(path).paragraphs())
+
+
+def parse_law_paragraphs(paras):
+    # paragraphs arrive stripped and non-empty; only the header is held in memory
+    paras = iter(paras)
+    head = list(islice(paras, 20))
+    if not head:
+        return Law(), []
+
+    title_line = head[0]
     gazette = None
-    subject = None
 
     # البحث عن "الجريدة الرسمية" وفصلها عن العنوان
-    gazette_match = re.search(r"(الجريدة الرسمية.*?)(\d.*)", title_line)
+    gazette_match = _GAZETTE.search(title_line)
     if gazette_match:
         gazette = gazette_match.group(0)
         title_line = title_line.replace(gazette, "").strip()
 
     # استخراج البيانات الخاصة بالقانون
-    law_number = None
-    law_year = None
-    issue_date = None
-    publication_date = None
-    effective_date = None
-
-    m = re.search(r"قانون\s*-\s*رقم\s*(\d+)", title_line)
-    if m:
-        law_number = int(m.group(1))
-
-    m = re.search(r"لسنة\s*(\d{4})", title_line)
-    if m:
-        law_year = int(m.group(1))
-
-    m = re.search(r"الصادر\s+بتاريخ\s+([0-9\-\/]+)", title_line)
-    if m:
-        issue_date = _date_any(m.group(1))
-
-    m = re.search(r"نشر\s+بتاريخ\s+([0-9\-\/]+)", title_line)
-    if m:
-        publication_date = _date_any(m.group(1))
-
-    m = re.search(r"يعمل\s+به\s+إ?عتبارا\s+من\s+([0-9\-\/]+)", title_line)
-    if m:
-        effective_date = _date_any(m.group(1))
-
-    m = re.search(r"بشأن\s+(.+)$", title_line)
-    if m:
-        subject = m.group(1).strip()
-
-    if not subject:
-        for p in paras[:20]:
+    law = Law(**LAW_HEADER.extract(title_line))
+
+    if not law.title:
+        for p in head:
             if p.startswith("بشأن"):
-                subject = p.replace("بشأن", "", 1).strip()
+                law.title = p.replace("بشأن", "", 1).strip()
                 break
 
-    law = {
-        "law_number": law_number,
-        "law_year": law_year,
-        "issue_date": issue_date,
-        "publication_date": publication_date,
-        "effective_date": effective_date,
-        "title": subject,
-        "gazette_reference": gazette,
-    }
+    law.gazette_reference = gazette
 
     articles = []
     current = None
+    # an article's text is collected as parts and joined once, when it closes
+    original_parts = None
+    final_parts = []
 
     def flush():
         nonlocal current
-        if current:
-            for k in ["original_text", "final_text"]:
-                if current.get(k):
-                    current[k] = current[k].strip()
+        if current is not None:
+            if original_parts is not None:
+                current.original_text = " ".join(original_parts)
+            current.final_text = " ".join(final_parts)
             articles.append(current)
             current = None
- 
-    art_header = re.compile(r"^(?:المادة|مادة)\s+(\d+)(?:\s+(اصدار|مكرر))?$")
 
-    for p in paras:
+    for p in chain(head, paras):
         
         if p.strip() == "مواد إصدار":
             continue
 
-        m = art_header.match(p.strip())
+        m = _ART_HEADER.match(p.strip())
         if m:
             flush()
             num = m.group(1)
@@ -110,36 +79,37 @@ def parse_law(path: str):
             is_repeated = (tag == "مكرر")
             article_type = "issuance" if tag == "اصدار" else "content"
 
-            current = {
-                "article_number": num,
-                "article_type": article_type,
-                "is_repeated": bool(is_repeated),
-                "original_text": None,
-                "final_text": "",
-                "final_text_date": None,
-            }
+            current = LawArticle(
+                article_number=num,
+                article_type=article_type,
+                is_repeated=bool(is_repeated),
+                final_text="",
+            )
+            original_parts = None
+            final_parts = []
             continue
 
-        if not current:
+        if current is None:
             continue
 
          
         if "النص النهائى للمادة بتاريخ" in p:
-            dm = re.search(r"(\d{1,2}/\d{1,2}/\d{4}|\d{4}-\d{2}-\d{2})", p)
+            dm = _FINAL_DATE.search(p)
             if dm:
-                current["final_text_date"] = _date_any(dm.group(1))
+                current.final_text_date = date_any(dm.group(1))
             continue
 
          
         if p.startswith("النص الاصلى للمادة"):
             txt = p.replace("النص الاصلى للمادة", "", 1).strip()
-            current["original_text"] = (current["original_text"] or "")
-            current["original_text"] = (
-                current["original_text"] + " " + txt).strip()
+            if original_parts is None:
+                original_parts = []
+            if txt:
+                original_parts.append(txt)
             continue
 
 
-        current["final_text"] = (current["final_text"] + " " + p).strip()
+        final_parts.append(p)
 
     flush()
     return law, articles
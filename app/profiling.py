@@ -0,0 +1,216 @@
+"""
+Opt-in per-stage timing for the export pipeline (export_all_clean_json.py --profile).
+
+Stages, per file: read (file -> bytes), hash (sha256), inflate (zip member
+reads), xml (iterparse, inflate excluded), header (HeaderRules regexes), parse
+(the parser body, everything above excluded), json (serialising the record).
+
+Off by default. Instrumented code checks `active` once per document, or per
+stage call, and does nothing else; per-paragraph timing is only wired in
+while a file is being profiled.
+"""
+import io
+import os
+import math
+import time
+from contextlib import nullcontext
+
+STAGES = ("read", "hash", "inflate", "xml", "header", "parse", "json")
+
+enabled = False
+# FileProfile of the file this process is working on; None when profiling is off
+active = None
+
+_NULL = nullcontext()
+
+
+def enable():
+    # also the pool initializer, so worker processes profile too
+    global enabled
+    enabled = True
+
+
+class FileProfile:
+    __slots__ = ("path", "doc_type", "wall", "cpu")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.doc_type = None
+        self.wall = {}
+        self.cpu = {}
+
+    def add(self, name: str, wall: float, cpu: float):
+        self.wall[name] = self.wall.get(name, 0.0) + wall
+        self.cpu[name] = self.cpu.get(name, 0.0) + cpu
+
+    def stage(self, name: str):
+        return _Stage(self, name)
+
+    def finish(self) -> dict:
+        # make stages exclusive: xml includes the inflate reads it triggers, and
+        # parse includes xml and header (xml is already net of inflate here)
+        for outer, inner in (("xml", ("inflate",)), ("parse", ("xml", "inflate", "header"))):
+            if outer in self.wall:
+                for part in (self.wall, self.cpu):
+                    part[outer] = max(0.0, part[outer] - sum(part.get(i, 0.0) for i in inner))
+        return {"doc_type": self.doc_type,
+                "stages": {s: [self.wall[s], self.cpu[s]] for s in STAGES if s in self.wall}}
+
+
+class _Stage:
+    __slots__ = ("prof", "name", "wall", "cpu")
+
+    def __init__(self, prof: FileProfile, name: str):
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def __exit__(self, *exc):
+        self.prof.add(self.name, time.perf_counter() - self.wall, time.process_time() - self.cpu)
+
+
+def begin(path: str):
+    global active
+    active = FileProfile(path) if enabled else None
+    return active
+
+
+def end():
+    """
+    Close the current file's profile -> {"doc_type", "stages": {stage: [wall, cpu]}} or None.
+    """
+    global active
+    prof, active = active, None
+    return prof.finish() if prof is not None else None
+
+
+def stage(name: str):
+    return active.stage(name) if active is not None else _NULL
+
+
+def timed_iter(it, name: str):
+    # time spent producing each item (paragraph), attributed to `name`
+    prof = active
+    clock, cpu = time.perf_counter, time.process_time
+    while True:
+        w, c = clock(), cpu()
+        try:
+            item = next(it)
+        except StopIteration:
+            prof.add(name, clock() - w, cpu() - c)
+            return
+        prof.add(name, clock() - w, cpu() - c)
+        yield item
+
+
+class TimedReader(io.RawIOBase):
+    """
+    File-object wrapper that attributes read() time to a stage (zip inflate).
+    """
+
+    def __init__(self, raw, name: str):
+        self.raw = raw
+        self.name = name
+        self.prof = active
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        w, c = time.perf_counter(), time.process_time()
+        data = self.raw.read(n)
+        self.prof.add(self.name, time.perf_counter() - w, time.process_time() - c)
+        return data
+
+
+def percentile(values: list[float], p: float) -> float:
+    # nearest rank on sorted values
+    if not values:
+        return 0.0
+    k = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return values[k]
+
+
+class Report:
+    """
+    Aggregates per-file profiles into percentiles per doc type and stage.
+    """
+
+    def __init__(self):
+        self.files = []     # (path, doc_type, total wall, stages)
+
+    def add(self, path: str, profile: dict | None):
+        if profile:
+            stages = profile["stages"]
+            total = sum(w for w, _ in stages.values())
+            self.files.append((path, profile["doc_type"] or "unknown", total, stages))
+
+    def slowest(self, n: int) -> list[tuple[str, float]]:
+        return [(f[0], f[2]) for f in sorted(self.files, key=lambda f: -f[2])[:n]]
+
+    def summary(self) -> dict:
+        out = {}
+        for doc_type in sorted({f[1] for f in self.files}) + ["all"]:
+            files = [f for f in self.files if doc_type in ("all", f[1])]
+            rows = {}
+            for s in STAGES:
+                walls = sorted(f[3][s][0] for f in files if s in f[3])
+                if not walls:
+                    continue
+                rows[s] = {
+                    "files": len(walls),
+                    "p50_ms": percentile(walls, 50) * 1000,
+                    "p90_ms": percentile(walls, 90) * 1000,
+                    "p99_ms": percentile(walls, 99) * 1000,
+                    "max_ms": walls[-1] * 1000,
+                    "total_s": sum(walls),
+                    "cpu_s": sum(f[3][s][1] for f in files if s in f[3]),
+                }
+            out[doc_type] = {"files": len(files), "total_s": sum(f[2] for f in files), "stages": rows}
+        return out
+
+    def render(self) -> str:
+        lines = []
+        for doc_type, group in self.summary().items():
+            total = group["total_s"] or 1e-9
+            lines.append(f"{doc_type}: {group['files']} files, {group['total_s']:.2f}s")
+            lines.append(f"  {'stage':<8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9} "
+                         f"{'total s':>8} {'cpu s':>8} {'share':>6}")
+            for s, r in group["stages"].items():
+                lines.append(f"  {s:<8} {r['p50_ms']:9.2f} {r['p90_ms']:9.2f} {r['p99_ms']:9.2f} "
+                             f"{r['max_ms']:9.2f} {r['total_s']:8.3f} {r['cpu_s']:8.3f} "
+                             f"{r['total_s'] / total:6.1%}")
+        return "\n".join(lines)
+
+
+def sample_profile(fn, path: str, out_dir: str, rank: int) -> str:
+    """
+    Re-run fn(path) under a sampling profiler (pyinstrument when installed,
+    cProfile otherwise) and write the report next to the others.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(out_dir, f"{rank:02d}_{stem}.txt")
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        prof.runcall(fn, path)
+        with open(out_path, "w", encoding="utf-8") as fp:
+            pstats.Stats(prof, stream=fp).sort_stats("cumulative").print_stats(40)
+        return out_path
+
+    prof = Profiler(interval=0.001)
+    prof.start()
+    try:
+        fn(path)
+    finally:
+        prof.stop()
+    with open(out_path, "w", encoding="utf-8") as fp:
+        fp.write(prof.output_text(unicode=True))
+    return out_path
@@ -0,0 +1,166 @@
+"""
+Parser output records: slotted dataclasses instead of one dict per document,
+article and principle (a law with thousands of articles holds thousands).
+
+Records still behave like the dicts they replace, so existing callers keep
+working: rec["title"], rec.get("title"), "title" in rec, dict(rec), {**rec},
+and == against a plain dict. json.dump takes them with default=to_jsonable.
+"""
+from dataclasses import dataclass, fields
+
+
+class Record:
+    """
+    Base of the record types: dict-style access on top of dataclass slots.
+    """
+    __slots__ = ()
+    FIELDS: tuple[str, ...] = ()   # set by @record, in JSON key order
+
+    @classmethod
+    def from_dict(cls, data: dict | None):
+        """
+        Build from a parsed/exported dict; unknown keys are ignored, missing ones are None.
+        """
+        if isinstance(data, cls):
+            return data
+        get = (data or {}).get
+        return cls(*[get(f) for f in cls.FIELDS])
+
+    def to_dict(self) -> dict:
+        return {f: getattr(self, f) for f in self.FIELDS}
+
+    # --- dict compatibility -------------------------------------------------
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def values(self):
+        return [getattr(self, f) for f in self.FIELDS]
+
+    def items(self):
+        return [(f, getattr(self, f)) for f in self.FIELDS]
+
+    def __contains__(self, key) -> bool:
+        return key in self.FIELDS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __bool__(self) -> bool:
+        # an all-empty record counts as empty, like the {} parsers used to return
+        return any(getattr(self, f) is not None for f in self.FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    # compact pickling (records cross process pools)
+    def __getstate__(self):
+        return tuple(getattr(self, f) for f in self.FIELDS)
+
+    def __setstate__(self, state):
+        for f, v in zip(self.FIELDS, state):
+            setattr(self, f, v)
+
+
+def record(cls):
+    """
+    Class decorator: a slotted dataclass whose fields (all defaulting to None) are its FIELDS.
+    """
+    cls = dataclass(slots=True, eq=False)(cls)
+    cls.FIELDS = tuple(f.name for f in fields(cls))
+    return cls
+
+
+@record
+class Law(Record):
+    """Law header fields (parse_law)."""
+    law_number: int | None = None
+    law_year: int | None = None
+    issue_date: str | None = None
+    publication_date: str | None = None
+    effective_date: str | None = None
+    title: str | None = None
+    gazette_reference: str | None = None
+
+
+@record
+class LawArticle(Record):
+    """One article of a law (parse_law)."""
+    article_number: str | None = None
+    article_type: str | None = None          # "issuance" | "content"
+    is_repeated: bool | None = None
+    original_text: str | None = None
+    final_text: str | None = None
+    final_text_date: str | None = None
+
+
+@record
+class Judgment(Record):
+    """Court ruling fields (parse_judgment)."""
+    court_name: str | None = None
+    case_type: str | None = None
+    appeal_number: int | None = None
+    judicial_year: int | None = None
+    session_date: str | None = None
+    technical_office_number: str | None = None
+    volume_number: str | None = None
+    page_number: str | None = None
+    rule_number: str | None = None
+    reference_number: str | None = None
+    judicial_panel: str | None = None
+    facts: str | None = None
+    reasons: str | None = None
+
+
+@record
+class Fatwa(Record):
+    """Fatwa fields (parse_fatwa)."""
+    fatwa_number: int | None = None
+    fatwa_year: int | None = None
+    issued_date: str | None = None
+    session_date: str | None = None
+    file_number: str | None = None
+    authority: str | None = None
+    subject: str | None = None
+    facts: str | None = None
+    application: str | None = None
+    opinion: str | None = None
+
+
+@record
+class Principle(Record):
+    """A numbered principle of a judgment or fatwa."""
+    principle_number: int | None = None
+    principle_text: str | None = None
+
+
+def to_jsonable(obj):
+    """
+    json.dump(..., default=to_jsonable): records serialise as their dicts.
+    """
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
@@ -0,0 +1,68 @@
+import re
+
+from app import profiling
+
+
+def date_any(s: str):
+    """
+    YYYY-MM-DD, DD/MM/YYYY or DD-MM-YYYY -> ISO date string, else None.
+    """
+    if not s:
+        return None
+    m = _ISO.search(s)
+    if m:
+        return m.group(0)
+    m = _DMY.search(s)
+    if m:
+        d, _, mo, y = m.groups()
+        return f"{y}-{int(mo):02d}-{int(d):02d}"
+    return None
+
+
+_ISO = re.compile(r"\d{4}-\d{2}-\d{2}")
+_DMY = re.compile(r"(\d{1,2})([/-])(\d{1,2})\2(\d{4})")
+
+
+def as_int(s: str):
+    return int(s)
+
+
+def as_str(s: str):
+    return s.strip()
+
+
+class HeaderRules:
+    """
+    Declarative header fields, compiled once at import:
+
+        RULES = HeaderRules(
+            appeal_number=(r"الطعن\\s+رقم\\s+(\\d+)", as_int),
+            session_date=(r"تاريخ\\s+الجلسة\\s+([0-9/]+)", date_any),
+        )
+        RULES.extract(header_text) -> {"appeal_number": 1784, "session_date": ...}
+
+    Each pattern has exactly one capture group and is searched on its own, so
+    every field takes its first match in the text, whatever the other fields
+    match (a greedy title may run over the dates that follow it).
+    """
+
+    def __init__(self, **fields):
+        self.rules = []
+        for name, (pattern, convert) in fields.items():
+            compiled = re.compile(pattern)
+            if compiled.groups != 1:
+                raise ValueError(f"header rule {name!r} needs exactly one capture group")
+            self.rules.append((name, compiled.search, convert))
+
+    def extract(self, text: str) -> dict:
+        if profiling.active is not None:
+            with profiling.active.stage("header"):
+                return self._extract(text)
+        return self._extract(text)
+
+    def _extract(self, text: str) -> dict:
+        out = {}
+        for name, search, convert in self.rules:
+            m = search(text)
+            out[name] = convert(m.group(1)) if m else None
+        return out
@@ -13,7 +13,19 @@ CREATE TABLE dbo.Law (
     publication_date DATE NULL,
     effective_date DATE NULL,
     title NVARCHAR(MAX) NOT NULL,
-    gazette_reference NVARCHAR(MAX) NULL
+    gazette_reference NVARCHAR(MAX) NULL,
+
+    -- change validators for conditional GET (ETag / Last-Modified)
+    row_version ROWVERSION,
+    updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_Law_UpdatedAt DEFAULT SYSUTCDATETIME(),
+
+    -- source DOCX hash + parser version of the last load; unchanged documents are skipped
+    source_sha256 CHAR(64) NULL,
+    parser_version NVARCHAR(20) NULL,
+
+    -- normalized shadow columns (app/arabic.py), filled by the loaders for search
+    title_norm NVARCHAR(MAX) NULL,
+    gazette_reference_norm NVARCHAR(MAX) NULL
 );
 
 CREATE TABLE dbo.Law_Article (
@@ -28,6 +40,9 @@ CREATE TABLE dbo.Law_Article (
     final_text NVARCHAR(MAX) NULL,
     final_text_date DATE NULL,
 
+    -- sha256 of the row's loaded values; loaders diff on it instead of rewriting
+    content_hash BINARY(32) NULL,
+
     CONSTRAINT FK_Law_Article_Law
         FOREIGN KEY (law_id)
         REFERENCES dbo.Law(law_id)
@@ -52,7 +67,21 @@ CREATE TABLE dbo.Fatwa (
     file_number NVARCHAR(50) NULL,
     facts NVARCHAR(MAX) NULL,
     application NVARCHAR(MAX) NULL,
-    opinion NVARCHAR(MAX) NULL
+    opinion NVARCHAR(MAX) NULL,
+
+    -- change validators for conditional GET (ETag / Last-Modified)
+    row_version ROWVERSION,
+    updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_Fatwa_UpdatedAt DEFAULT SYSUTCDATETIME(),
+
+    -- source DOCX hash + parser version of the last load; unchanged documents are skipped
+    source_sha256 CHAR(64) NULL,
+    parser_version NVARCHAR(20) NULL,
+
+    -- normalized shadow columns (app/arabic.py), filled by the loaders for search
+    subject_norm NVARCHAR(MAX) NULL,
+    authority_norm NVARCHAR(MAX) NULL,
+    facts_norm NVARCHAR(MAX) NULL,
+    opinion_norm NVARCHAR(MAX) NULL
 );
 
 CREATE TABLE dbo.Fatwa_Principle (
@@ -62,6 +91,9 @@ CREATE TABLE dbo.Fatwa_Principle (
     principle_number INT NULL,
     principle_text NVARCHAR(MAX) NULL,
 
+    -- sha256 of the row's loaded values; loaders diff on it instead of rewriting
+    content_hash BINARY(32) NULL,
+
     CONSTRAINT FK_Fatwa_Principle_Fatwa
         FOREIGN KEY (fatwa_id)
         REFERENCES dbo.Fatwa(fatwa_id)
@@ -84,7 +116,20 @@ CREATE TABLE dbo.Judgment (
 
     judicial_panel NVARCHAR(MAX) NULL,
     facts NVARCHAR(MAX) NULL,
-    reasons NVARCHAR(MAX) NULL
+    reasons NVARCHAR(MAX) NULL,
+
+    -- change validators for conditional GET (ETag / Last-Modified)
+    row_version ROWVERSION,
+    updated_at DATETIME2(0) NOT NULL CONSTRAINT DF_Judgment_UpdatedAt DEFAULT SYSUTCDATETIME(),
+
+    -- source DOCX hash + parser version of the last load; unchanged documents are skipped
+    source_sha256 CHAR(64) NULL,
+    parser_version NVARCHAR(20) NULL,
+
+    -- normalized shadow columns (app/arabic.py), filled by the loaders for search
+    court_name_norm NVARCHAR(MAX) NULL,
+    facts_norm NVARCHAR(MAX) NULL,
+    reasons_norm NVARCHAR(MAX) NULL
 );
 
 CREATE TABLE dbo.Judgment_Principle (
@@ -94,6 +139,9 @@ CREATE TABLE dbo.Judgment_Principle (
     principle_number INT NULL,
     principle_text NVARCHAR(MAX) NULL,
 
+    -- sha256 of the row's loaded values; loaders diff on it instead of rewriting
+    content_hash BINARY(32) NULL,
+
     CONSTRAINT FK_Judgment_Principle_Judgment
         FOREIGN KEY (judgment_id)
         REFERENCES dbo.Judgment(judgment_id)
@@ -112,3 +160,20 @@ WHERE appeal_number IS NOT NULL AND judicial_year IS NOT NULL AND session_date I
 CREATE UNIQUE INDEX UX_Fatwa_NumberYear
 ON dbo.Fatwa(fatwa_number, fatwa_year)
 WHERE fatwa_number IS NOT NULL AND fatwa_year IS NOT NULL;
+
+-- Keyset pagination by date (newest first); id order uses the clustered PK
+CREATE INDEX IX_Judgment_SessionDate
+ON dbo.Judgment(session_date DESC, judgment_id DESC);
+
+CREATE INDEX IX_Fatwa_IssuedDate
+ON dbo.Fatwa(issued_date DESC, fatwa_id DESC);
+
+CREATE INDEX IX_Law_IssueDate
+ON dbo.Law(issue_date DESC, law_id DESC);
+
+-- Child sync reads (id, key, content_hash) per parent; keep that read index-only
+CREATE INDEX IX_Judgment_Principle_Judgment
+ON dbo.Judgment_Principle(judgment_id, principle_number) INCLUDE (content_hash);
+
+CREATE INDEX IX_Fatwa_Principle_Fatwa
+ON dbo.Fatwa_Principle(fatwa_id, principle_number) INCLUDE (content_hash);
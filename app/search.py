@@ -0,0 +1,271 @@
+import re
+import math
+import threading
+from collections import defaultdict
+
+from app.arabic import normalize_ar
+
+# ------------------------- Arabic-aware tokenization -------------------------
+
+_TOKEN = re.compile(r"\w+")
+
+# definite article (optionally with a clinging preposition/conjunction)
+_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+
+def _stem(tok: str) -> str:
+    for pre in _PREFIXES:
+        if tok.startswith(pre) and len(tok) - len(pre) >= 3:
+            return tok[len(pre):]
+    return tok
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split Arabic/Latin text into search terms: diacritics and tatweel removed,
+    alef/yaa/taa-marbuta variants folded, definite article stripped.
+    """
+    if not text:
+        return []
+    return [_stem(t) for t in _TOKEN.findall(normalize_ar(text))]
+
+
+def parse_query(q: str):
+    """
+    Split a query into (terms, phrases). Quoted parts are phrases: "مبدأ رقم".
+    """
+    terms = []
+    phrases = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\S+)', q or ""):
+        if phrase:
+            toks = tokenize(phrase)
+            if len(toks) > 1:
+                phrases.append(toks)
+            else:
+                terms.extend(toks)
+        else:
+            terms.extend(tokenize(word))
+    return terms, phrases
+
+
+# ------------------------- inverted index -------------------------
+
+class SearchIndex:
+    """
+    In-memory positional inverted index with BM25 ranking.
+
+    - bare terms are OR-ed and ranked by BM25
+    - quoted phrases must match (consecutive positions within one field)
+
+    Documents can be added again (replacing the old text) and removed while the
+    index is searched; version counts the changes, so cached results can tell
+    they are stale. high_water is the row_version a refresh continues from.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)   # term -> {doc_id: [positions]}
+        self._lengths = {}                    # doc_id -> number of tokens
+        self._terms = {}                      # doc_id -> its distinct terms
+        self._total_len = 0
+        self._lock = threading.Lock()
+        self.version = 0
+        self.high_water = None
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def ids(self) -> set[int]:
+        with self._lock:
+            return set(self._lengths)
+
+    def add(self, doc_id: int, *fields: str | None):
+        toks = [tokenize(text) for text in fields]
+        with self._lock:
+            self._remove(doc_id)
+            self._add(doc_id, toks)
+            self.version += 1
+
+    def remove(self, doc_id: int):
+        with self._lock:
+            if self._remove(doc_id):
+                self.version += 1
+
+    def _add(self, doc_id: int, fields: list[list[str]]):
+        pos = 0
+        length = 0
+        for toks in fields:
+            for tok in toks:
+                self._postings[tok].setdefault(doc_id, []).append(pos)
+                pos += 1
+                length += 1
+            # leave a hole so a phrase never spans two fields
+            pos += 1
+        self._lengths[doc_id] = length
+        self._terms[doc_id] = tuple({tok for toks in fields for tok in toks})
+        self._total_len += length
+
+    def _remove(self, doc_id: int) -> bool:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return False
+        self._total_len -= length
+        for tok in self._terms.pop(doc_id):
+            postings = self._postings[tok]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[tok]
+        return True
+
+    def stats(self) -> dict:
+        return {"documents": len(self._lengths), "terms": len(self._postings),
+                "version": self.version}
+
+    def search(self, q: str, limit: int = 100) -> list[tuple[int, float]]:
+        """
+        Return [(doc_id, score)] ordered by relevance (best first).
+        """
+        terms, phrases = parse_query(q)
+        with self._lock:
+            return self._search(terms, phrases, limit)
+
+    def _search(self, terms: list[str], phrases: list[list[str]], limit: int):
+        if not terms and not phrases or not self._lengths:
+            return []
+
+        scores = defaultdict(float)
+
+        if phrases:
+            candidates = None
+            for toks in phrases:
+                matched = {}
+                for doc_id in self._docs_with_all(toks):
+                    tf = self._phrase_tf(doc_id, toks)
+                    if tf:
+                        matched[doc_id] = tf
+                candidates = set(matched) if candidates is None else candidates & set(matched)
+                idf = sum(self._idf(t) for t in toks)
+                for doc_id, tf in matched.items():
+                    scores[doc_id] += self._bm25(idf, tf, doc_id)
+            # phrases are required
+            scores = defaultdict(float, {d: s for d, s in scores.items() if d in candidates})
+        else:
+            candidates = None
+
+        for t in set(terms):
+            postings = self._postings.get(t)
+            if not postings:
+                continue
+            idf = self._idf(t)
+            for doc_id, positions in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                scores[doc_id] += self._bm25(idf, len(positions), doc_id)
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], -kv[0]))
+        return ranked[:limit]
+
+    # ------------------------- internals -------------------------
+
+    def _idf(self, term: str) -> float:
+        n = len(self._lengths)
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _bm25(self, idf: float, tf: int, doc_id: int) -> float:
+        avgdl = self._total_len / len(self._lengths) or 1
+        norm = 1 - self.b + self.b * self._lengths[doc_id] / avgdl
+        return idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+
+    def _docs_with_all(self, toks: list[str]):
+        lists = [self._postings.get(t) for t in toks]
+        if not all(lists):
+            return set()
+        lists.sort(key=len)
+        docs = set(lists[0])
+        for p in lists[1:]:
+            docs &= p.keys()
+        return docs
+
+    def _phrase_tf(self, doc_id: int, toks: list[str]) -> int:
+        first = self._postings[toks[0]][doc_id]
+        rest = [set(self._postings[t][doc_id]) for t in toks[1:]]
+        return sum(
+            1 for p in first
+            if all(p + i + 1 in s for i, s in enumerate(rest))
+        )
+
+
+# ------------------------- building from the database -------------------------
+
+# collection -> (table, id column, searchable columns)
+# *_norm are the normalized shadow columns filled by the loaders (app/arabic.py)
+COLLECTIONS = {
+    "judgments": ("dbo.Judgment", "judgment_id",
+                  ["reference_number", "court_name_norm", "facts_norm", "reasons_norm"]),
+    "fatwas": ("dbo.Fatwa", "fatwa_id",
+               ["subject_norm", "authority_norm", "facts_norm", "opinion_norm"]),
+    "laws": ("dbo.Law", "law_id",
+             ["title_norm", "gazette_reference_norm"]),
+}
+
+
+def build_index(cur, collection: str, batch_size: int = 500) -> SearchIndex:
+    """
+    Stream a table through the cursor in batches and index its text columns.
+    """
+    table, id_col, cols = COLLECTIONS[collection]
+    index = SearchIndex()
+    # rows written from here on are picked up by the next refresh_index
+    index.high_water = _min_active_rowversion(cur)
+    cur.execute(f"SELECT {id_col}, {', '.join(cols)} FROM {table}")
+    _add_rows(cur, index, batch_size)
+    return index
+
+
+def refresh_index(cur, collection: str, index: SearchIndex, batch_size: int = 500) -> int:
+    """
+    Bring an index up to date: re-index the rows whose row_version moved past
+    index.high_water and drop the ids no longer in the table. Returns the
+    number of rows re-indexed.
+
+    MIN_ACTIVE_ROWVERSION() bounds the scan, so a row written by a transaction
+    still open now is read by the next refresh instead of being skipped.
+    """
+    table, id_col, cols = COLLECTIONS[collection]
+    upper = _min_active_rowversion(cur)
+    cur.execute(
+        f"SELECT {id_col}, {', '.join(cols)} FROM {table} "
+        f"WHERE row_version >= ? AND row_version < ?",
+        index.high_water, upper
+    )
+    changed = _add_rows(cur, index, batch_size)
+
+    cur.execute(f"SELECT {id_col} FROM {table}")
+    live = set()
+    while True:
+        rows = cur.fetchmany(batch_size * 20)
+        if not rows:
+            break
+        live.update(int(r[0]) for r in rows)
+    for doc_id in index.ids() - live:
+        index.remove(doc_id)
+
+    index.high_water = upper
+    return changed
+
+
+def _min_active_rowversion(cur) -> bytes:
+    return bytes(cur.execute("SELECT MIN_ACTIVE_ROWVERSION()").fetchone()[0])
+
+
+def _add_rows(cur, index: SearchIndex, batch_size: int) -> int:
+    n = 0
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return n
+        for r in rows:
+            index.add(int(r[0]), *(str(v) if v is not None else None for v in r[1:]))
+        n += len(rows)
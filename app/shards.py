@@ -0,0 +1,165 @@
+import os
+import re
+import gzip
+import json
+import shutil
+
+from app.records import to_jsonable
+
+# One shard series per doc type: law-00001.ndjson[.gz], judgment-00001.ndjson[.gz], ...
+INDEX_NAME = "index.json"
+# a run writes here and moves its shards into the folder only when it closes
+STAGING_NAME = ".staging"
+_SHARD_RE = re.compile(r"^[a-z]+-\d{5}\.ndjson(\.gz)?$")
+
+
+class _Shard:
+    def __init__(self, out_dir: str, doc_type: str, seq: int, compress: bool):
+        self.doc_type = doc_type
+        self.name = f"{doc_type}-{seq:05d}.ndjson" + (".gz" if compress else "")
+        self.path = os.path.join(out_dir, self.name)
+        # written under .part and renamed on close: a crashed run never leaves a shard that looks complete
+        raw = open(self.path + ".part", "wb")
+        self.fp = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) if compress else raw
+        self._raw = raw
+        self.records = 0
+        self.bytes = 0
+
+    def close(self) -> dict:
+        self.fp.close()
+        self._raw.close()
+        os.replace(self.path + ".part", self.path)
+        return {"file": self.name, "doc_type": self.doc_type, "records": self.records,
+                "bytes": self.bytes, "stored_bytes": os.path.getsize(self.path)}
+
+
+class ShardWriter:
+    """
+    Writes records as NDJSON (one compact JSON object per line) into shards that
+    roll over at max_bytes of raw JSON, one series per doc_type, and an index
+    listing every shard.
+
+    Shards are staged in out_dir/.staging; the shard set the folder held before
+    stays readable until close() swaps the new one in, index last. A run that
+    fails (abort(), or an exception inside the with block) leaves it untouched.
+
+        with ShardWriter("json_shards", compress=True) as w:
+            w.write(record)
+    """
+
+    def __init__(self, out_dir: str, max_bytes: int = 256 * 1024 * 1024, compress: bool = False):
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self._open = {}     # doc_type -> _Shard
+        self._seq = {}
+        self._done = []
+        self.staging = os.path.join(out_dir, STAGING_NAME)
+        # left over by a run that crashed
+        shutil.rmtree(self.staging, ignore_errors=True)
+        os.makedirs(self.staging)
+
+    def write(self, record: dict):
+        doc_type = record.get("doc_type") or "unknown"
+        data = (json.dumps(record, ensure_ascii=False, separators=(",", ":"),
+                           default=to_jsonable) + "\n").encode("utf-8")
+
+        shard = self._open.get(doc_type)
+        if shard is not None and shard.records and shard.bytes + len(data) > self.max_bytes:
+            self._done.append(shard.close())
+            shard = None
+        if shard is None:
+            self._seq[doc_type] = self._seq.get(doc_type, 0) + 1
+            shard = self._open[doc_type] = _Shard(self.staging, doc_type, self._seq[doc_type], self.compress)
+
+        shard.fp.write(data)
+        shard.records += 1
+        shard.bytes += len(data)
+
+    def close(self) -> dict:
+        for shard in self._open.values():
+            self._done.append(shard.close())
+        self._open = {}
+        shards = sorted(self._done, key=lambda s: s["file"])
+        index = {
+            "format": "ndjson",
+            "compressed": self.compress,
+            "records": sum(s["records"] for s in shards),
+            "shards": shards,
+        }
+        with open(os.path.join(self.staging, INDEX_NAME), "w", encoding="utf-8") as fp:
+            json.dump(index, fp, ensure_ascii=False, indent=2)
+        self._swap_in(shards)
+        return index
+
+    def abort(self):
+        """
+        Drop this run's shards; the folder keeps the shard set it had.
+        """
+        for shard in self._open.values():
+            shard.fp.close()
+            shard._raw.close()
+        self._open = {}
+        shutil.rmtree(self.staging, ignore_errors=True)
+
+    def _swap_in(self, shards: list[dict]):
+        # the old index goes first and the new one comes last: while files move,
+        # the folder has no index, and shard_files refuses it instead of mixing sets
+        index_path = os.path.join(self.out_dir, INDEX_NAME)
+        if os.path.exists(index_path):
+            os.remove(index_path)
+        for name in os.listdir(self.out_dir):
+            if _SHARD_RE.match(name) or name.endswith((".ndjson.part", ".ndjson.gz.part")):
+                os.remove(os.path.join(self.out_dir, name))
+        for s in shards:
+            os.replace(os.path.join(self.staging, s["file"]), os.path.join(self.out_dir, s["file"]))
+        os.replace(os.path.join(self.staging, INDEX_NAME), index_path)
+        os.rmdir(self.staging)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def shard_files(path: str, doc_type: str | None = None) -> list[str]:
+    """
+    Shard paths, in name order, for a shard folder (read through its index) or a
+    single shard file. A folder without an index is an incomplete export (a run
+    that crashed while swapping its shards in) and is refused.
+    """
+    if os.path.isfile(path):
+        return [path]
+    index_path = os.path.join(path, INDEX_NAME)
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"{path} has no {INDEX_NAME}: not a complete shard export, "
+                                "run the exporter again")
+    with open(index_path, "r", encoding="utf-8") as fp:
+        shards = [(s["file"], s["doc_type"]) for s in json.load(fp)["shards"]]
+    return [os.path.join(path, name) for name, t in sorted(shards)
+            if doc_type is None or t == doc_type]
+
+
+def iter_records(path: str, doc_type: str | None = None, after: str | None = None):
+    """
+    Stream (label, record) from shards, one line at a time (constant memory).
+
+    label is "<shard file>:<line>" and sorts in stream order, so it can serve as
+    a resume point: records up to and including `after` are skipped unparsed.
+    """
+    after_file, after_line = (after.rsplit(":", 1) if after else (None, None))
+    for shard in shard_files(path, doc_type):
+        name = os.path.basename(shard)
+        if after_file is not None and name < after_file:
+            continue
+        skip_to = int(after_line) if name == after_file else -1
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(shard, "rt", encoding="utf-8") as fp:
+            for i, line in enumerate(fp):
+                if i <= skip_to or not line.strip():
+                    continue
+                yield f"{name}:{i:09d}", json.loads(line)
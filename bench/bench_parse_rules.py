@@ -0,0 +1,171 @@
+"""
+Benchmark: header fields through HeaderRules vs the inline re.search calls it replaced.
+
+    python bench/bench_parse_rules.py
+    python bench/bench_parse_rules.py --seconds 2
+
+The baseline is the current parsers with only the header step swapped back to
+one re.search(pattern_string, text) per field, as the parsers did before
+app/rules.py; everything else (heading dispatch, list-buffer text) is shared,
+so the numbers measure the engine alone. Reports the header step on its own and
+whole documents. Paragraphs are extracted once up front. Checks that both give
+identical output on every sample and on PARITY_CASES.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from app import parse_law, parse_judgment, parse_fatwa
+from app.docx_text import DocxDocument
+from export_all_clean_json import doc_type_of
+
+# doc type -> (parser module, header rules attribute, parse function)
+PARSERS = {
+    "law": (parse_law, "LAW_HEADER", parse_law.parse_law_paragraphs),
+    "judgment": (parse_judgment, "JUDGMENT_HEADER", parse_judgment.parse_judgment_paragraphs),
+    "fatwa": (parse_fatwa, "FATWA_HEADER", parse_fatwa.parse_fatwa_paragraphs),
+}
+
+# header layouts the samples do not cover; (doc type, paragraphs)
+PARITY_CASES = [
+    # dates after a greedy "بشأن ..." title must still be found
+    ("law", ["جمهورية مصر العربية - قانون - رقم 5 لسنة 2020 بشأن تنظيم العمل "
+             "الصادر بتاريخ 2020-03-01 نشر بتاريخ 2020-03-02", "المادة 1", "نص المادة"]),
+    ("law", ["جمهورية مصر العربية - قانون - رقم 7 لسنة 2019 بشأن تعديل بعض الأحكام "
+             "يعمل به إعتبارا من 2019-07-01", "المادة 1", "نص المادة"]),
+    # a field whose first occurrence sits inside the title, and appears again later
+    ("law", ["جمهورية مصر العربية - قانون - رقم 9 لسنة 2021 بشأن ما نشر بتاريخ 2020-01-01 "
+             "الصادر بتاريخ 2021-02-01 نشر بتاريخ 2021-02-03", "المادة 1", "نص المادة"]),
+    ("fatwa", ["جمهورية مصر العربية - الفتوى رقم 12 لسنة 2018 تاريخ الجلسة 2018-05-02 "
+               "بتاريخ 2018-06-01 رقم الملف 86/4/1", "الرأى", "نص الرأي"]),
+    ("judgment", ["جمهورية مصر العربية - محكمة النقض - مدني", "تاريخ الجلسة: 3 / 4 / 1990",
+                  "الطعن رقم 17 لسنة 55 ق", "الرقم المرجعي: 123", "الوقائع", "نص"]),
+]
+
+
+class InlineHeader:
+    """
+    The pre-engine header step: re.search with the pattern string, field by field.
+    """
+
+    def __init__(self, rules):
+        self.fields = [(name, search.__self__.pattern, convert)
+                       for name, search, convert in rules.rules]
+
+    def extract(self, text: str) -> dict:
+        out = {}
+        for name, pattern, convert in self.fields:
+            m = re.search(pattern, text)
+            out[name] = convert(m.group(1)) if m else None
+        return out
+
+
+class inline_headers:
+    """
+    Context manager: the parsers use InlineHeader while inside.
+    """
+
+    def __enter__(self):
+        self.saved = {}
+        for module, attr, _ in PARSERS.values():
+            self.saved[module] = getattr(module, attr)
+            setattr(module, attr, InlineHeader(self.saved[module]))
+
+    def __exit__(self, *exc):
+        for module, attr, _ in PARSERS.values():
+            setattr(module, attr, self.saved[module])
+
+
+def load_samples() -> dict[str, list[list[str]]]:
+    folder = os.path.join(os.path.dirname(ROOT), "legal_loader")
+    samples = {t: [] for t in PARSERS}
+    for n in sorted(os.listdir(folder)):
+        if n.endswith(".docx") and not n.startswith("~$"):
+            doc = DocxDocument(os.path.join(folder, n))
+            doc_type = doc_type_of(doc)
+            if doc_type in samples:
+                samples[doc_type].append(list(doc.paragraphs()))
+    return samples
+
+
+def per_second(fn, items: list, seconds: float) -> float:
+    # CPU time: steadier than wall time on a busy machine
+    n = 0
+    t0 = time.process_time()
+    deadline = t0 + seconds
+    while True:
+        for item in items:
+            fn(item)
+        n += len(items)
+        if time.process_time() >= deadline:
+            return n / (time.process_time() - t0)
+
+
+def compare(measure_old, measure_new, seconds: float, rounds: int = 5):
+    """
+    Best rate of each side over interleaved short rounds, so drift hits both alike.
+    """
+    old = new = 0.0
+    for _ in range(rounds):
+        old = max(old, measure_old(seconds / rounds))
+        new = max(new, measure_new(seconds / rounds))
+    return old, new
+
+
+def header_texts(doc_type: str, docs: list[list[str]]) -> list[str]:
+    # the text each parser hands to its HeaderRules
+    if doc_type == "judgment":
+        return ["\n".join(parse_judgment.clean(p) for p in paras[:12]) for paras in docs]
+    return [paras[0] for paras in docs]
+
+
+def run_all(docs: list[tuple[str, list[str]]]) -> list:
+    return [PARSERS[doc_type][2](paras) for doc_type, paras in docs]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--seconds", type=float, default=1.0,
+                    help="CPU time per measurement, split over interleaved rounds")
+    args = ap.parse_args()
+
+    samples = load_samples()
+    cases = [(t, paras) for t, docs in samples.items() for paras in docs] + PARITY_CASES
+    engine = run_all(cases)
+    with inline_headers():
+        inline = run_all(cases)
+    for (doc_type, paras), a, b in zip(cases, engine, inline):
+        if a != b:
+            print(f"MISMATCH: {doc_type} differs from the inline header searches: {paras[0]}")
+            sys.exit(1)
+    print(f"identical output on {sum(map(len, samples.values()))} samples "
+          f"and {len(PARITY_CASES)} parity cases")
+
+    for doc_type, docs in samples.items():
+        if not docs:
+            continue
+        module, attr, parse = PARSERS[doc_type]
+        rules = getattr(module, attr)
+        texts = header_texts(doc_type, docs)
+        inline = InlineHeader(rules)
+
+        def inline_docs(secs):
+            with inline_headers():
+                return per_second(parse, docs, secs)
+
+        old_h, new_h = compare(lambda secs: per_second(inline.extract, texts, secs),
+                               lambda secs: per_second(rules.extract, texts, secs), args.seconds)
+        old_d, new_d = compare(inline_docs, lambda secs: per_second(parse, docs, secs), args.seconds)
+        paras = sum(map(len, docs)) / len(docs)
+        print(f"  {doc_type:<9} ({paras:5.0f} paras/doc)  header {1e6 / old_h:6.1f} -> "
+              f"{1e6 / new_h:6.1f} us x{new_h / old_h:.2f}   document {1e6 / old_d:7.1f} -> "
+              f"{1e6 / new_d:7.1f} us x{new_d / old_d:.2f}")
+
+
+if __name__ == "__main__":
+    main()
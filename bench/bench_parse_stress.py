@@ -0,0 +1,140 @@
+"""
+Stress benchmark: parsing documents whose sections run to thousands of paragraphs.
+
+    python bench/bench_parse_stress.py
+    python bench/bench_parse_stress.py --sizes 1000 5000 10000 20000
+
+For each doc type a synthetic document is built with one huge section (a law
+article, judgment principle + facts, fatwa principle + opinion) of N paragraphs.
+The parsers collect list parts and join once, so the cost per paragraph must
+not grow with the section (the original parsers concatenated strings, which is
+quadratic). Prints us/paragraph per size, checks that the big section comes back
+whole at every size, and exits 1 if parsing scales worse than linearly
+(us/paragraph at the largest size above --max-growth x the smallest).
+"""
+import os
+import sys
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from app.parse_law import parse_law_paragraphs
+from app.parse_judgment import parse_judgment_paragraphs
+from app.parse_fatwa import parse_fatwa_paragraphs
+
+# a typical ~250 character paragraph of legal prose
+SENTENCE = ("ومن حيث إن المادة المشار إليها تنص على أنه لا يجوز للجهة الإدارية أن تتخذ "
+            "أي إجراء يمس المركز القانوني للموظف إلا بعد إخطاره وسماع أقواله، وأن "
+            "مخالفة ذلك يترتب عليها بطلان القرار الصادر في هذا الشأن")
+
+
+def body(n: int, tag: str) -> list[str]:
+    return [f"{SENTENCE} ({tag} {i})" for i in range(n)]
+
+
+def law_doc(n: int) -> list[str]:
+    return [
+        "جمهورية مصر العربية - قانون - رقم 1 لسنة 2022 الصادر بتاريخ 2022-01-26 بشأن قانون تجريبي",
+        "المادة 1",
+        "النص الاصلى للمادة " + SENTENCE,
+        *body(n, "فقرة"),
+        "المادة 2",
+        "نص قصير",
+    ]
+
+
+def judgment_doc(n: int) -> list[str]:
+    return [
+        "جمهورية مصر العربية - محكمة النقض - مدني",
+        "الطعن رقم 1 لسنة 54 ق",
+        "تاريخ الجلسة: 31 / 1 / 1990",
+        "المبادئ القانونية",
+        "مبدأ رقم 1",
+        *body(n, "مبدأ"),
+        "الوقائع",
+        *body(n, "واقعة"),
+        "الحيثيات",
+        "نص قصير",
+    ]
+
+
+def fatwa_doc(n: int) -> list[str]:
+    return [
+        "جمهورية مصر العربية - الفتوى رقم 1 لسنة 2020 بتاريخ 2020-01-27",
+        "مبدأ 1",
+        *body(n, "مبدأ"),
+        "الرأى",
+        *body(n, "رأي"),
+    ]
+
+
+# what the big sections must hold: every paragraph, in order, joined as the parser joins them
+def law_sections(n: int, parsed) -> bool:
+    _, articles = parsed
+    return len(articles) == 2 and articles[0].final_text == " ".join(body(n, "فقرة"))
+
+
+def judgment_sections(n: int, parsed) -> bool:
+    judgment, principles = parsed
+    return (len(principles) == 1 and principles[0].principle_text == " ".join(body(n, "مبدأ"))
+            and judgment.facts == "\n".join(body(n, "واقعة")))
+
+
+def fatwa_sections(n: int, parsed) -> bool:
+    fatwa, principles = parsed
+    return (len(principles) == 1 and principles[0].principle_text == " ".join(body(n, "مبدأ"))
+            and fatwa.opinion == " ".join(body(n, "رأي")))
+
+
+CASES = {
+    "law": (law_doc, law_sections, parse_law_paragraphs),
+    "judgment": (judgment_doc, judgment_sections, parse_judgment_paragraphs),
+    "fatwa": (fatwa_doc, fatwa_sections, parse_fatwa_paragraphs),
+}
+
+
+def timed(fn, paras: list[str], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(paras)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 2500, 5000, 10000],
+                    help="paragraphs in the big section")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--max-growth", type=float, default=3.0,
+                    help="allowed growth of us/paragraph from smallest to largest size")
+    args = ap.parse_args()
+    sizes = sorted(args.sizes)
+
+    failed = False
+    for doc_type, (make, sections_ok, parse) in CASES.items():
+        print(f"\n{doc_type}")
+        per_para = []
+        for n in sizes:
+            paras = make(n)
+            if not sections_ok(n, parse(paras)):
+                print(f"  MISMATCH at {n} paragraphs: the big section did not come back whole")
+                sys.exit(1)
+            t = timed(parse, paras, args.repeat)
+            per_para.append(t / len(paras))
+            print(f"  {n:>7} paras  {t * 1000:8.1f} ms ({t / len(paras) * 1e6:5.2f} us/para)")
+        growth = per_para[-1] / per_para[0]
+        print(f"  us/para growth {sizes[0]} -> {sizes[-1]}: x{growth:.2f}")
+        if growth > args.max_growth:
+            print(f"  FAIL: grows faster than linear (limit x{args.max_growth:g})")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Benchmark and regression suite for the DOCX -> record pipeline. Runs offline.
+
+    python bench/bench_suite.py                          # all types, 1 KB .. 50 MB
+    python bench/bench_suite.py --quick                  # 1 KB .. 1 MB
+    python bench/bench_suite.py --save-baseline bench/baseline.json
+    python bench/bench_suite.py --baseline bench/baseline.json     # exit 1 on regression
+
+1. Correctness: every sample in legal_loader/ must export exactly as its JSON
+   in json_clean_all/ (parser_version aside), and every synthetic document
+   (bench/docx_gen.py) must parse back to the header values and
+   article/principle counts it was generated with.
+2. Speed: each (doc type, size) case runs in a fresh process, repeated for at
+   least --min-seconds, and reports docs/s, MB/s of document.xml, peak RSS and
+   the time per stage: read (file -> bytes), hash (sha256), xml (inflate +
+   paragraphs, drained without keeping them), parse (parse_*_paragraphs over
+   a fresh paragraph stream, minus the xml time), json (json.dumps). No stage
+   holds the whole paragraph list, so peak RSS is what the exporter sees.
+
+A baseline is machine-specific: save one on the machine that will compare.
+A case regresses when docs/s drops, or peak RSS grows, by more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO = os.path.dirname(ROOT)
+sys.path.insert(0, REPO)
+sys.path.insert(0, ROOT)
+
+from app.docx_text import DocxDocument
+from app.records import to_jsonable
+from app.parse_law import parse_law_paragraphs
+from app.parse_judgment import parse_judgment_paragraphs
+from app.parse_fatwa import parse_fatwa_paragraphs
+from export_all_clean_json import build_record
+from docx_gen import write_docx
+
+PARSERS = {
+    "law": (parse_law_paragraphs, "articles"),
+    "judgment": (parse_judgment_paragraphs, "principles"),
+    "fatwa": (parse_fatwa_paragraphs, "principles"),
+}
+STAGES = ("read", "hash", "xml", "parse", "json")
+SIZES = ["1k", "100k", "1m", "10m", "50m"]
+QUICK_SIZES = ["1k", "100k", "1m"]
+
+
+def parse_size(s: str) -> int:
+    units = {"k": 1024, "m": 1024 * 1024}
+    s = s.lower()
+    return int(float(s[:-1]) * units[s[-1]]) if s[-1] in units else int(s)
+
+
+def peak_rss_mb():
+    # this process's peak resident set; None where neither source is available
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def check_expected(doc_type: str, fields: dict, children: list, expected: dict) -> list[str]:
+    errors = [f"{k}: got {fields.get(k)!r}, expected {v!r}"
+              for k, v in expected[doc_type].items() if fields.get(k) != v]
+    child_key = PARSERS[doc_type][1]
+    if len(children) != expected[child_key]:
+        errors.append(f"{child_key}: got {len(children)}, expected {expected[child_key]}")
+    return errors
+
+
+def run_case(path: str, doc_type: str, expected: dict, min_seconds: float) -> dict:
+    """
+    Runs in a fresh process: time every stage over repeated passes.
+    """
+    parse, child_key = PARSERS[doc_type]
+    totals = dict.fromkeys(STAGES, 0.0)
+    runs = 0
+    errors = []
+    started = time.perf_counter()
+    while runs == 0 or time.perf_counter() - started < min_seconds:
+        t0 = time.perf_counter()
+        doc = DocxDocument(path)
+        t1 = time.perf_counter()
+        sha = doc.sha256
+        t2 = time.perf_counter()
+        deque(doc.paragraphs(), maxlen=0)
+        t3 = time.perf_counter()
+        # parse streams like the exporter does; extraction is re-done, so the
+        # xml time just measured is taken out of the parse stage
+        fields, children = parse(doc.paragraphs())
+        t4 = time.perf_counter()
+        json.dumps({"source_file": doc.name, "sha256": sha, "doc_type": doc_type,
+                    doc_type: fields, child_key: children}, ensure_ascii=False, indent=2,
+                   default=to_jsonable)
+        t5 = time.perf_counter()
+        for stage, dt in zip(STAGES, (t1 - t0, t2 - t1, t3 - t2, max(t4 - t3 - (t3 - t2), 0.0), t5 - t4)):
+            totals[stage] += dt
+        if runs == 0:
+            errors = check_expected(doc_type, fields, children, expected)
+        runs += 1
+        del doc, fields, children
+    stages = {s: t / runs for s, t in totals.items()}
+    return {"runs": runs, "stages": stages, "seconds": sum(stages.values()),
+            "peak_rss_mb": peak_rss_mb(), "errors": errors}
+
+
+def check_samples() -> list[str]:
+    """
+    legal_loader/*.docx must export exactly as json_clean_all/*.json.
+    """
+    src = os.path.join(REPO, "legal_loader")
+    ref = os.path.join(REPO, "json_clean_all")
+    problems = []
+    checked = 0
+    for name in sorted(os.listdir(src)):
+        if not name.endswith(".docx") or name.startswith("~$"):
+            continue
+        ref_path = os.path.join(ref, os.path.splitext(name)[0] + ".json")
+        if not os.path.exists(ref_path):
+            continue
+        with open(ref_path, "r", encoding="utf-8") as fp:
+            expected = json.load(fp)
+        record = build_record(os.path.join(src, name))
+        # the reference files predate parser_version
+        record.pop("parser_version", None)
+        expected.pop("parser_version", None)
+        checked += 1
+        if record != expected:
+            diff = sorted(k for k in set(record) | set(expected) if record.get(k) != expected.get(k))
+            problems.append(f"{name}: differs from {os.path.basename(ref_path)} in {', '.join(diff)}")
+    print(f"samples: {checked} checked against json_clean_all/, {len(problems)} mismatched")
+    return problems
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for case, r in results.items():
+        base = baseline.get("cases", {}).get(case)
+        if base is None:
+            continue
+        if r["docs_per_s"] < base["docs_per_s"] * (1 - tolerance):
+            problems.append(f"{case}: {r['docs_per_s']:.1f} docs/s, baseline {base['docs_per_s']:.1f}")
+        if r["peak_rss_mb"] and base.get("peak_rss_mb") \
+                and r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tolerance):
+            problems.append(f"{case}: peak RSS {r['peak_rss_mb']:.0f} MB, "
+                            f"baseline {base['peak_rss_mb']:.0f} MB")
+    return problems
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--types", nargs="+", choices=list(PARSERS), default=list(PARSERS))
+    ap.add_argument("--sizes", nargs="+", default=None,
+                    help=f"document.xml sizes, e.g. 1k 2.5m (default {' '.join(SIZES)})")
+    ap.add_argument("--quick", action="store_true", help=f"sizes {' '.join(QUICK_SIZES)}")
+    ap.add_argument("--min-seconds", type=float, default=1.0, help="minimum time per case")
+    ap.add_argument("--work", help="keep generated documents in this folder (reused across runs)")
+    ap.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    ap.add_argument("--save-baseline", help="write this run's numbers as a baseline")
+    ap.add_argument("--tolerance", type=float, default=0.3,
+                    help="allowed slowdown / RSS growth vs the baseline (default %(default)s)")
+    args = ap.parse_args()
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+
+    problems = check_samples()
+
+    tmp = None
+    work = args.work
+    if work is None:
+        tmp = tempfile.TemporaryDirectory()
+        work = tmp.name
+    os.makedirs(work, exist_ok=True)
+
+    results = {}
+    print(f"\n{'case':<16} {'xml MB':>8} {'docx KB':>8} {'docs/s':>9} {'MB/s':>7} {'RSS MB':>7}  "
+          + " ".join(f"{s + ' ms':>9}" for s in STAGES))
+    try:
+        for doc_type in args.types:
+            for size in sizes:
+                case = f"{doc_type}-{size}"
+                path = os.path.join(work, f"{case}.docx")
+                facts = path + ".json"
+                if os.path.exists(path) and os.path.exists(facts):
+                    with open(facts, "r", encoding="utf-8") as fp:
+                        expected = json.load(fp)
+                else:
+                    expected = write_docx(path, doc_type, parse_size(size))
+                    with open(facts, "w", encoding="utf-8") as fp:
+                        json.dump(expected, fp)
+
+                # a fresh process per case, so peak RSS belongs to that case alone
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    r = pool.submit(run_case, path, doc_type, expected, args.min_seconds).result()
+
+                xml_mb = expected["xml_bytes"] / 1e6
+                r["docs_per_s"] = 1 / r["seconds"]
+                r["mb_per_s"] = xml_mb / r["seconds"]
+                results[case] = r
+                problems += [f"{case}: {e}" for e in r["errors"]]
+                rss = f"{r['peak_rss_mb']:7.0f}" if r["peak_rss_mb"] else "    n/a"
+                print(f"{case:<16} {xml_mb:8.2f} {os.path.getsize(path) / 1024:8.0f} "
+                      f"{r['docs_per_s']:9.1f} {r['mb_per_s']:7.1f} {rss}  "
+                      + " ".join(f"{r['stages'][s] * 1000:9.2f}" for s in STAGES))
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as fp:
+            json.dump({"cases": {c: {"docs_per_s": r["docs_per_s"], "peak_rss_mb": r["peak_rss_mb"]}
+                                 for c, r in results.items()}}, fp, indent=2)
+        print(f"\nbaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fp:
+            problems += compare(results, json.load(fp), args.tolerance)
+
+    if problems:
+        print(f"\nFAILED ({len(problems)}):")
+        for p in problems:
+            print("  - " + p)
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
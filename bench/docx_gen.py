@@ -0,0 +1,195 @@
+"""
+Synthetic Arabic legal DOCX files for the benchmarks, built from the heading
+vocabulary the parsers recognise (المادة N مكرر, مبدأ رقم, الوقائع, الحيثيات, الرأى, ...).
+
+    write_docx(path, "law", 10 * 1024 * 1024, seed=1) -> expected fields
+
+The document.xml is streamed into the zip, so even 50 MB documents are built
+in bounded memory. Runs are split and styled like Word output (bidi, fonts).
+The returned dict holds what a correct parse must find (header values, counts).
+"""
+import random
+from zipfile import ZipFile, ZIP_DEFLATED
+from xml.sax.saxutils import escape
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+DOC_HEAD = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<w:document xmlns:w="{W_NS}"><w:body>')
+DOC_TAIL = ('<w:sectPr><w:pgSz w:w="11906" w:h="16838"/><w:bidi/></w:sectPr>'
+            '</w:body></w:document>')
+
+_RPR = ('<w:rPr><w:rFonts w:ascii="Arial Unicode MS" w:hAnsi="Arial Unicode MS" w:cs="Arial"/>'
+        '<w:sz w:val="24"/><w:rtl/></w:rPr>')
+_RPR_BOLD = ('<w:rPr><w:rFonts w:ascii="Arial Unicode MS" w:hAnsi="Arial Unicode MS" w:cs="Arial"/>'
+             '<w:b/><w:sz w:val="28"/><w:rtl/></w:rPr>')
+
+SENTENCES = [
+    "ومن حيث إن المادة المشار إليها تنص على أنه لا يجوز للجهة الإدارية أن تتخذ أي إجراء يمس المركز القانوني للموظف",
+    "وحيث إن الطاعن ينعى على الحكم المطعون فيه الخطأ في تطبيق القانون والقصور في التسبيب",
+    "ولما كان ذلك وكان الحكم المطعون فيه قد خالف هذا النظر فإنه يكون معيبا بما يوجب نقضه",
+    "يعاقب بالحبس مدة لا تقل عن ستة أشهر وبغرامة لا تقل عن ألف جنيه ولا تزيد على خمسة آلاف جنيه",
+    "ويصدر بتنظيم ذلك قرار من الوزير المختص بعد أخذ رأي الجهات المعنية خلال ثلاثة أشهر من تاريخ العمل بهذا القانون",
+    "وقد استقر إفتاء الجمعية العمومية لقسمي الفتوى والتشريع على أن العبرة في تحديد طبيعة العلاقة هي بحقيقتها",
+    "الشركاء على الشيوع الذين يملكون ثلاثة أرباع المال الشائع حقهم في إجراء تغيير فيه يخرج عن حدود الإدارة المعتادة",
+    "وبناء على ما تقدم فإن المحكمة تقضي بقبول الطعن شكلا وفي الموضوع بنقض الحكم المطعون فيه والإحالة",
+]
+
+COURTS = ["محكمة النقض", "المحكمة الإدارية العليا", "محكمة استئناف القاهرة"]
+CASE_TYPES = ["مدني", "جنائي", "تجاري", "أحوال شخصية"]
+AUTHORITIES = ["وزارة المالية", "الهيئة العامة للتأمين الصحي", "محافظة الجيزة"]
+
+
+def _para(text: str, rng: random.Random, bold: bool = False) -> str:
+    # Word splits text into several runs (spell check, edits); so do we, sometimes
+    rpr = _RPR_BOLD if bold else _RPR
+    if len(text) > 40 and rng.random() < 0.3:
+        cut = rng.randrange(10, len(text) - 10)
+        runs = [text[:cut], text[cut:]]
+    else:
+        runs = [text]
+    body = "".join(f'<w:r>{rpr}<w:t xml:space="preserve">{escape(r)}</w:t></w:r>' for r in runs)
+    return f'<w:p><w:pPr><w:bidi/><w:jc w:val="both"/></w:pPr>{body}</w:p>'
+
+
+_WORDS = sorted({w for s in SENTENCES for w in s.split()})
+
+
+def _prose(rng: random.Random) -> str:
+    # a real sentence followed by shuffled legal vocabulary: compresses like real text
+    words = rng.choice(SENTENCES).split() + rng.choices(_WORDS, k=rng.randint(10, 60))
+    if rng.random() < 0.5:
+        words.insert(rng.randrange(len(words)), str(rng.randint(1, 2024)))
+    return " ".join(words) + "."
+
+
+def _date(rng: random.Random, year: int) -> tuple[str, str]:
+    d, m = rng.randint(1, 28), rng.randint(1, 12)
+    return f"{year}-{m:02d}-{d:02d}", f"{d}/{m}/{year}"
+
+
+def law_paragraphs(rng: random.Random, target: int, expected: dict, used):
+    number, year = rng.randint(1, 200), rng.randint(1950, 2024)
+    issued, _ = _date(rng, year)
+    published, _ = _date(rng, year)
+    expected["law"] = {"law_number": number, "law_year": year,
+                       "issue_date": issued, "publication_date": published}
+    yield (f"جمهورية مصر العربية - قانون - رقم {number} لسنة {year} الصادر بتاريخ {issued} "
+           f"نشر بتاريخ {published} بشأن تنظيم بعض أحكام الخدمة المدنية"), True
+
+    articles = 0
+    yield "مواد إصدار", True
+    for n in range(1, 4):
+        articles += 1
+        yield f"المادة {n} اصدار", True
+        yield _prose(rng), False
+    n = 0
+    while used() < target:
+        n += 1
+        tag = " مكرر" if rng.random() < 0.1 else ""
+        articles += 1
+        yield f"المادة {n}{tag}", True
+        if rng.random() < 0.3:
+            yield "النص الاصلى للمادة " + _prose(rng), False
+            yield f"النص النهائى للمادة بتاريخ {_date(rng, year + 1)[1]}", False
+        for _ in range(rng.randint(1, 5)):
+            yield _prose(rng), False
+    expected["articles"] = articles
+
+
+def judgment_paragraphs(rng: random.Random, target: int, expected: dict, used):
+    court, case_type = rng.choice(COURTS), rng.choice(CASE_TYPES)
+    appeal, year = rng.randint(100, 9999), rng.randint(30, 90)
+    iso, dmy = _date(rng, rng.randint(1970, 2020))
+    expected["judgment"] = {"court_name": court, "case_type": case_type, "appeal_number": appeal,
+                            "judicial_year": year, "session_date": iso}
+    yield f"جمهورية مصر العربية - {court} - {case_type}", True
+    yield f"الطعن رقم {appeal} لسنة {year} ق", False
+    yield f"تاريخ الجلسة: {dmy.replace('/', ' / ')}", False
+    yield f"مكتب فني {rng.randint(1, 60)} - رقم الجزء 1 - رقم الصفحة {rng.randint(1, 999)}", False
+    yield "الهيئة", True
+    yield "برئاسة السيد المستشار/ نائب رئيس المحكمة وعضوية السادة المستشارين", False
+
+    # a quarter of the size in principles, the rest in facts and reasons
+    principles = 0
+    yield "المبادئ القانونية", True
+    while used() < target // 4 or not principles:
+        principles += 1
+        yield f"مبدأ رقم {principles}", True
+        yield _prose(rng), False
+    expected["principles"] = principles
+    for heading in ("الوقائع", "الحيثيات"):
+        yield heading, True
+        while used() < target * (3 if heading == "الوقائع" else 4) // 4:
+            yield _prose(rng), False
+
+
+def fatwa_paragraphs(rng: random.Random, target: int, expected: dict, used):
+    number, year = rng.randint(1, 999), rng.randint(1950, 2024)
+    issued, _ = _date(rng, year)
+    session, _ = _date(rng, year)
+    expected["fatwa"] = {"fatwa_number": number, "fatwa_year": year,
+                         "issued_date": issued, "session_date": session}
+    yield (f"جمهورية مصر العربية - الفتوى رقم {number} لسنة {year} بتاريخ {issued} "
+           f"تاريخ الجلسة {session}"), True
+    yield "الجهة", True
+    yield rng.choice(AUTHORITIES), False
+    yield "موضوع الفتوى", True
+    yield _prose(rng), False
+
+    principles = 0
+    while used() < target // 4 or not principles:
+        principles += 1
+        yield f"مبدأ رقم {principles}", True
+        yield _prose(rng), False
+    expected["principles"] = principles
+    for heading in ("الوقائع", "التطبيق", "الرأى"):
+        yield heading, True
+        yield _prose(rng), False
+        while heading == "الوقائع" and used() < target:
+            yield _prose(rng), False
+
+
+GENERATORS = {"law": law_paragraphs, "judgment": judgment_paragraphs, "fatwa": fatwa_paragraphs}
+
+
+def write_docx(path: str, doc_type: str, target_bytes: int, seed: int = 0) -> dict:
+    """
+    Write a synthetic document of about target_bytes of document.xml.
+    Returns the expected parse facts plus "xml_bytes".
+    """
+    rng = random.Random(f"{doc_type}:{target_bytes}:{seed}")
+    expected = {"doc_type": doc_type}
+    size = len(DOC_HEAD) + len(DOC_TAIL)   # document.xml bytes so far; generators stop on it
+    with ZipFile(path, "w", ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", CONTENT_TYPES)
+        z.writestr("_rels/.rels", RELS)
+        with z.open("word/document.xml", "w", force_zip64=True) as out:
+            out.write(DOC_HEAD.encode("utf-8"))
+            buf = []
+            for text, bold in GENERATORS[doc_type](rng, target_bytes, expected, lambda: size):
+                p = _para(text, rng, bold).encode("utf-8")
+                buf.append(p)
+                size += len(p)
+                if len(buf) >= 1000:
+                    out.write(b"".join(buf))
+                    buf = []
+            out.write(b"".join(buf) + DOC_TAIL.encode("utf-8"))
+    expected["xml_bytes"] = size
+    return expected
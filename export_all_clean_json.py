@@ -1,22 +1,28 @@
 import os
+import sys
 import json
 import glob
-import hashlib
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 from app.parse_judgment import parse_judgment
 from app.parse_fatwa import parse_fatwa
 from app.parse_law import parse_law
+from app.shards import ShardWriter
+from app.docx_text import DocxDocument, as_document
+from app.records import to_jsonable
+from app import profiling
 
 INPUT_DIR = r"C:\Users\Menna\Downloads\SynQanun\legal_loader"
 OUT_DIR = r"json_clean_all"
+SHARD_DIR = r"json_shards"
 
+# Bump whenever parser output changes, so the next incremental run re-exports everything.
+PARSER_VERSION = "2"
 
-def sha256_file(path: str) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+# Lives in the output folder; the leading dot keeps it out of the loaders' *.json glob.
+MANIFEST_NAME = ".export_manifest.json"
 
 
 def doc_type_from_name(filename: str) -> str:
@@ -30,56 +36,367 @@ def doc_type_from_name(filename: str) -> str:
     return "unknown"
 
 
-def export_one(docx_path: str):
-    name = os.path.basename(docx_path)
-    doc_type = doc_type_from_name(name)
+def doc_type_of(doc: DocxDocument) -> str:
+    """
+    Type by file name, else from the first paragraph (only that much XML is parsed).
+    """
+    doc_type = doc_type_from_name(doc.name)
+    return doc_type if doc_type != "unknown" else doc.doc_type
+
+
+def out_path_for(docx_path: str, input_dir: str = INPUT_DIR, out_dir: str = OUT_DIR) -> str:
+    """
+    Deterministic output name: the path relative to the input folder, with
+    sub-folders joined by "__" (top-level files keep their plain name).
+    """
+    rel = os.path.relpath(docx_path, input_dir)
+    stem = os.path.splitext(rel)[0].replace(os.sep, "__")
+    return os.path.join(out_dir, stem + ".json")
+
+
+def load_manifest(out_dir: str) -> dict:
+    """
+    rel source path -> {size, mtime_ns, sha256, parser_version, out}
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as fp:
+        return json.load(fp).get("files", {})
+
+
+def save_manifest(out_dir: str, entries: dict):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump({"parser_version": PARSER_VERSION, "files": entries},
+                  fp, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def build_record(docx_path: str | DocxDocument, sha256: str | None = None) -> dict:
+    """
+    Parse one DOCX into the exported record (what export_one writes as JSON).
+    The file is read once; hash and parser share the bytes.
+    """
+    doc = as_document(docx_path)
+    name = doc.name
+    doc_type = doc_type_of(doc)
+    if profiling.active is not None:
+        profiling.active.doc_type = doc_type
 
     out = {
         "source_file": name,
-        "sha256": sha256_file(docx_path),
+        "sha256": sha256 or doc.sha256,
+        "parser_version": PARSER_VERSION,
         "doc_type": doc_type,
     }
 
     if doc_type == "judgment":
-        j, principles = parse_judgment(docx_path)
+        with profiling.stage("parse"):
+            j, principles = parse_judgment(doc)
         out["judgment"] = j
         out["principles"] = principles
 
     elif doc_type == "fatwa":
-        f, principles = parse_fatwa(docx_path)
+        with profiling.stage("parse"):
+            f, principles = parse_fatwa(doc)
         out["fatwa"] = f
         out["principles"] = principles
 
     elif doc_type == "law":
-        law, articles = parse_law(docx_path)
+        with profiling.stage("parse"):
+            law, articles = parse_law(doc)
         out["law"] = law
         out["articles"] = articles
 
     else:
         # لو ملف مش معروف اسمه، بنسيبه بس metadata عشان ما نطلعش نص خام
-        out["note"] = "unknown doc type by filename; rename file to include judgment/fatwa/law or حكم/فتوى/قانون"
+        out["note"] = "unknown doc type by filename and first paragraph; rename file to include judgment/fatwa/law or حكم/فتوى/قانون"
+
+    return out
+
+
+def write_record(record: dict, out_path: str):
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    with profiling.stage("json"), open(out_path, "w", encoding="utf-8") as fp:
+        json.dump(record, fp, ensure_ascii=False, indent=2, default=to_jsonable)
+
+
+def export_one(docx_path: str | DocxDocument, out_path: str | None = None,
+               sha256: str | None = None) -> str:
+    if out_path is None:
+        name = docx_path.name if isinstance(docx_path, DocxDocument) else os.path.basename(docx_path)
+        out_path = os.path.join(OUT_DIR, os.path.splitext(name)[0] + ".json")
+    write_record(build_record(docx_path, sha256), out_path)
+    return out_path
+
+
+def export_job(job: tuple[str, str, str | None]) -> dict:
+    """
+    Export one file and report the outcome instead of raising, so a bad
+    document never aborts the batch (runs inside pool workers).
+
+    known_sha is the hash recorded by the last run for the same parser version;
+    if the content still hashes to it the file is not parsed again.
+    """
+    docx_path, out_path, known_sha = job
+    t0 = time.perf_counter()
+    result = {"path": docx_path, "out": out_path, "bytes": 0,
+              "sha256": None, "status": "exported", "error": None}
+    profiling.begin(docx_path)
+    try:
+        with profiling.stage("read"):
+            doc = DocxDocument(docx_path)
+        result["bytes"] = doc.size
+        with profiling.stage("hash"):
+            result["sha256"] = doc.sha256
+        if known_sha is not None and result["sha256"] == known_sha and os.path.exists(out_path):
+            result["status"] = "unchanged"
+        else:
+            export_one(doc, out_path, result["sha256"])
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["profile"] = profiling.end()
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+def record_job(docx_path: str) -> dict:
+    """
+    Parse one file for the NDJSON shard export; like export_job, never raises.
+    """
+    t0 = time.perf_counter()
+    result = {"path": docx_path, "bytes": 0, "record": None, "error": None}
+    profiling.begin(docx_path)
+    try:
+        with profiling.stage("read"):
+            doc = DocxDocument(docx_path)
+        result["bytes"] = doc.size
+        with profiling.stage("hash"):
+            sha = doc.sha256
+        result["record"] = build_record(doc, sha)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["profile"] = profiling.end()
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
 
-    os.makedirs(OUT_DIR, exist_ok=True)
-    out_path = os.path.join(OUT_DIR, os.path.splitext(name)[0] + ".json")
+def _export_in_memory(docx_path: str):
+    # what one file costs, minus the disk write: the target for the sampling profiler
+    json.dumps(build_record(docx_path), ensure_ascii=False, indent=2, default=to_jsonable)
 
-    with open(out_path, "w", encoding="utf-8") as fp:
-        json.dump(out, fp, ensure_ascii=False, indent=2)
 
-    print("Saved:", out_path)
+def profile_report(report: profiling.Report, args):
+    """
+    Print the per-stage percentiles; optionally save them and sample-profile the slowest files.
+    """
+    print("\nPROFILE (wall time per file and stage)")
+    print(report.render())
+    if args.profile_out:
+        with open(args.profile_out, "w", encoding="utf-8") as fp:
+            json.dump({"summary": report.summary(),
+                       "files": [{"path": p, "doc_type": t, "seconds": total, "stages": stages}
+                                 for p, t, total, stages in report.files]},
+                      fp, ensure_ascii=False, indent=2)
+        print(f"profile written to {args.profile_out}")
+    for rank, (path, seconds) in enumerate(report.slowest(args.profile_slowest), 1):
+        out = profiling.sample_profile(_export_in_memory, path, args.profile_dir, rank)
+        print(f"slowest #{rank}: {path} ({seconds:.2f}s) -> {out}")
 
 
-def main():
-    files = glob.glob(os.path.join(INPUT_DIR, "**", "*.docx"), recursive=True)
+def export_shards(files: list[str], args) -> list[dict]:
+    """
+    Full export into NDJSON shards (no manifest: the shard set is rewritten every run).
+    Records are written in input order by this process; parsing can use a pool.
+    """
+    total = len(files)
+    failed = []
+    done_bytes = 0
+    t0 = time.perf_counter()
+
+    if args.workers > 1 and total > 1:
+        pool = ProcessPoolExecutor(max_workers=args.workers,
+                                   initializer=profiling.enable if args.profile else None)
+        results = pool.map(record_job, files, chunksize=1)
+    else:
+        pool = None
+        results = map(record_job, files)
+
+    report = profiling.Report()
+    writer = ShardWriter(args.out, int(args.shard_mb * 1024 * 1024), args.compress)
+    try:
+        for i, r in enumerate(results, 1):
+            done_bytes += r["bytes"]
+            if r["error"] is not None:
+                failed.append(r)
+                print(f"[{i}/{total}] FAILED {r['path']}: {r['error']}")
+                continue
+            report.add(r["path"], r["profile"])
+            writer.write(r["record"])
+            print(f"[{i}/{total}] Parsed: {r['path']} ({r['seconds']:.2f}s)")
+    except BaseException:
+        # the previous shard set stays in place
+        writer.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    # only a completed run replaces the shard set
+    index = writer.close()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"DONE. Output: {args.out} | {index['records']} records in {len(index['shards'])} shards, "
+        f"{len(failed)} failed "
+        f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} files/s, "
+        f"{done_bytes / 1e6 / elapsed if elapsed else 0:.2f} MB/s, workers={max(1, args.workers)})"
+    )
+    if args.profile:
+        profile_report(report, args)
+    return failed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Parse DOCX files into clean JSON.")
+    ap.add_argument("--input", default=INPUT_DIR, help="folder with .docx files (recursive)")
+    ap.add_argument("--out", default=None,
+                    help=f"output folder (default {OUT_DIR}, or {SHARD_DIR} with --format ndjson)")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="parse in N processes (default 1 = in-process, sequential)")
+    ap.add_argument("--full", action="store_true",
+                    help="ignore the manifest and re-export every file")
+    ap.add_argument("--prune", action="store_true",
+                    help="delete the JSON of source files that no longer exist")
+    ap.add_argument("--format", choices=("json", "ndjson"), default="json",
+                    help="json: one file per document (incremental); "
+                         "ndjson: size-rolled shards + index.json (full export)")
+    ap.add_argument("--shard-mb", type=float, default=256, help="ndjson shard size before rollover")
+    ap.add_argument("--compress", action="store_true", help="gzip the ndjson shards")
+    ap.add_argument("--profile", action="store_true",
+                    help="time every stage of every file and print percentiles per stage and doc type")
+    ap.add_argument("--profile-out", help="with --profile, also write per-file timings as JSON")
+    ap.add_argument("--profile-slowest", type=int, default=0, metavar="N",
+                    help="with --profile, re-run the N slowest files under a sampling profiler")
+    ap.add_argument("--profile-dir", default="profile_reports",
+                    help="where the sampling profiler reports go (default %(default)s)")
+    args = ap.parse_args(argv)
+    if args.profile:
+        profiling.enable()
+    if args.out is None:
+        args.out = SHARD_DIR if args.format == "ndjson" else OUT_DIR
+
+    files = glob.glob(os.path.join(args.input, "**", "*.docx"), recursive=True)
     files = [p for p in files if not os.path.basename(p).startswith("~$")]
 
     if not files:
-        print("No docx found in:", INPUT_DIR)
+        print("No docx found in:", args.input)
         return
 
+    if args.format == "ndjson":
+        failed = export_shards(sorted(files), args)
+        if failed:
+            print(f"{len(failed)} file(s) failed:")
+            for r in failed:
+                print(f"  - {r['path']}: {r['error']}")
+            sys.exit(1)
+        return
+
+    manifest = {} if args.full else load_manifest(args.out)
+    current = {}
+    jobs = []
+    skipped = 0
+
     for p in sorted(files):
-        export_one(p)
+        rel = os.path.relpath(p, args.input)
+        out_path = out_path_for(p, args.input, args.out)
+        st = os.stat(p)
+        current[rel] = (st.st_size, st.st_mtime_ns)
+        entry = manifest.get(rel)
+        same_parser = entry is not None and entry.get("parser_version") == PARSER_VERSION
+
+        # cheap stat check first: unchanged size + mtime -> not even hashed
+        if (same_parser and entry["size"] == st.st_size
+                and entry["mtime_ns"] == st.st_mtime_ns and os.path.exists(out_path)):
+            skipped += 1
+            continue
+
+        jobs.append((p, out_path, entry["sha256"] if same_parser else None))
+
+    deleted = sorted(set(manifest) - set(current))
+    for rel in deleted:
+        out_path = manifest[rel].get("out")
+        if args.prune and out_path and os.path.exists(out_path):
+            os.remove(out_path)
+            print(f"DELETED source {rel} -> removed {out_path}")
+        else:
+            print(f"DELETED source {rel} (output kept: {out_path}; use --prune to remove)")
+        del manifest[rel]
+
+    total = len(jobs)
+    failed = []
+    unchanged = 0
+    done_bytes = 0
+    t0 = time.perf_counter()
+
+    if args.workers > 1 and total > 1:
+        pool = ProcessPoolExecutor(max_workers=args.workers,
+                                   initializer=profiling.enable if args.profile else None)
+        # map() hands results back in input order -> ordered, deterministic progress
+        results = pool.map(export_job, jobs, chunksize=1)
+    else:
+        pool = None
+        results = map(export_job, jobs)
+
+    report = profiling.Report()
+    try:
+        for i, r in enumerate(results, 1):
+            done_bytes += r["bytes"]
+            rel = os.path.relpath(r["path"], args.input)
+            if r["status"] == "failed":
+                failed.append(r)
+                manifest.pop(rel, None)
+                print(f"[{i}/{total}] FAILED {r['path']}: {r['error']}")
+                continue
+            report.add(r["path"], r["profile"])
+
+            size, mtime_ns = current[rel]
+            manifest[rel] = {
+                "size": size,
+                "mtime_ns": mtime_ns,
+                "sha256": r["sha256"],
+                "parser_version": PARSER_VERSION,
+                "out": r["out"],
+            }
+            if r["status"] == "unchanged":
+                unchanged += 1
+                print(f"[{i}/{total}] Unchanged (touched only): {r['path']}")
+            else:
+                print(f"[{i}/{total}] Saved: {r['out']} ({r['seconds']:.2f}s)")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        save_manifest(args.out, manifest)
+
+    elapsed = time.perf_counter() - t0
+    exported = total - len(failed) - unchanged
+    print(
+        f"DONE. Output: {args.out} | {exported} exported, {unchanged} unchanged after hashing, "
+        f"{skipped} skipped by stat, {len(deleted)} deleted, {len(failed)} failed "
+        f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} files/s, "
+        f"{done_bytes / 1e6 / elapsed if elapsed else 0:.2f} MB/s, workers={max(1, args.workers)})"
+    )
+    if args.profile:
+        profile_report(report, args)
 
-    print("DONE. Output:", OUT_DIR)
+    if failed:
+        print(f"{len(failed)} file(s) failed:")
+        for r in failed:
+            print(f"  - {r['path']}: {r['error']}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,290 @@
+"""
+Columnar (Parquet) export of the parsed corpus, for analytics without the live DB.
+
+Writes five tables that join on doc_id, a stable 64-bit key derived from the
+source file name: the same document gets the same doc_id in every export, so
+tables from two exports join too (sha256 is a plain column: byte-identical
+sources share it, and it changes when a source is edited):
+
+    judgments.parquet   fatwas.parquet   laws.parquet
+    articles.parquet    (law articles, doc_id -> laws)
+    principles.parquet  (doc_type + doc_id -> judgments / fatwas)
+
+    python export_columnar.py --json json_clean_all --out corpus_parquet
+    python export_columnar.py --ndjson json_shards --out corpus_parquet
+    python export_columnar.py --docx legal_loader --workers 8 --out corpus_parquet
+
+Rows are buffered per table and flushed as Parquet row groups, so memory is
+bounded by --row-group, not by the corpus. Requires pyarrow (optional
+dependency: pip install pyarrow).
+"""
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+from collections import deque
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+
+from app.shards import iter_records as iter_shard_records
+from export_all_clean_json import record_job
+
+OUT_DIR = r"corpus_parquet"
+ROW_GROUP = 50_000
+
+# table -> [(column, arrow type name)]; converted with _to_int / _to_date / str as typed
+TABLES = {
+    "judgments": [
+        ("doc_id", "int64"), ("source_file", "string"), ("sha256", "string"),
+        ("parser_version", "string"),
+        ("court_name", "string"), ("case_type", "string"),
+        ("appeal_number", "int32"), ("judicial_year", "int32"), ("session_date", "date"),
+        ("technical_office_number", "string"), ("volume_number", "string"),
+        ("page_number", "string"), ("rule_number", "string"), ("reference_number", "string"),
+        ("judicial_panel", "string"), ("facts", "string"), ("reasons", "string"),
+        ("principle_count", "int32"),
+    ],
+    "fatwas": [
+        ("doc_id", "int64"), ("source_file", "string"), ("sha256", "string"),
+        ("parser_version", "string"),
+        ("fatwa_number", "int32"), ("fatwa_year", "int32"),
+        ("issued_date", "date"), ("session_date", "date"),
+        ("file_number", "string"), ("authority", "string"), ("subject", "string"),
+        ("facts", "string"), ("application", "string"), ("opinion", "string"),
+        ("principle_count", "int32"),
+    ],
+    "laws": [
+        ("doc_id", "int64"), ("source_file", "string"), ("sha256", "string"),
+        ("parser_version", "string"),
+        ("law_number", "int32"), ("law_year", "int32"),
+        ("issue_date", "date"), ("publication_date", "date"), ("effective_date", "date"),
+        ("title", "string"), ("gazette_reference", "string"),
+        ("article_count", "int32"),
+    ],
+    "articles": [
+        ("doc_id", "int64"), ("article_number", "string"), ("article_type", "string"),
+        ("is_repeated", "bool"), ("original_text", "string"), ("final_text", "string"),
+        ("final_text_date", "date"),
+    ],
+    "principles": [
+        ("doc_type", "string"), ("doc_id", "int64"),
+        ("principle_number", "int32"), ("principle_text", "string"),
+    ],
+}
+
+
+def _to_int(v):
+    try:
+        return int(v) if v is not None and v != "" else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_date(v):
+    if not v:
+        return None
+    try:
+        return date.fromisoformat(str(v)[:10])
+    except ValueError:
+        return None
+
+
+def _to_str(v):
+    return None if v is None else str(v)
+
+
+_CONVERT = {"string": _to_str, "int32": _to_int, "int64": _to_int, "date": _to_date,
+            "bool": lambda v: bool(v)}
+
+
+def doc_id_of(source_file: str) -> int:
+    """
+    The doc_id of a source file: its name's sha256, first 8 bytes as a signed int64.
+    """
+    digest = hashlib.sha256(source_file.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        sys.exit("export_columnar.py needs pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+class ColumnarWriter:
+    """
+    One ParquetWriter per table; rows are appended column-wise and written out
+    as a row group every `row_group` rows.
+    """
+
+    def __init__(self, out_dir: str, row_group: int = ROW_GROUP, compression: str = "zstd"):
+        pa, pq = _require_pyarrow()
+        self._pa = pa
+        types = {"string": pa.string(), "int32": pa.int32(), "int64": pa.int64(),
+                 "date": pa.date32(), "bool": pa.bool_()}
+        os.makedirs(out_dir, exist_ok=True)
+        self.row_group = row_group
+        self.schemas = {
+            t: pa.schema([(c, types[k]) for c, k in cols]) for t, cols in TABLES.items()
+        }
+        self.writers = {
+            t: pq.ParquetWriter(os.path.join(out_dir, f"{t}.parquet"), schema, compression=compression)
+            for t, schema in self.schemas.items()
+        }
+        self.buffers = {t: {c: [] for c, _ in cols} for t, cols in TABLES.items()}
+        self.rows = {t: 0 for t in TABLES}
+        self.docs = 0
+        self._ids = set()
+
+    def _append(self, table: str, values: dict):
+        buf = self.buffers[table]
+        for col, kind in TABLES[table]:
+            buf[col].append(_CONVERT[kind](values.get(col)))
+        self.rows[table] += 1
+        if len(buf["doc_id"]) >= self.row_group:
+            self._flush(table)
+
+    def _flush(self, table: str):
+        buf = self.buffers[table]
+        if not buf["doc_id"]:
+            return
+        self.writers[table].write_table(
+            self._pa.Table.from_pydict(buf, schema=self.schemas[table]))
+        for col in buf:
+            buf[col] = []
+
+    def add(self, record: dict) -> bool:
+        """
+        Split one exported record into its table rows. False for unknown doc
+        types and for a second record of the same source file.
+        """
+        doc_type = record.get("doc_type")
+        if doc_type not in ("judgment", "fatwa", "law"):
+            return False
+        # keyed on the source name, not the sha256: byte-identical sources share that
+        doc_id = doc_id_of(record.get("source_file") or "")
+        if doc_id in self._ids:
+            print(f"SKIPPED duplicate source_file {record.get('source_file')!r}")
+            return False
+        self._ids.add(doc_id)
+        self.docs += 1
+        meta = {
+            "doc_id": doc_id,
+            "source_file": record.get("source_file"),
+            "sha256": record.get("sha256"),
+            "parser_version": record.get("parser_version"),
+        }
+
+        if doc_type in ("judgment", "fatwa"):
+            principles = record.get("principles") or []
+            self._append(doc_type + "s", {**(record.get(doc_type) or {}), **meta,
+                                          "principle_count": len(principles)})
+            for p in principles:
+                self._append("principles", {**p, "doc_type": doc_type, "doc_id": doc_id})
+        else:
+            articles = record.get("articles") or []
+            self._append("laws", {**(record.get("law") or {}), **meta,
+                                  "article_count": len(articles)})
+            for a in articles:
+                self._append("articles", {**a, "doc_id": doc_id})
+        return True
+
+    def close(self) -> dict:
+        for table in TABLES:
+            self._flush(table)
+            self.writers[table].close()
+        return dict(self.rows)
+
+
+def json_records(json_dir: str):
+    for fp in sorted(glob.glob(os.path.join(json_dir, "*.json"))):
+        with open(fp, "r", encoding="utf-8") as f:
+            yield json.load(f)
+
+
+def docx_records(docx_dir: str, workers: int):
+    """
+    Records parsed from DOCX, in input order. With a pool, at most `2 * workers`
+    files are submitted ahead of the writer, so parsed records never pile up.
+    """
+    files = glob.glob(os.path.join(docx_dir, "**", "*.docx"), recursive=True)
+    files = sorted(p for p in files if not os.path.basename(p).startswith("~$"))
+    if workers <= 1 or len(files) <= 1:
+        yield from _ok_records(map(record_job, files))
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    ahead = 2 * workers
+    inflight = deque()
+    jobs = iter(files)
+
+    def results():
+        while True:
+            while len(inflight) < ahead:
+                fp = next(jobs, None)
+                if fp is None:
+                    break
+                inflight.append(pool.submit(record_job, fp))
+            if not inflight:
+                return
+            yield inflight.popleft().result()
+
+    try:
+        yield from _ok_records(results())
+    finally:
+        for f in inflight:
+            f.cancel()
+        pool.shutdown(cancel_futures=True)
+
+
+def _ok_records(results):
+    for r in results:
+        if r["error"] is not None:
+            print(f"FAILED {r['path']}: {r['error']}")
+            continue
+        yield r["record"]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export the parsed corpus as Parquet tables.")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--json", help="folder of exported .json files")
+    src.add_argument("--ndjson", help="NDJSON shard folder (export_all_clean_json.py --format ndjson)")
+    src.add_argument("--docx", help="parse this folder of .docx files directly")
+    ap.add_argument("--workers", type=int, default=1, help="parser processes with --docx")
+    ap.add_argument("--out", default=OUT_DIR, help="output folder for the .parquet files")
+    ap.add_argument("--row-group", type=int, default=ROW_GROUP, help="rows per Parquet row group")
+    args = ap.parse_args(argv)
+
+    if args.json:
+        records = json_records(args.json)
+    elif args.ndjson:
+        records = (r for _, r in iter_shard_records(args.ndjson))
+    else:
+        records = docx_records(args.docx, args.workers)
+
+    t0 = time.perf_counter()
+    writer = ColumnarWriter(args.out, args.row_group)
+    docs = skipped = 0
+    for record in records:
+        if writer.add(record):
+            docs += 1
+        else:
+            skipped += 1
+    rows = writer.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"DONE. Output: {args.out} | {docs} documents ({skipped} of unknown type or duplicate source skipped) "
+          f"in {elapsed:.1f}s")
+    for table, n in rows.items():
+        print(f"  {table}.parquet: {n} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Fill the *_norm shadow columns of rows loaded before they existed (app/migrate.sql).
+
+    python "load files/backfill_norm.py"
+    python "load files/backfill_norm.py" --batch 1000
+
+Reads each table in id order, a batch at a time, and writes normalize_ar() of
+the stored source columns back with one batched UPDATE per batch, the same
+values the loaders write. Only rows with a missing norm are touched, so it is
+safe to stop and run again. updated_at is left alone: the documents themselves
+did not change (row_version still moves, so search indexes pick the rows up).
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+
+# make the repo root importable when run as `python "load files/..."`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.arabic import normalize_ar
+from loader_common import INT, NVARCHAR_MAX, bulk_execute
+from load_laws_sqlserver import connect
+
+# table -> (id column, [(source column, norm column)]), as the loaders fill them
+NORM_COLUMNS = {
+    "dbo.Law": ("law_id", [("title", "title_norm"),
+                           ("gazette_reference", "gazette_reference_norm")]),
+    "dbo.Judgment": ("judgment_id", [("court_name", "court_name_norm"),
+                                     ("facts", "facts_norm"),
+                                     ("reasons", "reasons_norm")]),
+    "dbo.Fatwa": ("fatwa_id", [("subject", "subject_norm"),
+                               ("authority", "authority_norm"),
+                               ("facts", "facts_norm"),
+                               ("opinion", "opinion_norm")]),
+}
+
+
+def log(msg: str):
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"[{ts}] {msg}"
+    print(line)
+    with open("backfill_norm.log", "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def backfill_table(conn, table: str, batch: int) -> int:
+    id_col, pairs = NORM_COLUMNS[table]
+    sources = ", ".join(src for src, _ in pairs)
+    missing = " OR ".join(f"({norm} IS NULL AND {src} IS NOT NULL)" for src, norm in pairs)
+    select = (f"SELECT TOP (?) {id_col}, {sources} FROM {table} "
+              f"WHERE {id_col} > ? AND ({missing}) ORDER BY {id_col}")
+    update = (f"UPDATE {table} SET {', '.join(f'{norm} = ?' for _, norm in pairs)} "
+              f"WHERE {id_col} = ?")
+    sizes = [NVARCHAR_MAX] * len(pairs) + [INT]
+
+    cur = conn.cursor()
+    done = 0
+    last_id = 0
+    while True:
+        rows = cur.execute(select, batch, last_id).fetchall()
+        if not rows:
+            break
+        params = [tuple(normalize_ar(v) for v in row[1:]) + (int(row[0]),) for row in rows]
+        done += bulk_execute(cur, update, params, sizes)
+        conn.commit()
+        last_id = int(rows[-1][0])
+    cur.close()
+    return done
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Fill missing *_norm columns from the stored text.")
+    ap.add_argument("--batch", type=int, default=500, help="rows per UPDATE batch and commit")
+    args = ap.parse_args(argv)
+
+    conn = connect()
+    for table in NORM_COLUMNS:
+        log(f"{table}: {backfill_table(conn, table, args.batch)} rows backfilled")
+    conn.close()
+    log("DONE")
+
+
+if __name__ == "__main__":
+    main()
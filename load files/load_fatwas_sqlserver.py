@@ -1,12 +1,24 @@
 import os
-import glob
-import json
+import sys
+import argparse
 import pyodbc
 from datetime import datetime
 
+# make the repo root importable when run as `python "load files/..."`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.arabic import normalize_ar
+from app.records import Fatwa, Principle
+from loader_common import (
+    INT, NVARCHAR_MAX, ChildTable, sync_children, format_counts, KeyIndex, LoadContext,
+    source_of, is_unchanged, add_batch_args, Checkpoint, CommitBatcher,
+    input_records,
+)
+
 SERVER = r"MAHOZZ\SQLEXPRESS"
 DATABASE = "model"
 JSON_DIR = r"json_clean_all"    
+CHECKPOINT = "loader_fatwa.checkpoint.json"
 
 
 def log(msg: str):
@@ -28,7 +40,17 @@ def connect():
     return pyodbc.connect(conn_str)
 
 
-def find_existing_fatwa_id(cur, f: dict):
+# same keys, same order as the SELECTs in find_existing_fatwa_id
+FATWA_KEYS = {
+    "number_year": ("fatwa_number", "fatwa_year"),
+    "file_number": ("file_number",),
+}
+
+
+def find_existing_fatwa_id(cur, f: dict, keys: KeyIndex | None = None):
+    if keys is not None:
+        return keys.find(f)
+
     # Preferred key: (fatwa_number, fatwa_year)
     num = f.get("fatwa_number")
     yr = f.get("fatwa_year")
@@ -53,16 +75,18 @@ def find_existing_fatwa_id(cur, f: dict):
     return None
 
 
-def insert_fatwa(cur, f: dict) -> int:
+def insert_fatwa(cur, f: dict, source: tuple = (None, None)) -> int:
     row = cur.execute(
         """
         INSERT INTO dbo.Fatwa (
             fatwa_number, fatwa_year, issued_date, session_date,
             subject, authority, full_text, file_number,
-            facts, application, opinion
+            facts, application, opinion,
+            subject_norm, authority_norm, facts_norm, opinion_norm,
+            source_sha256, parser_version
         )
         OUTPUT INSERTED.fatwa_id
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             f.get("fatwa_number"),
@@ -76,18 +100,26 @@ def insert_fatwa(cur, f: dict) -> int:
             f.get("facts"),
             f.get("application"),
             f.get("opinion"),
+            normalize_ar(f.get("subject")),
+            normalize_ar(f.get("authority")),
+            normalize_ar(f.get("facts")),
+            normalize_ar(f.get("opinion")),
+            *source,
         )
     ).fetchone()
     return int(row[0])
 
 
-def update_fatwa(cur, fatwa_id: int, f: dict):
+def update_fatwa(cur, fatwa_id: int, f: dict, source: tuple = (None, None)):
     cur.execute(
         """
         UPDATE dbo.Fatwa SET
             fatwa_number = ?, fatwa_year = ?, issued_date = ?, session_date = ?,
             subject = ?, authority = ?, full_text = ?, file_number = ?,
-            facts = ?, application = ?, opinion = ?
+            facts = ?, application = ?, opinion = ?,
+            subject_norm = ?, authority_norm = ?, facts_norm = ?, opinion_norm = ?,
+            source_sha256 = ?, parser_version = ?,
+            updated_at = SYSUTCDATETIME()
         WHERE fatwa_id = ?
         """,
         (
@@ -102,64 +134,82 @@ def update_fatwa(cur, fatwa_id: int, f: dict):
             f.get("facts"),
             f.get("application"),
             f.get("opinion"),
+            normalize_ar(f.get("subject")),
+            normalize_ar(f.get("authority")),
+            normalize_ar(f.get("facts")),
+            normalize_ar(f.get("opinion")),
+            *source,
             fatwa_id,
         )
     )
 
 
-def replace_fatwa_principles(cur, fatwa_id: int, principles: list[dict]) -> int:
-    # Remove old principles to keep the operation idempotent
-    cur.execute("DELETE FROM dbo.Fatwa_Principle WHERE fatwa_id = ?", fatwa_id)
+PRINCIPLES = ChildTable(
+    "dbo.Fatwa_Principle", "principle_id", "fatwa_id",
+    cols=("principle_number", "principle_text"),
+    key=("principle_number",),
+    sizes=[INT, NVARCHAR_MAX],
+)
 
-    inserted = 0
-    for p in principles:
-        cur.execute(
-            """
-            INSERT INTO dbo.Fatwa_Principle (fatwa_id, principle_number, principle_text)
-            VALUES (?, ?, ?)
-            """,
-            (fatwa_id, p.get("principle_number"), p.get("principle_text"))
-        )
-        inserted += 1
 
-    return inserted
+def sync_fatwa_principles(cur, fatwa_id: int, principles: list[dict]) -> dict:
+    # Diff against the stored principles (keyed by principle_number) to stay idempotent
+    rows = [(p.get("principle_number"), p.get("principle_text")) for p in principles]
+    return sync_children(cur, PRINCIPLES, fatwa_id, rows)
 
 
-def main():
-    conn = connect()
-    cur = conn.cursor()
+def load_fatwa(cur, data: dict, ctx: LoadContext, name: str = "") -> str:
+    """
+    Upsert one exported fatwa JSON and sync its principles.
+    Returns "inserted", "updated" or "skipped" (source unchanged since the last load).
+    """
+    fatwa = Fatwa.from_dict(data.get("fatwa"))
+    principles = [Principle.from_dict(p) for p in data.get("principles") or []]
 
-    files = sorted(glob.glob(os.path.join(JSON_DIR, "*.json")))
-    if not files:
-        log(f"No json files found in {JSON_DIR}")
-        return
+    source = source_of(data)
+    existing_id = find_existing_fatwa_id(cur, fatwa, ctx.keys)
 
-    for fp in files:
-        with open(fp, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    if is_unchanged(cur, "dbo.Fatwa", "fatwa_id", existing_id, source, ctx.hashes):
+        log(f"SKIP unchanged Fatwa id={existing_id} ({name})")
+        return "skipped"
+
+    if existing_id is None:
+        fatwa_id = insert_fatwa(cur, fatwa, source)
+        status = "inserted"
+        log(f"INSERT Fatwa id={fatwa_id} num={fatwa.fatwa_number} year={fatwa.fatwa_year}")
+    else:
+        fatwa_id = existing_id
+        update_fatwa(cur, fatwa_id, fatwa, source)
+        status = "updated"
+        log(f"UPDATE Fatwa id={fatwa_id} num={fatwa.fatwa_number} year={fatwa.fatwa_year}")
+    ctx.remember(fatwa_id, fatwa, source)
+
+    counts = ctx.rate.timed(sync_fatwa_principles, cur, fatwa_id, principles)
+    log(f"SYNC Fatwa_Principle {format_counts(counts)} for fatwa_id={fatwa_id}")
+    return status
 
-        if data.get("doc_type") != "fatwa":
-            continue
 
-        fatwa = data.get("fatwa", {}) or {}
-        principles = data.get("principles", []) or []
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load fatwa JSON files into SQL Server.")
+    args = add_batch_args(ap).parse_args(argv)
 
-        existing_id = find_existing_fatwa_id(cur, fatwa)
+    conn = connect()
+    cur = conn.cursor()
+    ctx = LoadContext.prefetch(cur, "Fatwa_Principle", FATWA_KEYS, "dbo.Fatwa", "fatwa_id", log)
 
-        if existing_id is None:
-            fatwa_id = insert_fatwa(cur, fatwa)
-            log(f"INSERT Fatwa id={fatwa_id} num={fatwa.get('fatwa_number')} year={fatwa.get('fatwa_year')}")
-        else:
-            fatwa_id = existing_id
-            update_fatwa(cur, fatwa_id, fatwa)
-            log(f"UPDATE Fatwa id={fatwa_id} num={fatwa.get('fatwa_number')} year={fatwa.get('fatwa_year')}")
+    checkpoint = Checkpoint(CHECKPOINT, args.ndjson or JSON_DIR)
+    batcher = CommitBatcher(conn, checkpoint, args.commit_every, args.commit_seconds,
+                            args.resume, log)
+    for name, data in input_records(batcher, JSON_DIR, args.ndjson, "fatwa", log):
+        if data.get("doc_type") != "fatwa":
+            continue
 
-        cnt = replace_fatwa_principles(cur, fatwa_id, principles)
-        log(f"REPLACE Fatwa_Principle count={cnt} for fatwa_id={fatwa_id}")
+        ctx.tally(load_fatwa(cur, data, ctx, name))
 
     conn.commit()
     cur.close()
     conn.close()
+    log(ctx.summary())
     log("DONE")
 
 
@@ -1,13 +1,25 @@
 import os
-import glob
-import json
+import sys
+import argparse
 import pyodbc
 from datetime import datetime
 
+# make the repo root importable when run as `python "load files/..."`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.arabic import normalize_ar
+from app.records import Judgment, Principle
+from loader_common import (
+    INT, NVARCHAR_MAX, ChildTable, sync_children, format_counts, KeyIndex, LoadContext,
+    source_of, is_unchanged, add_batch_args, Checkpoint, CommitBatcher,
+    input_records,
+)
+
 
 SERVER = r"MAHOZZ\SQLEXPRESS"
 DATABASE = "model"
 JSON_DIR = r"json_clean_all"
+CHECKPOINT = "loader_judgment.checkpoint.json"
 
 
 def log(msg: str):
@@ -29,7 +41,17 @@ def connect():
     return pyodbc.connect(conn_str)
 
 
-def find_existing_judgment_id(cur, j: dict):
+# same keys, same order as the SELECTs in find_existing_judgment_id
+JUDGMENT_KEYS = {
+    "reference_number": ("reference_number",),
+    "fallback": ("appeal_number", "judicial_year", "session_date"),
+}
+
+
+def find_existing_judgment_id(cur, j: dict, keys: KeyIndex | None = None):
+    if keys is not None:
+        return keys.find(j)
+
     # 1) reference_number if available
     ref = j.get("reference_number")
     if ref:
@@ -59,17 +81,19 @@ def find_existing_judgment_id(cur, j: dict):
     return None
 
 
-def insert_judgment(cur, j: dict) -> int:
+def insert_judgment(cur, j: dict, source: tuple = (None, None)) -> int:
     # OUTPUT INSERTED.judgment_id guarantees we get the identity value
     row = cur.execute(
         """
         INSERT INTO dbo.Judgment (
             court_name, case_type, appeal_number, judicial_year, session_date,
             technical_office_number, volume_number, page_number, rule_number, reference_number,
-            judicial_panel, facts, reasons
+            judicial_panel, facts, reasons,
+            court_name_norm, facts_norm, reasons_norm,
+            source_sha256, parser_version
         )
         OUTPUT INSERTED.judgment_id
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             j.get("court_name"),
@@ -85,19 +109,26 @@ def insert_judgment(cur, j: dict) -> int:
             j.get("judicial_panel"),
             j.get("facts"),
             j.get("reasons"),
+            normalize_ar(j.get("court_name")),
+            normalize_ar(j.get("facts")),
+            normalize_ar(j.get("reasons")),
+            *source,
         )
     ).fetchone()
 
     return int(row[0])
 
 
-def update_judgment(cur, judgment_id: int, j: dict):
+def update_judgment(cur, judgment_id: int, j: dict, source: tuple = (None, None)):
     cur.execute(
         """
         UPDATE dbo.Judgment SET
             court_name = ?, case_type = ?, appeal_number = ?, judicial_year = ?, session_date = ?,
             technical_office_number = ?, volume_number = ?, page_number = ?, rule_number = ?, reference_number = ?,
-            judicial_panel = ?, facts = ?, reasons = ?
+            judicial_panel = ?, facts = ?, reasons = ?,
+            court_name_norm = ?, facts_norm = ?, reasons_norm = ?,
+            source_sha256 = ?, parser_version = ?,
+            updated_at = SYSUTCDATETIME()
         WHERE judgment_id = ?
         """,
         (
@@ -114,100 +145,111 @@ def update_judgment(cur, judgment_id: int, j: dict):
             j.get("judicial_panel"),
             j.get("facts"),
             j.get("reasons"),
+            normalize_ar(j.get("court_name")),
+            normalize_ar(j.get("facts")),
+            normalize_ar(j.get("reasons")),
+            *source,
             judgment_id,
         )
     )
 
 
-def replace_principles(cur, judgment_id: int, principles: list[dict]):
-    # delete old
-    cur.execute(
-        "DELETE FROM dbo.Judgment_Principle WHERE judgment_id = ?",
-        judgment_id
-    )
+PRINCIPLES = ChildTable(
+    "dbo.Judgment_Principle", "principle_id", "judgment_id",
+    cols=("principle_number", "principle_text"),
+    key=("principle_number",),
+    sizes=[INT, NVARCHAR_MAX],
+)
 
-    # insert new
-    inserted = 0
-    for p in principles:
-        cur.execute(
-            """
-            INSERT INTO dbo.Judgment_Principle (judgment_id, principle_number, principle_text)
-            VALUES (?, ?, ?)
-            """,
-            (
-                judgment_id,
-                p.get("principle_number"),
-                p.get("principle_text"),
-            )
-        )
-        inserted += 1
 
-    return inserted
+def sync_principles(cur, judgment_id: int, principles: list[dict]) -> dict:
+    # diff against the stored principles (keyed by principle_number); only changes are written
+    rows = [(p.get("principle_number"), p.get("principle_text")) for p in principles]
+    return sync_children(cur, PRINCIPLES, judgment_id, rows)
+
 
+def upsert_judgment(cur, j: dict, principles: list[dict], ctx: LoadContext,
+                    source: tuple = (None, None)) -> str:
+    """
+    Returns "inserted", "updated" or "skipped" (source unchanged since the last load,
+    nothing is written then).
+    """
+    existing_id = find_existing_judgment_id(cur, j, ctx.keys)
 
-def upsert_judgment(cur, j: dict, principles: list[dict]) -> int:
-    existing_id = find_existing_judgment_id(cur, j)
+    if is_unchanged(cur, "dbo.Judgment", "judgment_id", existing_id, source, ctx.hashes):
+        log(f"SKIP unchanged Judgment id={existing_id} ref={j.get('reference_number')}")
+        return "skipped"
 
     if existing_id is None:
-        judgment_id = insert_judgment(cur, j)
+        judgment_id = insert_judgment(cur, j, source)
+        status = "inserted"
         log(f"INSERT Judgment id={judgment_id} ref={j.get('reference_number')}")
     else:
         judgment_id = existing_id
-        update_judgment(cur, judgment_id, j)
+        update_judgment(cur, judgment_id, j, source)
+        status = "updated"
         log(f"UPDATE Judgment id={judgment_id} ref={j.get('reference_number')}")
+    ctx.remember(judgment_id, j, source)
 
-    inserted = replace_principles(cur, judgment_id, principles)
-    log(f"REPLACE principles count={inserted} for judgment_id={judgment_id}")
+    counts = ctx.rate.timed(sync_principles, cur, judgment_id, principles)
+    log(f"SYNC principles {format_counts(counts)} for judgment_id={judgment_id}")
 
-    return judgment_id
+    return status
 
 
-def main():
-    conn = connect()
-    cur = conn.cursor()
+def load_judgment(cur, data: dict, ctx: LoadContext, name: str = "") -> str:
+    """
+    Validate one exported judgment JSON and upsert it.
+    Returns the upsert status, or "invalid" when the payload has no stable key.
+    """
+    j = Judgment.from_dict(data.get("judgment"))
+    principles = [Principle.from_dict(p) for p in data.get("principles") or []]
 
-    files = sorted(glob.glob(os.path.join(JSON_DIR, "*.json")))
-    if not files:
-        log(f"No json files found in {JSON_DIR}")
-        return
+    # Skip invalid/empty payloads (prevents NULL-row inserts)
+    if not j:
+        log(f"SKIP empty judgment payload in {name}")
+        return "invalid"
 
-    for fp in files:
-        with open(fp, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    ref = j.reference_number.strip() if j.reference_number is not None else None
+    appeal = j.appeal_number
+    year = j.judicial_year
+    sdate = j.session_date.strip() if j.session_date is not None else None
 
-        # Only process judgment JSON files
-        if data.get("doc_type") != "judgment":
-            continue
+    # If there is no stable key, skip to keep idempotency guaranteed
+    if not ref and not (appeal is not None and year is not None and sdate):
+        log(f"SKIP (no stable key) in {name}")
+        return "invalid"
 
-        j = data.get("judgment", {}) or {}
-        principles = data.get("principles", []) or []
+    if not ref:
+        log(
+            f"ASSUMPTION: no reference_number in {name} -> using fallback key")
 
-        # Skip invalid/empty payloads (prevents NULL-row inserts)
-        if not j:
-            log(f"SKIP empty judgment payload in {os.path.basename(fp)}")
-            continue
+    return upsert_judgment(cur, j, principles, ctx, source_of(data))
 
-        ref = (j.get("reference_number") or "").strip() if j.get(
-            "reference_number") is not None else None
-        appeal = j.get("appeal_number")
-        year = j.get("judicial_year")
-        sdate = (j.get("session_date") or "").strip() if j.get(
-            "session_date") is not None else None
 
-        # If there is no stable key, skip to keep idempotency guaranteed
-        if not ref and not (appeal is not None and year is not None and sdate):
-            log(f"SKIP (no stable key) in {os.path.basename(fp)}")
-            continue
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load judgment JSON files into SQL Server.")
+    args = add_batch_args(ap).parse_args(argv)
 
-        if not ref:
-            log(
-                f"ASSUMPTION: no reference_number in {os.path.basename(fp)} -> using fallback key")
+    conn = connect()
+    cur = conn.cursor()
+    ctx = LoadContext.prefetch(cur, "Judgment_Principle", JUDGMENT_KEYS,
+                               "dbo.Judgment", "judgment_id", log)
+
+    checkpoint = Checkpoint(CHECKPOINT, args.ndjson or JSON_DIR)
+    batcher = CommitBatcher(conn, checkpoint, args.commit_every, args.commit_seconds,
+                            args.resume, log)
+    for name, data in input_records(batcher, JSON_DIR, args.ndjson, "judgment", log):
+        # Only process judgment JSON files
+        if data.get("doc_type") != "judgment":
+            continue
 
-        upsert_judgment(cur, j, principles)
+        ctx.tally(load_judgment(cur, data, ctx, name))
 
     conn.commit()
     cur.close()
     conn.close()
+    log(ctx.summary())
     log("DONE")
 
 if __name__ == "__main__":
@@ -1,12 +1,24 @@
 import os
-import glob
-import json
+import sys
+import argparse
 import pyodbc
 from datetime import datetime
 
+# make the repo root importable when run as `python "load files/..."`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.arabic import normalize_ar
+from app.records import Law, LawArticle
+from loader_common import (
+    BIT, NVARCHAR_MAX, DATE_STR, nvarchar, ChildTable, sync_children, format_counts,
+    KeyIndex, LoadContext, source_of, is_unchanged, add_batch_args, Checkpoint, CommitBatcher,
+    input_records,
+)
+
 SERVER = r"MAHOZZ\SQLEXPRESS"
 DATABASE = "model"
 JSON_DIR = r"json_clean_all"  
+CHECKPOINT = "loader_law.checkpoint.json"
 
 
 def log(msg: str):
@@ -28,11 +40,22 @@ def connect():
     return pyodbc.connect(conn_str)
 
 
-def find_existing_law_id(cur, law: dict):
+# same keys, same order as the SELECTs in find_existing_law_id
+LAW_KEYS = {
+    "year_date_title": ("law_year", "issue_date", "title"),
+    "year_title": ("law_year", "title"),
+}
+
+
+def find_existing_law_id(cur, law: dict, keys: KeyIndex | None = None):
     """
     Find an existing Law row using a stable natural key.
     NOTE: schema does not include a law_number column, so we use (law_year, issue_date, title).
+    With a prefetched KeyIndex the lookup is resolved in memory.
     """
+    if keys is not None:
+        return keys.find(law)
+
     year = law.get("law_year")
     title = law.get("title")
     issue_date = law.get("issue_date")
@@ -62,15 +85,17 @@ def find_existing_law_id(cur, law: dict):
     return None
 
 
-def insert_law(cur, law: dict) -> int:
+def insert_law(cur, law: dict, source: tuple = (None, None)) -> int:
     row = cur.execute(
         """
         INSERT INTO dbo.Law (
             law_year, issue_date, publication_date, effective_date,
-            title, gazette_reference
+            title, gazette_reference,
+            title_norm, gazette_reference_norm,
+            source_sha256, parser_version
         )
         OUTPUT INSERTED.law_id
-        VALUES (?, ?, ?, ?, ?, ?)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
         (
             law.get("law_year"),
@@ -79,17 +104,23 @@ def insert_law(cur, law: dict) -> int:
             law.get("effective_date"),
             law.get("title"),
             law.get("gazette_reference"),
+            normalize_ar(law.get("title")),
+            normalize_ar(law.get("gazette_reference")),
+            *source,
         )
     ).fetchone()
     return int(row[0])
 
 
-def update_law(cur, law_id: int, law: dict):
+def update_law(cur, law_id: int, law: dict, source: tuple = (None, None)):
     cur.execute(
         """
         UPDATE dbo.Law SET
             law_year = ?, issue_date = ?, publication_date = ?, effective_date = ?,
-            title = ?, gazette_reference = ?
+            title = ?, gazette_reference = ?,
+            title_norm = ?, gazette_reference_norm = ?,
+            source_sha256 = ?, parser_version = ?,
+            updated_at = SYSUTCDATETIME()
         WHERE law_id = ?
         """,
         (
@@ -99,22 +130,32 @@ def update_law(cur, law_id: int, law: dict):
             law.get("effective_date"),
             law.get("title"),
             law.get("gazette_reference"),
+            normalize_ar(law.get("title")),
+            normalize_ar(law.get("gazette_reference")),
+            *source,
             law_id,
         )
     )
 
 
-def replace_articles(cur, law_id: int, articles: list[dict]) -> int:
+ARTICLES = ChildTable(
+    "dbo.Law_Article", "id", "law_id",
+    cols=("article_number", "article_type", "is_repeated",
+          "original_text", "final_text", "final_text_date"),
+    key=("article_number", "article_type"),
+    sizes=[nvarchar(50), nvarchar(20), BIT, NVARCHAR_MAX, NVARCHAR_MAX, DATE_STR],
+)
+
+
+def sync_articles(cur, law_id: int, articles: list[dict]) -> dict:
     """
     Idempotent article load:
-    - delete existing articles for this law
-    - insert the current set
+    - diff the current set against the stored articles, keyed by (article_number, article_type)
+    - insert new, update changed, delete removed; unchanged articles are not written
     Includes an in-memory dedup guard to avoid UNIQUE(law_id, article_number, article_type) conflicts.
     """
-    cur.execute("DELETE FROM dbo.Law_Article WHERE law_id = ?", law_id)
-
     seen = set()
-    inserted = 0
+    rows = []
 
     for a in articles:
         article_number = str(a.get("article_number"))
@@ -126,66 +167,72 @@ def replace_articles(cur, law_id: int, articles: list[dict]) -> int:
             continue
         seen.add(key)
 
-        cur.execute(
-            """
-            INSERT INTO dbo.Law_Article (
-                law_id, article_number, article_type, is_repeated,
-                original_text, final_text, final_text_date
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                law_id,
-                article_number,
-                article_type,
-                1 if a.get("is_repeated") else 0,
-                a.get("original_text"),
-                a.get("final_text"),
-                a.get("final_text_date"),
-            )
-        )
-        inserted += 1
+        rows.append((
+            article_number,
+            article_type,
+            1 if a.get("is_repeated") else 0,
+            a.get("original_text"),
+            a.get("final_text"),
+            a.get("final_text_date"),
+        ))
 
-    return inserted
+    return sync_children(cur, ARTICLES, law_id, rows)
 
 
-def main():
+def load_law(cur, data: dict, ctx: LoadContext, name: str = "") -> str:
+    """
+    Upsert one exported law JSON and sync its articles.
+    Returns "inserted", "updated" or "skipped" (source unchanged since the last load).
+    """
+    law = Law.from_dict(data.get("law"))
+    articles = [LawArticle.from_dict(a) for a in data.get("articles") or []]
+
+    source = source_of(data)
+    existing_id = find_existing_law_id(cur, law, ctx.keys)
+
+    if is_unchanged(cur, "dbo.Law", "law_id", existing_id, source, ctx.hashes):
+        log(f"SKIP unchanged Law id={existing_id} ({name})")
+        return "skipped"
+
+    if existing_id is None:
+        law_id = insert_law(cur, law, source)
+        status = "inserted"
+        log(
+            f"INSERT Law id={law_id} year={law.law_year} title={(law.title or '')[:60]}")
+    else:
+        law_id = existing_id
+        update_law(cur, law_id, law, source)
+        status = "updated"
+        log(
+            f"UPDATE Law id={law_id} year={law.law_year} title={(law.title or '')[:60]}")
+    ctx.remember(law_id, law, source)
+
+    counts = ctx.rate.timed(sync_articles, cur, law_id, articles)
+    log(f"SYNC Law_Article {format_counts(counts)} for law_id={law_id}")
+    return status
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load law JSON files into SQL Server.")
+    args = add_batch_args(ap).parse_args(argv)
+
     conn = connect()
     cur = conn.cursor()
+    ctx = LoadContext.prefetch(cur, "Law_Article", LAW_KEYS, "dbo.Law", "law_id", log)
 
-    files = sorted(glob.glob(os.path.join(JSON_DIR, "*.json")))
-    if not files:
-        log(f"No json files found in {JSON_DIR}")
-        return
-
-    for fp in files:
-        with open(fp, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
+    checkpoint = Checkpoint(CHECKPOINT, args.ndjson or JSON_DIR)
+    batcher = CommitBatcher(conn, checkpoint, args.commit_every, args.commit_seconds,
+                            args.resume, log)
+    for name, data in input_records(batcher, JSON_DIR, args.ndjson, "law", log):
         if data.get("doc_type") != "law":
             continue
 
-        law = data.get("law", {}) or {}
-        articles = data.get("articles", []) or []
-
-        existing_id = find_existing_law_id(cur, law)
-
-        if existing_id is None:
-            law_id = insert_law(cur, law)
-            log(
-                f"INSERT Law id={law_id} year={law.get('law_year')} title={(law.get('title') or '')[:60]}")
-        else:
-            law_id = existing_id
-            update_law(cur, law_id, law)
-            log(
-                f"UPDATE Law id={law_id} year={law.get('law_year')} title={(law.get('title') or '')[:60]}")
-
-        cnt = replace_articles(cur, law_id, articles)
-        log(f"REPLACE Law_Article count={cnt} for law_id={law_id}")
+        ctx.tally(load_law(cur, data, ctx, name))
 
     conn.commit()
     cur.close()
     conn.close()
+    log(ctx.summary())
     log("DONE")
 
 
@@ -0,0 +1,503 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import threading
+from datetime import date
+import pyodbc
+
+from app.shards import iter_records as iter_shard_records
+
+# Parameter types for fast_executemany. Without them pyodbc guesses a size from the
+# first row, which truncates longer values or falls back to slow per-row binding.
+INT = (pyodbc.SQL_INTEGER, 0, 0)
+BIT = (pyodbc.SQL_BIT, 0, 0)
+NVARCHAR_MAX = (pyodbc.SQL_WVARCHAR, 0, 0)
+DATE_STR = (pyodbc.SQL_WVARCHAR, 10, 0)   # ISO 'YYYY-MM-DD', converted by the server
+HASH = (pyodbc.SQL_VARBINARY, 32, 0)
+
+
+def nvarchar(n: int):
+    return (pyodbc.SQL_WVARCHAR, n, 0)
+
+
+def bulk_execute(cur, sql: str, rows: list[tuple], input_sizes: list[tuple]) -> int:
+    """
+    Run an INSERT/UPDATE/DELETE for all rows in one batched call (fast_executemany)
+    instead of one round trip per row.
+    """
+    if not rows:
+        return 0
+    cur.fast_executemany = True
+    cur.setinputsizes(input_sizes)
+    try:
+        cur.executemany(sql, rows)
+    finally:
+        cur.setinputsizes(None)
+        cur.fast_executemany = False
+    return len(rows)
+
+
+def load_source_hashes(cur, table: str, id_col: str) -> dict[int, tuple]:
+    """
+    id -> (source_sha256, parser_version) for every row loaded from a known source.
+    """
+    rows = cur.execute(
+        f"SELECT {id_col}, source_sha256, parser_version FROM {table} "
+        f"WHERE source_sha256 IS NOT NULL"
+    ).fetchall()
+    return {int(r[0]): (r[1], r[2]) for r in rows}
+
+
+def source_of(data: dict) -> tuple:
+    """
+    (sha256, parser_version) stamped on an exported JSON by export_all_clean_json.py.
+    """
+    return data.get("sha256"), data.get("parser_version")
+
+
+def is_unchanged(cur, table: str, id_col: str, row_id: int | None, source: tuple,
+                 hashes: dict | None = None) -> bool:
+    """
+    True when row_id was last loaded from the same source file by the same parser,
+    so neither the row nor its children need writing. JSON without a hash
+    (exported before hashes existed) is never considered unchanged.
+    """
+    if row_id is None or not source[0]:
+        return False
+    if hashes is not None:
+        stored = hashes.get(row_id)
+    else:
+        stored = cur.execute(
+            f"SELECT source_sha256, parser_version FROM {table} WHERE {id_col} = ?",
+            row_id
+        ).fetchone()
+    return stored is not None and tuple(stored) == tuple(source)
+
+
+class ChildTable:
+    """
+    How a child table (articles / principles) hangs off its parent.
+
+    cols are the loaded columns after the parent id, in the order of the row
+    tuples handed to sync_children(); key is the subset that identifies a row
+    within one parent; sizes are the setinputsizes types for cols.
+    """
+
+    def __init__(self, table: str, pk: str, parent: str,
+                 cols: tuple[str, ...], key: tuple[str, ...], sizes: list[tuple]):
+        self.table = table
+        self.pk = pk
+        self.parent = parent
+        self.cols = cols
+        self.key = key
+        self.key_idx = [cols.index(c) for c in key]
+        self.sizes = sizes
+
+
+def content_hash(values) -> bytes:
+    h = hashlib.sha256()
+    for v in values:
+        # \x00 marks NULL so it never collides with an empty string
+        h.update(b"\x00" if v is None else str(v).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.digest()
+
+
+def _ordinal_keys(keys):
+    # (key, n-th occurrence): keeps rows with a repeated or NULL key apart
+    seen = {}
+    for k in keys:
+        n = seen.get(k, 0)
+        seen[k] = n + 1
+        yield k, n
+
+
+def sync_children(cur, spec: ChildTable, parent_id: int, rows: list[tuple]) -> dict:
+    """
+    Bring the children of one parent in line with rows, touching only what changed:
+    rows whose key is new are inserted, rows whose content hash differs are
+    updated, rows no longer present are deleted; identical rows are left alone.
+    Returns {"inserted", "updated", "deleted", "unchanged"} counts.
+    """
+    existing = cur.execute(
+        f"SELECT {spec.pk}, {', '.join(spec.key)}, content_hash FROM {spec.table} "
+        f"WHERE {spec.parent} = ? ORDER BY {spec.pk}",
+        parent_id
+    ).fetchall()
+    nk = len(spec.key)
+    old = {
+        k: (row[0], row[-1])
+        for k, row in zip(_ordinal_keys(tuple(key_part(v) for v in r[1:1 + nk]) for r in existing),
+                          existing)
+    }
+
+    inserts, updates = [], []
+    unchanged = 0
+    new_keys = _ordinal_keys(tuple(key_part(row[i]) for i in spec.key_idx) for row in rows)
+    for k, row in zip(new_keys, rows):
+        h = content_hash(row)
+        match = old.pop(k, None)
+        if match is None:
+            inserts.append((parent_id, *row, h))
+        elif match[1] is None or bytes(match[1]) != h:
+            updates.append((*row, h, match[0]))
+        else:
+            unchanged += 1
+    deletes = [(pk,) for pk, _ in old.values()]
+
+    # delete first so a key that moved never trips a unique constraint
+    bulk_execute(cur, f"DELETE FROM {spec.table} WHERE {spec.pk} = ?", deletes, [INT])
+    bulk_execute(
+        cur,
+        f"UPDATE {spec.table} SET {', '.join(c + ' = ?' for c in spec.cols)}, content_hash = ? "
+        f"WHERE {spec.pk} = ?",
+        updates, [*spec.sizes, HASH, INT]
+    )
+    bulk_execute(
+        cur,
+        f"INSERT INTO {spec.table} ({spec.parent}, {', '.join(spec.cols)}, content_hash) "
+        f"VALUES ({', '.join('?' * (len(spec.cols) + 2))})",
+        inserts, [INT, *spec.sizes, HASH]
+    )
+    return {
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "deleted": len(deletes),
+        "unchanged": unchanged,
+    }
+
+
+class RowRate:
+    """
+    Accumulates child-sync counts and the time spent on them, for a rows/s report.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.counts = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        self.seconds = 0.0
+        self._lock = threading.Lock()   # shared by load_all.py workers
+
+    @property
+    def rows(self) -> int:
+        # rows actually written
+        return self.counts["inserted"] + self.counts["updated"] + self.counts["deleted"]
+
+    def timed(self, fn, *args) -> dict:
+        t0 = time.perf_counter()
+        counts = fn(*args)
+        dt = time.perf_counter() - t0
+        with self._lock:
+            self.seconds += dt
+            for k, v in counts.items():
+                self.counts[k] += v
+        return counts
+
+    def summary(self) -> str:
+        rate = self.rows / self.seconds if self.seconds else 0.0
+        c = self.counts
+        return (f"{self.label}: {c['inserted']} inserted, {c['updated']} updated, "
+                f"{c['deleted']} deleted, {c['unchanged']} unchanged "
+                f"in {self.seconds:.2f}s ({rate:.0f} rows/s written)")
+
+
+def format_counts(counts: dict) -> str:
+    return " ".join(f"{k}={v}" for k, v in counts.items())
+
+
+# Resolve insert-vs-update from natural keys loaded once per run instead of
+# one or two SELECTs per file. LOADER_PREFETCH_KEYS=0 goes back to per-row lookups.
+PREFETCH_KEYS = os.getenv("LOADER_PREFETCH_KEYS", "1") != "0"
+
+# Commit after this many documents or this many seconds, whichever comes first.
+COMMIT_EVERY = int(os.getenv("LOADER_COMMIT_EVERY", "500"))
+COMMIT_SECONDS = float(os.getenv("LOADER_COMMIT_SECONDS", "30"))
+
+
+def key_part(v):
+    """
+    Bring a key value from JSON or from the database to one comparable form
+    (1784 == "1784", date(1990, 1, 31) == "1990-01-31"); empty -> None.
+
+    Text is folded the way the database's case-insensitive collation compares
+    it (the find_existing_* SELECTs matched "Law" = "law " too): casefold(),
+    and trailing spaces dropped. Arabic text has no case, so only Latin
+    letters in file_number / title / reference_number are affected.
+    """
+    if v is None:
+        return None
+    if isinstance(v, date):
+        return v.isoformat()[:10]
+    v = str(v).strip().casefold()
+    return v or None
+
+
+class KeyIndex:
+    """
+    In-memory natural key -> id map for one table.
+
+    keys is an ordered {name: (column, ...)}; find() tries them in that order,
+    mirroring the find_existing_* SELECT fallbacks. A key with a missing part
+    is never matched, just like the `if a and b:` guards around those SELECTs.
+    """
+
+    def __init__(self, keys: dict[str, tuple[str, ...]]):
+        self.keys = keys
+        self._maps = {name: {} for name in keys}
+        self._by_id = {}    # id -> [(name, key)], so an update can drop its old keys
+        self._lock = threading.Lock()   # shared by load_all.py workers
+
+    def _key(self, cols, rec: dict):
+        parts = tuple(key_part(rec.get(c)) for c in cols)
+        return None if None in parts else parts
+
+    def load(self, cur, table: str, id_col: str, batch_size: int = 5000) -> int:
+        cols = list(dict.fromkeys(c for cols in self.keys.values() for c in cols))
+        cur.execute(f"SELECT {id_col}, {', '.join(cols)} FROM {table}")
+        n = 0
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                # first row wins on a non-unique key, like SELECT ... fetchone()
+                self.add(int(row[0]), dict(zip(cols, row[1:])), replace=False)
+            n += len(rows)
+        return n
+
+    def find(self, rec: dict) -> int | None:
+        for name, cols in self.keys.items():
+            k = self._key(cols, rec)
+            if k is not None:
+                found = self._maps[name].get(k)
+                if found is not None:
+                    return found
+        return None
+
+    def keys_of(self, rec: dict) -> list[tuple]:
+        """
+        Every complete key of rec, in find() order, as (name, key) pairs.
+        """
+        out = []
+        for name, cols in self.keys.items():
+            k = self._key(cols, rec)
+            if k is not None:
+                out.append((name, k))
+        return out
+
+    def add(self, row_id: int, rec: dict, replace: bool = True):
+        """
+        Record (or re-record, after an UPDATE) the keys of a row.
+        """
+        with self._lock:
+            self._add(row_id, rec, replace)
+
+    def _add(self, row_id: int, rec: dict, replace: bool):
+        for name, k in self._by_id.pop(row_id, []):
+            if self._maps[name].get(k) == row_id:
+                del self._maps[name][k]
+        entries = []
+        for name, cols in self.keys.items():
+            k = self._key(cols, rec)
+            if k is None:
+                continue
+            m = self._maps[name]
+            if replace or k not in m:
+                m[k] = row_id
+            entries.append((name, k))
+        self._by_id[row_id] = entries
+
+    def __len__(self):
+        return len(self._by_id)
+
+
+class LoadContext:
+    """
+    Per-run state one document type's loader needs: the child-row counters,
+    the natural-key index and the stored source hashes (both None when
+    prefetching is off), and how many documents ended in each status.
+    One context can be shared by several load_all.py workers.
+    """
+
+    def __init__(self, label: str, keys: KeyIndex | None = None, hashes: dict | None = None):
+        self.rate = RowRate(label)
+        self.keys = keys
+        self.hashes = hashes
+        self.status = {"inserted": 0, "updated": 0, "skipped": 0, "invalid": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def prefetch(cls, cur, label: str, key_spec: dict, table: str, id_col: str, log=print):
+        if not PREFETCH_KEYS:
+            return cls(label)
+        keys = KeyIndex(key_spec)
+        n = keys.load(cur, table, id_col)
+        log(f"PREFETCH {table} keys for {n} rows")
+        return cls(label, keys, load_source_hashes(cur, table, id_col))
+
+    def remember(self, row_id: int, rec: dict, source: tuple):
+        """
+        Record a row just inserted/updated, so later documents resolve to it.
+        """
+        if self.keys is not None:
+            self.keys.add(row_id, rec)
+        if self.hashes is not None:
+            self.hashes[row_id] = source
+
+    def tally(self, status: str) -> str:
+        with self._lock:
+            self.status[status] += 1
+        return status
+
+    def summary(self) -> str:
+        return f"documents: {format_counts(self.status)} | {self.rate.summary()}"
+
+
+def add_batch_args(ap):
+    ap.add_argument("--ndjson", help="stream records from this NDJSON shard folder "
+                                     "(export_all_clean_json.py --format ndjson) instead of JSON files")
+    ap.add_argument("--commit-every", type=int, default=COMMIT_EVERY,
+                    help="commit after N documents (default %(default)s)")
+    ap.add_argument("--commit-seconds", type=float, default=COMMIT_SECONDS,
+                    help="commit after M seconds (default %(default)s)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue after the last committed file of a failed run")
+    return ap
+
+
+class Checkpoint:
+    """
+    Last committed input file of a loader run, kept in a small JSON file.
+    Written after each commit and removed when a run completes.
+    """
+
+    def __init__(self, path: str, json_dir: str):
+        self.path = path
+        self.json_dir = os.path.abspath(json_dir)
+
+    def load(self) -> str | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r", encoding="utf-8") as fp:
+            state = json.load(fp)
+        # a checkpoint from another input folder says nothing about this one
+        if state.get("json_dir") != self.json_dir:
+            return None
+        return state.get("last_file")
+
+    def save(self, last_file: str, committed: int):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fp:
+            json.dump({"json_dir": self.json_dir, "last_file": last_file,
+                       "committed": committed, "at": time.strftime("%Y-%m-%d %H:%M:%S")},
+                      fp, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CommitBatcher:
+    """
+    Commits every `every` documents or `seconds` seconds and records the last
+    committed file in a Checkpoint, so a failed run loses at most one batch.
+
+        for fp in batcher.iter_files(files):
+            ...   # load fp; `continue` is fine, an exception leaves fp uncommitted
+
+    A file counts as done once the loop asks for the next one; with resume=True
+    files up to the checkpointed one (in sorted order) are skipped.
+
+    load_all.py workers instead call step(fp) after each file and pass
+    on_commit, which receives the files of every committed batch.
+    """
+
+    def __init__(self, conn, checkpoint: Checkpoint | None = None, every: int = COMMIT_EVERY,
+                 seconds: float = COMMIT_SECONDS, resume: bool = False, log=print,
+                 on_commit=None):
+        self.conn = conn
+        self.checkpoint = checkpoint
+        self.every = max(1, every)
+        self.seconds = seconds
+        self.log = log
+        self.on_commit = on_commit
+        self.resume_after = checkpoint.load() if resume and checkpoint is not None else None
+        self.pending = []
+        self.committed = 0
+        self._since = time.monotonic()
+
+    def iter_files(self, files: list[str]):
+        files = sorted(files)
+        if self.resume_after is not None:
+            before = len(files)
+            files = [f for f in files if os.path.basename(f) > self.resume_after]
+            self.log(f"RESUME after {self.resume_after}: {before - len(files)} files already committed")
+
+        for fp in files:
+            yield fp
+            self.step(fp)
+
+        self.commit()
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def iter_records(self, records):
+        """
+        Like iter_files for a stream of (label, record); the source does the resume skip.
+        """
+        if self.resume_after is not None:
+            self.log(f"RESUME after {self.resume_after}")
+
+        for label, record in records:
+            yield label, record
+            self.step(label)
+
+        self.commit()
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def step(self, fp: str):
+        self.pending.append(fp)
+        self.maybe_commit()
+
+    def maybe_commit(self):
+        if len(self.pending) >= self.every or time.monotonic() - self._since >= self.seconds:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self._since = time.monotonic()
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        self.committed += len(batch)
+        last = os.path.basename(batch[-1])
+        if self.checkpoint is not None:
+            self.checkpoint.save(last, self.committed)
+        if self.on_commit is not None:
+            self.on_commit(batch)
+        self.log(f"COMMIT {len(batch)} docs (total {self.committed}) through {last}")
+
+
+def load_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def input_records(batcher: CommitBatcher, json_dir: str, ndjson: str | None, doc_type: str, log=print):
+    """
+    (name, record) pairs for one loader, committed through batcher: streamed from
+    the doc_type's NDJSON shards when ndjson is given, else one exported JSON file
+    at a time from json_dir.
+    """
+    if ndjson:
+        records = iter_shard_records(ndjson, doc_type, after=batcher.resume_after)
+        return batcher.iter_records(records)
+
+    files = sorted(glob.glob(os.path.join(json_dir, "*.json")))
+    if not files:
+        log(f"No json files found in {json_dir}")
+    return ((os.path.basename(fp), load_json(fp)) for fp in batcher.iter_files(files))
@@ -1,19 +1,79 @@
+"""
+Load every exported JSON (laws, judgments, fatwas) into SQL Server in one pass.
+
+The folder is listed and each file read once; the file is routed by its doc_type
+to one of N worker threads. Every worker has its own connection and commit
+batches, all of them share one natural-key index and source-hash map per
+document type (loaded once up front), so re-runs stay idempotent.
+
+    python load_all.py --workers 4
+    python load_all.py --workers 4 --resume
+
+With --docx the JSON step is skipped: parser processes turn the DOCX files into
+records that stream straight to the same loader workers. Only a bounded number
+of parsed records is in flight, so parsing slows down to the database's pace.
+--json-out additionally writes each record as JSON, for auditing.
+
+    python load_all.py --docx legal_loader --parse-workers 8 --workers 4 [--json-out json_clean_all]
+
+--ndjson streams the records from NDJSON shards instead
+(export_all_clean_json.py --format ndjson), one line at a time.
+
+Threads rather than processes for loading: pyodbc releases the GIL while SQL
+Server works, and the shared key caches need to be visible to every worker.
+"""
 import os
+import sys
+import json
 import glob
+import time
+import queue
+import argparse
+import threading
 import pyodbc
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+# the per-type loaders live in "load files/" (not a package)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "load files"))
 
-from app.parse_judgment import parse_judgment
-from app.parse_fatwa import parse_fatwa
-from app.parse_law import parse_law
+import load_laws_sqlserver as laws
+import load_judgments_sqlserver as judgments
+import load_fatwas_sqlserver as fatwas
+from loader_common import KeyIndex, LoadContext, Checkpoint, CommitBatcher, add_batch_args
+from app.shards import iter_records as iter_shard_records
+from app.docx_text import DocxDocument
+from export_all_clean_json import (
+    PARSER_VERSION, build_record, write_record, out_path_for, doc_type_of,
+)
 
-SERVER = r"MAHOZZ"            
+SERVER = r"MAHOZZ\SQLEXPRESS"
 DATABASE = "model"
+JSON_DIR = r"json_clean_all"
+CHECKPOINT = "loader_all.checkpoint.json"
 
-DATA_DIR = r"./data"
+# per-worker queue length; bounds memory when reading outruns the database
+QUEUE_SIZE = 64
+
+# doc_type -> (load function, child table label, natural keys, table, id column)
+ROUTES = {
+    "law": (laws.load_law, "Law_Article", laws.LAW_KEYS, "dbo.Law", "law_id"),
+    "judgment": (judgments.load_judgment, "Judgment_Principle", judgments.JUDGMENT_KEYS,
+                 "dbo.Judgment", "judgment_id"),
+    "fatwa": (fatwas.load_fatwa, "Fatwa_Principle", fatwas.FATWA_KEYS, "dbo.Fatwa", "fatwa_id"),
+}
+
+
+def log(msg: str):
+    ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    line = f"[{ts}] {msg}"
+    print(line)
+    with open("loader_all.log", "a", encoding="utf-8") as f:
+        f.write(line + "\n")
 
 
 def connect():
-    # جرّبي Driver 18 لو موجود عندك بدل 17
     conn_str = (
         "DRIVER={ODBC Driver 17 for SQL Server};"
         f"SERVER={SERVER};"
@@ -24,120 +84,358 @@ def connect():
     return pyodbc.connect(conn_str)
 
 
-def insert_judgment(cur, j, principles):
-    cur.execute("""
-        INSERT INTO Judgment (
-            court_name, case_type, appeal_number, judicial_year, session_date,
-            technical_office_number, volume_number, page_number, rule_number, reference_number,
-            judicial_panel, facts, reasons
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        j.get("court_name"), j.get("case_type"), j.get(
-            "appeal_number"), j.get("judicial_year"), j.get("session_date"),
-        j.get("technical_office_number"), j.get("volume_number"), j.get(
-            "page_number"), j.get("rule_number"), j.get("reference_number"),
-        j.get("judicial_panel"), j.get("facts"), j.get("reasons")
-    ))
-    judgment_id = cur.execute("SELECT SCOPE_IDENTITY()").fetchval()
-
-    for p in principles:
-        cur.execute("""
-            INSERT INTO Judgment_Principle (judgment_id, principle_number, principle_text)
-            VALUES (?, ?, ?)
-        """, (judgment_id, p.get("principle_number"), p.get("principle_text")))
-
-
-def insert_fatwa(cur, f, principles, citations):
-    cur.execute("""
-        INSERT INTO Fatwa (
-            fatwa_number, fatwa_year, issued_date, session_date,
-            subject, authority, full_text, file_number, facts, application, opinion
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        f.get("fatwa_number"), f.get("fatwa_year"), f.get(
-            "issued_date"), f.get("session_date"),
-        f.get("subject"), f.get("authority"), f.get(
-            "full_text"), f.get("file_number"),
-        f.get("facts"), f.get("application"), f.get("opinion")
-    ))
-    fatwa_id = cur.execute("SELECT SCOPE_IDENTITY()").fetchval()
-
-    # principles + citations
-    principle_id_map = []
-    for p in principles:
-        cur.execute("""
-            INSERT INTO Fatwa_Principle (fatwa_id, principle_number, principle_text)
-            VALUES (?, ?, ?)
-        """, (fatwa_id, p.get("principle_number"), p.get("principle_text")))
-        pid = cur.execute("SELECT SCOPE_IDENTITY()").fetchval()
-        principle_id_map.append(pid)
-
-    # citations: list of {principle_index, law_number, law_year, law_article}
-    for c in citations:
-        idx = c.get("principle_index")
-        if idx is None or idx < 0 or idx >= len(principle_id_map):
-            continue
-        cur.execute("""
-            INSERT INTO Fatwa_Principle_Law (principle_id, law_number, law_year, law_article)
-            VALUES (?, ?, ?, ?)
-        """, (principle_id_map[idx], c.get("law_number"), c.get("law_year"), c.get("law_article")))
-
-
-def insert_law(cur, law, articles):
-    cur.execute("""
-        INSERT INTO Law (law_year, issue_date, publication_date, effective_date, title, gazette_reference)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
-        law.get("law_year"), law.get(
-            "issue_date"), law.get("publication_date"),
-        law.get("effective_date"), law.get(
-            "title"), law.get("gazette_reference")
-    ))
-    law_id = cur.execute("SELECT SCOPE_IDENTITY()").fetchval()
-
-    for a in articles:
-        cur.execute("""
-            INSERT INTO Law_Article (
-                law_id, article_number, article_type, is_repeated,
-                original_text, final_text, final_text_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            law_id, a.get("article_number"), a.get(
-                "article_type"), a.get("is_repeated", 0),
-            a.get("original_text"), a.get(
-                "final_text"), a.get("final_text_date")
-        ))
-
-
-def main():
+class Watermark:
+    """
+    Resume point while workers commit out of order: the last input (in input
+    order) such that it and everything before it are committed. Inputs are
+    registered with add() as they are dispatched, so memory is bounded by what
+    is in flight. Saved to the checkpoint as it advances (at most once a
+    second), so --resume never skips an uncommitted input; at worst it re-loads
+    a few committed ones, which the source-hash check turns into no-ops.
+    """
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.checkpoint = checkpoint
+        self._pending = deque()
+        self._done = set()
+        self._last = None
+        self._count = 0
+        self._saved = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, label: str):
+        with self._lock:
+            self._pending.append(label)
+
+    def committed(self, batch: list[str]):
+        with self._lock:
+            self._done.update(batch)
+            advanced = False
+            while self._pending and self._pending[0] in self._done:
+                self._last = self._pending.popleft()
+                self._done.discard(self._last)
+                self._count += 1
+                advanced = True
+            if advanced and time.monotonic() - self._saved >= 1.0:
+                self._save()
+
+    def flush(self):
+        with self._lock:
+            if self._last is not None:
+                self._save()
+
+    def _save(self):
+        self.checkpoint.save(self._last, self._count)
+        self._saved = time.monotonic()
+
+
+def put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # a blocking put that gives up once a worker has failed
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+# queue item: commit the open batch now (a KeyRouter waits on it)
+FLUSH = "flush"
+
+
+class KeyRouter:
+    """
+    Picks the worker for each document, so two connections never insert one
+    document. Every complete natural key of a routed document is pinned to its
+    worker, and a later document sharing any key with it goes to that same
+    worker. Otherwise two documents that match only through a fallback key (same
+    law_year + title, different issue_date) could both miss the index on two
+    connections and both insert.
+
+    A document can share keys with documents on different workers: C shares k1
+    with A (worker 0) and k2 with B (worker 1). C then goes to the owner of its
+    first shared key. Before that, every other owner is asked to commit (a FLUSH
+    on its queue), and route() waits until the documents holding C's keys there
+    are committed, so C sees them in the index. C's keys then all move to C's
+    worker.
+    """
+
+    def __init__(self, workers: int, queues: list[queue.Queue], stop: threading.Event):
+        self.workers = workers
+        self.queues = queues
+        self.stop = stop
+        self.index = {doc_type: KeyIndex(r[2]) for doc_type, r in ROUTES.items()}
+        self._owner = {}            # (doc_type, key name, key) -> (worker, label of its last document)
+        self._uncommitted = set()   # labels of routed documents with keys, not committed yet
+        self._changed = threading.Condition()
+
+    def route(self, doc_type: str, rec: dict, label: str) -> int:
+        keys = [(doc_type, *k) for k in self.index[doc_type].keys_of(rec)]
+        owners = [self._owner[k] for k in keys if k in self._owner]
+        n = owners[0][0] if owners else hash(keys[0] if keys else label) % self.workers
+        others = {(m, last) for m, last in owners if m != n}
+        if others:
+            for m in {m for m, _ in others}:
+                put(self.queues[m], FLUSH, self.stop)
+            wait_for = {last for _, last in others}
+            with self._changed:
+                while wait_for & self._uncommitted and not self.stop.is_set():
+                    self._changed.wait(timeout=1)
+        if keys:
+            for k in keys:
+                self._owner[k] = (n, label)
+            with self._changed:
+                self._uncommitted.add(label)
+        return n
+
+    def committed(self, batch: list[str]):
+        with self._changed:
+            self._uncommitted.difference_update(batch)
+            self._changed.notify_all()
+
+
+def worker(n: int, q: queue.Queue, contexts: dict, args, watermark: Watermark,
+           router: KeyRouter, stop: threading.Event, errors: list):
+    conn = cur = None
+    try:
+        conn = connect()
+        cur = conn.cursor()
+        batcher = CommitBatcher(conn, None, args.commit_every, args.commit_seconds,
+                                log=lambda m: log(f"[worker {n}] {m}"),
+                                on_commit=lambda batch: (watermark.committed(batch),
+                                                         router.committed(batch)))
+        while not stop.is_set():
+            try:
+                item = q.get(timeout=1)
+            except queue.Empty:
+                batcher.maybe_commit()      # time-based commits while idle
+                continue
+            if item is None:
+                break
+            if item == FLUSH:
+                batcher.commit()
+                continue
+            label, doc_type, data = item
+            name = data.get("source_file") or label
+            contexts[doc_type].tally(ROUTES[doc_type][0](cur, data, contexts[doc_type], name))
+            batcher.step(label)
+        batcher.commit()
+    except Exception as e:
+        # record the failure and stop the dispatcher before anything else can raise
+        errors.append((n, f"{type(e).__name__}: {e}"))
+        stop.set()
+        log(f"[worker {n}] FAILED: {type(e).__name__}: {e}")
+        if conn is not None:
+            try:
+                conn.rollback()
+                log(f"[worker {n}] rolled back its open batch")
+            except Exception as rb:
+                log(f"[worker {n}] rollback failed too: {type(rb).__name__}: {rb}")
+    finally:
+        for handle in (cur, conn):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+
+
+# (sha256, parser_version) pairs already in the database; set in each parser process
+_known_sources = frozenset()
+
+
+def _init_parser(known: frozenset):
+    global _known_sources
+    _known_sources = known
+
+
+def parse_job(job: tuple[str, str | None]) -> tuple[str, str, dict | str | None]:
+    """
+    Parse one DOCX in a parser process -> (path, status, record | error | doc_type).
+    A file whose hash the database already holds for this parser version is
+    not parsed at all ("unchanged").
+    """
+    path, json_out = job
+    try:
+        doc = DocxDocument(path)
+        if (doc.sha256, PARSER_VERSION) in _known_sources:
+            return path, "unchanged", doc_type_of(doc)
+        record = build_record(doc)
+        if json_out:
+            write_record(record, json_out)
+        return path, "parsed", record
+    except Exception as e:
+        return path, "failed", f"{type(e).__name__}: {e}"
+
+
+def json_records(files: list[str], root: str):
+    for fp in files:
+        label = os.path.relpath(fp, root)
+        try:
+            with open(fp, "r", encoding="utf-8") as f:
+                yield label, json.load(f)
+        except ValueError as e:
+            log(f"SKIP unreadable {label}: {e}")
+            yield label, {}
+
+
+def docx_records(files: list[str], args, contexts: dict, watermark: Watermark, failed: list):
+    """
+    Records parsed from DOCX by a process pool, in input order.
+
+    At most `2 * parse_workers` files are submitted ahead of the consumer; when
+    the loader queues are full the consumer blocks, nothing new is submitted
+    and parsing pauses (backpressure).
+    """
+    known = frozenset(
+        src for ctx in contexts.values() if ctx.hashes for src in ctx.hashes.values())
+    parse_workers = max(1, args.parse_workers)
+    ahead = 2 * parse_workers
+    pool = ProcessPoolExecutor(parse_workers, initializer=_init_parser, initargs=(known,))
+    inflight = deque()
+    jobs = iter(files)
+    try:
+        while True:
+            while len(inflight) < ahead:
+                fp = next(jobs, None)
+                if fp is None:
+                    break
+                json_out = out_path_for(fp, args.docx, args.json_out) if args.json_out else None
+                inflight.append(pool.submit(parse_job, (fp, json_out)))
+            if not inflight:
+                return
+
+            fp, status, result = inflight.popleft().result()
+            label = os.path.relpath(fp, args.docx)
+            if status == "parsed":
+                yield label, result
+                continue
+            if status == "failed":
+                failed.append((fp, result))
+                log(f"FAILED parse {label}: {result}")
+            elif result in contexts:
+                contexts[result].tally("skipped")
+            # nothing to load for this file
+            watermark.add(label)
+            watermark.committed([label])
+    finally:
+        for f in inflight:
+            f.cancel()
+        pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load all exported JSON files into SQL Server.")
+    ap.add_argument("--input", default=JSON_DIR, help="folder with exported .json files")
+    ap.add_argument("--docx", help="load straight from this folder of .docx files (recursive) "
+                                   "instead of exported JSON")
+    ap.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1,
+                    help="parser processes with --docx (default %(default)s)")
+    ap.add_argument("--json-out", help="with --docx, also write each record as JSON into this folder")
+    ap.add_argument("--workers", type=int, default=4,
+                    help="parallel database connections (default %(default)s)")
+    args = add_batch_args(ap).parse_args(argv)
+    workers = max(1, args.workers)
+
+    source = args.ndjson or args.docx or args.input
+    if args.ndjson:
+        files = None
+    elif args.docx:
+        files = glob.glob(os.path.join(args.docx, "**", "*.docx"), recursive=True)
+        files = sorted(p for p in files if not os.path.basename(p).startswith("~$"))
+    else:
+        files = sorted(glob.glob(os.path.join(args.input, "*.json")))
+    if files is not None and not files:
+        log(f"No input files found in {source}")
+        return
+
+    checkpoint = Checkpoint(CHECKPOINT, source)
+    last = checkpoint.load() if args.resume else None
+    if last is not None:
+        log(f"RESUME after {last}")
+        if files is not None:
+            # relative paths sort like the full paths (--docx recurses into sub-folders)
+            files = [f for f in files if os.path.relpath(f, source) > last]
+
     conn = connect()
     cur = conn.cursor()
-
-    # judgments
-    for path in glob.glob(os.path.join(DATA_DIR, "judgment*.docx")):
-        j, principles = parse_judgment(path)
-        insert_judgment(cur, j, principles)
-        print("Inserted judgment:", os.path.basename(
-            path), "principles:", len(principles))
-
-    # fatwas
-    for path in glob.glob(os.path.join(DATA_DIR, "fatwa*.docx")):
-        f, principles, citations = parse_fatwa(path)
-        insert_fatwa(cur, f, principles, citations)
-        print("Inserted fatwa:", os.path.basename(path), "principles:",
-              len(principles), "citations:", len(citations))
-
-    # laws (files start with قانون)
-    for path in glob.glob(os.path.join(DATA_DIR, "قانون*.docx")):
-        law, articles = parse_law(path)
-        insert_law(cur, law, articles)
-        print("Inserted law:", os.path.basename(
-            path), "articles:", len(articles))
-
-    conn.commit()
+    contexts = {
+        doc_type: LoadContext.prefetch(cur, label, key_spec, table, id_col, log)
+        for doc_type, (_, label, key_spec, table, id_col) in ROUTES.items()
+    }
     cur.close()
     conn.close()
-    print("DONE")
+
+    watermark = Watermark(checkpoint)
+    stop = threading.Event()
+    errors = []
+    parse_failed = []
+    queues = [queue.Queue(maxsize=QUEUE_SIZE) for _ in range(workers)]
+    router = KeyRouter(workers, queues, stop)
+    threads = [
+        threading.Thread(target=worker,
+                         args=(n, queues[n], contexts, args, watermark, router, stop, errors),
+                         name=f"loader-{n}")
+        for n in range(workers)
+    ]
+    for t in threads:
+        t.start()
+
+    if args.ndjson:
+        records = iter_shard_records(args.ndjson, after=last)
+    elif args.docx:
+        records = docx_records(files, args, contexts, watermark, parse_failed)
+    else:
+        records = json_records(files, args.input)
+
+    t0 = time.perf_counter()
+    unrouted = 0
+    try:
+        for label, data in records:
+            if stop.is_set():
+                break
+            watermark.add(label)
+
+            doc_type = data.get("doc_type")
+            if doc_type not in ROUTES:
+                unrouted += 1
+                watermark.committed([label])
+                continue
+
+            # documents sharing any natural key land on the same worker, so two
+            # connections never race to insert one document
+            n = router.route(doc_type, data.get(doc_type) or {}, label)
+            if not put(queues[n], (label, doc_type, data), stop):
+                break
+    finally:
+        records.close()
+        for q in queues:
+            put(q, None, stop)
+        for t in threads:
+            t.join()
+
+    elapsed = time.perf_counter() - t0
+    for doc_type, ctx in contexts.items():
+        log(f"{doc_type}: {ctx.summary()}")
+    loaded = sum(sum(ctx.status.values()) for ctx in contexts.values())
+    log(f"{loaded} documents in {elapsed:.1f}s ({loaded / elapsed if elapsed else 0:.1f} docs/s, "
+        f"workers={workers}), {unrouted} inputs without a known doc_type")
+
+    for fp, err in parse_failed:
+        log(f"parse failed: {fp}: {err}")
+
+    if errors:
+        watermark.flush()
+        for n, err in errors:
+            log(f"worker {n} failed: {err}")
+        log("FAILED; rerun with --resume to continue")
+        sys.exit(1)
+
+    checkpoint.clear()
+    log("DONE" if not parse_failed else f"DONE with {len(parse_failed)} unparsable files")
+    if parse_failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+import os
+import sys
+from zipfile import ZipFile
+
+import pytest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.join(REPO, "load files"))
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def para(*runs: str) -> str:
+    """
+    One <w:p> with a run per string (Word splits text into several runs).
+    """
+    return "<w:p>" + "".join(f"<w:r><w:t>{r}</w:t></w:r>" for r in runs) + "</w:p>"
+
+
+@pytest.fixture
+def make_docx(tmp_path):
+    """
+    Write a minimal .docx whose <w:body> holds the given XML; returns its path.
+    """
+    def make(body_xml: str, name: str = "doc.docx") -> str:
+        path = str(tmp_path / name)
+        with ZipFile(path, "w") as z:
+            z.writestr("word/document.xml",
+                       f'<?xml version="1.0" encoding="UTF-8"?>'
+                       f'<w:document xmlns:w="{W_NS}"><w:body>{body_xml}</w:body></w:document>')
+        return path
+    return make
@@ -0,0 +1,39 @@
+import pytest
+
+from app.arabic import normalize_ar
+from app.search import tokenize, parse_query
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("إعتبارا", "اعتبارا"),
+    ("النهائى", "النهائي"),
+    ("المحكمة", "المحكمه"),
+    ("آخر أحكام", "اخر احكام"),
+    ("مُحَمَّد", "محمد"),
+    ("قـــانون", "قانون"),
+    ("رقم ١٢٣ و۴۵", "رقم 123 و45"),
+    ("Law No. 5", "law no. 5"),
+    ("", ""),
+    (None, None),
+])
+def test_normalize_ar(text, expected):
+    assert normalize_ar(text) == expected
+
+
+def test_normalize_is_idempotent():
+    text = "إعتبارا من تاريخ النشر بالجريدة الرسمية ١٩٩٠"
+    assert normalize_ar(normalize_ar(text)) == normalize_ar(text)
+
+
+def test_tokenize_folds_and_strips_the_article():
+    assert tokenize("بالمحكمة والقانون للعامل") == ["محكمه", "قانون", "عامل"]
+    # too short to lose its prefix
+    assert tokenize("الله") == ["الله"]
+    assert tokenize("") == []
+    assert tokenize(None) == []
+
+
+def test_parse_query_phrases():
+    terms, phrases = parse_query('الطعن "مبدأ رقم" "النقض"')
+    assert terms == ["طعن", "نقض"]
+    assert phrases == [["مبدا", "رقم"]]
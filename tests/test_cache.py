@@ -0,0 +1,50 @@
+from app.cache import PayloadCache
+
+
+def test_entry_is_served_only_for_its_version():
+    cache = PayloadCache()
+    cache.put(("law", 1), b"\x01", b"body")
+    assert cache.get(("law", 1), b"\x01") == b"body"
+    assert cache.get(("law", 1), b"\x02") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_put_replaces_an_older_version():
+    cache = PayloadCache()
+    cache.put("k", 1, b"old body")
+    cache.put("k", 2, b"new")
+    assert cache.get("k", 2) == b"new"
+    assert cache.stats()["bytes"] == 3
+
+
+def test_evicts_least_recently_used_by_count():
+    cache = PayloadCache(max_items=2)
+    cache.put("a", 1, b"a")
+    cache.put("b", 1, b"b")
+    cache.get("a", 1)
+    cache.put("c", 1, b"c")
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) == b"a"
+    assert cache.get("c", 1) == b"c"
+
+
+def test_evicts_by_bytes_and_skips_oversized_bodies():
+    cache = PayloadCache(max_bytes=10)
+    cache.put("a", 1, b"x" * 6)
+    cache.put("b", 1, b"y" * 6)
+    assert cache.get("a", 1) is None
+    assert cache.stats()["bytes"] == 6
+
+    cache.put("big", 1, b"z" * 11)
+    assert cache.get("big", 1) is None
+    assert cache.get("b", 1) == b"y" * 6
+
+
+def test_invalidate():
+    cache = PayloadCache()
+    cache.put("k", 1, b"body")
+    cache.invalidate("k")
+    cache.invalidate("missing")
+    assert cache.get("k", 1) is None
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import para
+from app.docx_text import DocxDocument, detect_doc_type, docx_paragraphs, iter_docx_paragraphs
+
+
+def text_box(*paragraphs: str) -> str:
+    # a paragraph whose run holds a text box with paragraphs of its own
+    return ("<w:p><w:r><w:t>قبل</w:t></w:r><w:r><w:pict><w:txbxContent>"
+            + "".join(paragraphs) + "</w:txbxContent></w:pict></w:r></w:p>")
+
+
+def table(*cells: str) -> str:
+    return "<w:tbl><w:tr>" + "".join(f"<w:tc>{c}</w:tc>" for c in cells) + "</w:tr></w:tbl>"
+
+
+def test_paragraphs_join_runs_and_skip_empty(make_docx):
+    path = make_docx(para("المادة", " 1") + para() + para("  ") + para("نص ", "المادة"))
+    assert list(iter_docx_paragraphs(path)) == ["المادة 1", "نص المادة"]
+
+
+def test_table_cells_come_in_document_order(make_docx):
+    path = make_docx(para("قبل الجدول") + table(para("خلية 1"), para("خلية 2")) + para("بعد"))
+    assert docx_paragraphs(path) == ["قبل الجدول", "خلية 1", "خلية 2", "بعد"]
+
+
+def test_text_box_paragraphs_follow_their_anchor(make_docx):
+    path = make_docx(para("أول") + text_box(para("داخل 1"), para("داخل 2")) + para("آخر"))
+    # the anchor paragraph's text includes what its text box holds
+    assert docx_paragraphs(path) == ["أول", "قبلداخل 1داخل 2", "داخل 1", "داخل 2", "آخر"]
+
+
+def test_text_box_after_many_paragraphs(make_docx):
+    # the flat pass has already yielded these; the nested pass must not repeat them
+    head = [f"فقرة {i}" for i in range(3000)]
+    path = make_docx("".join(para(p) for p in head) + text_box(para("داخل")) + para("آخر"))
+    assert docx_paragraphs(path) == head + ["قبلداخل", "داخل", "آخر"]
+
+
+def test_document_reads_once_and_hashes_its_bytes(make_docx):
+    path = make_docx(para("جمهورية مصر العربية - قانون - رقم 1 لسنة 2020") + para("المادة 1"))
+    doc = DocxDocument(path)
+    with open(path, "rb") as fp:
+        data = fp.read()
+    assert doc.size == len(data)
+    assert doc.sha256 == DocxDocument("other.docx", data=data).sha256
+    assert doc.first_paragraph == "جمهورية مصر العربية - قانون - رقم 1 لسنة 2020"
+    assert doc.doc_type == "law"
+    # every call starts a fresh stream
+    assert list(doc.paragraphs()) == list(doc.paragraphs()) == docx_paragraphs(path)
+
+
+@pytest.mark.parametrize("first, expected", [
+    ("جمهورية مصر العربية - قانون - رقم 1 لسنة 2020 بشأن محكمة الأسرة", "law"),
+    ("جمهورية مصر العربية - الفتوى رقم 12 لسنة 2018", "fatwa"),
+    ("جمهورية مصر العربية - محكمة النقض - مدني", "judgment"),
+    ("الطعن رقم 17 لسنة 55 ق", "judgment"),
+    ("مذكرة", "unknown"),
+])
+def test_detect_doc_type(first, expected):
+    assert detect_doc_type(first) == expected
@@ -0,0 +1,99 @@
+from datetime import date
+
+import pytest
+
+pytest.importorskip("pyodbc")
+
+from loader_common import ChildTable, KeyIndex, content_hash, key_part, sync_children, INT, NVARCHAR_MAX
+
+FATWA_KEYS = {
+    "number_year": ("fatwa_number", "fatwa_year"),
+    "file_number": ("file_number",),
+}
+
+
+@pytest.mark.parametrize("a, b", [
+    (1784, "1784"),
+    (date(1990, 1, 31), "1990-01-31"),
+    ("Law ", "law"),
+    ("", None),
+    ("  ", None),
+])
+def test_key_part_matches_like_the_collation(a, b):
+    assert key_part(a) == key_part(b)
+
+
+def test_key_index_tries_keys_in_order():
+    keys = KeyIndex(FATWA_KEYS)
+    keys.add(1, {"fatwa_number": 12, "fatwa_year": 2018, "file_number": "86/4/1"})
+    keys.add(2, {"fatwa_number": None, "fatwa_year": 2019, "file_number": "86/4/2"})
+
+    assert keys.find({"fatwa_number": "12", "fatwa_year": "2018"}) == 1
+    assert keys.find({"fatwa_number": 99, "fatwa_year": 2019, "file_number": "86/4/2"}) == 2
+    # a key with a missing part never matches
+    assert keys.find({"fatwa_number": None, "fatwa_year": 2019}) is None
+
+
+def test_key_index_update_drops_old_keys():
+    keys = KeyIndex(FATWA_KEYS)
+    keys.add(1, {"fatwa_number": 12, "fatwa_year": 2018})
+    keys.add(1, {"fatwa_number": 13, "fatwa_year": 2018})
+    assert keys.find({"fatwa_number": 12, "fatwa_year": 2018}) is None
+    assert keys.find({"fatwa_number": 13, "fatwa_year": 2018}) == 1
+
+
+class FakeCursor:
+    """
+    Returns the existing child rows and records every batched statement.
+    """
+
+    def __init__(self, existing: list[tuple]):
+        self.existing = existing
+        self.fast_executemany = False
+        self.batches = {}
+
+    def execute(self, sql, *params):
+        return self
+
+    def fetchall(self):
+        return self.existing
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def executemany(self, sql, rows):
+        self.batches[sql.split()[0]] = rows
+
+
+PRINCIPLES = ChildTable(
+    "dbo.Fatwa_Principle", "principle_id", "fatwa_id",
+    cols=("principle_number", "principle_text"),
+    key=("principle_number",),
+    sizes=[INT, NVARCHAR_MAX],
+)
+
+
+def test_sync_children_touches_only_what_changed():
+    cur = FakeCursor([
+        (10, 1, content_hash((1, "كما هو"))),
+        (11, 2, content_hash((2, "نص قديم"))),
+        (12, 3, content_hash((3, "محذوف"))),
+        (13, 4, None),                        # loaded before content_hash existed
+    ])
+    counts = sync_children(cur, PRINCIPLES, 7, [(1, "كما هو"), (2, "نص جديد"), (4, "بلا hash"),
+                                                (5, "جديد")])
+
+    assert counts == {"inserted": 1, "updated": 2, "deleted": 1, "unchanged": 1}
+    assert cur.batches["DELETE"] == [(12,)]
+    assert [row[-1] for row in cur.batches["UPDATE"]] == [11, 13]
+    assert cur.batches["INSERT"] == [(7, 5, "جديد", content_hash((5, "جديد")))]
+
+
+def test_sync_children_pairs_repeated_keys_in_order():
+    # two rows share a NULL number: matched by occurrence, not collapsed
+    cur = FakeCursor([
+        (20, None, content_hash((None, "أ"))),
+        (21, None, content_hash((None, "ب"))),
+    ])
+    counts = sync_children(cur, PRINCIPLES, 7, [(None, "أ"), (None, "ب"), (None, "ج")])
+    assert counts == {"inserted": 1, "updated": 0, "deleted": 0, "unchanged": 2}
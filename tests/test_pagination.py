@@ -0,0 +1,91 @@
+import base64
+import json
+
+import pytest
+
+from app.pagination import CursorError, encode_cursor, decode_cursor, keyset_query, rank_page
+
+
+def token(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("order, key", [
+    ("id", [None, 42]),
+    ("date", ["1990-01-31", 7]),
+    ("date", [None, 7]),
+    ("rank", [3.25, 9]),
+    ("rank", [0, 9]),
+])
+def test_cursor_round_trip(order, key):
+    assert decode_cursor(encode_cursor(order, key), order) == key
+
+
+def test_cursor_of_another_order_is_refused():
+    with pytest.raises(CursorError):
+        decode_cursor(encode_cursor("id", [None, 42]), "date")
+
+
+@pytest.mark.parametrize("bad", ["", "%%%", "bm90IGpzb24", token([1, 2]), token({"o": "id"})])
+def test_malformed_cursor(bad):
+    with pytest.raises(CursorError):
+        decode_cursor(bad, "id")
+
+
+@pytest.mark.parametrize("order, key", [
+    ("id", [None, "42"]),
+    ("id", [None, True]),
+    ("id", [None, 2 ** 63]),
+    ("id", [5, 42]),
+    ("date", ["31/01/1990", 7]),
+    ("date", ["1990-02-30", 7]),
+    ("date", [19900131, 7]),
+    ("rank", ["3.25", 9]),
+    ("rank", [3.25, 9.0]),
+    ("rank", [[1], 9]),
+    ("id", [None, 42, 1]),
+])
+def test_cursor_key_types_are_checked(order, key):
+    with pytest.raises(CursorError):
+        decode_cursor(token({"o": order, "k": key}), order)
+
+
+def test_non_finite_score_is_refused():
+    # json.dumps writes NaN / Infinity, which json.loads reads back as floats
+    for score in ("NaN", "Infinity"):
+        raw = f'{{"o":"rank","k":[{score},9]}}'.encode("utf-8")
+        tok = base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+        with pytest.raises(CursorError):
+            decode_cursor(tok, "rank")
+
+
+def test_keyset_query_by_id():
+    sql, params = keyset_query("dbo.Law", "law_id", "law_id", "issue_date", "id", [None, 10], 20)
+    assert sql == "SELECT TOP (21) law_id FROM dbo.Law WHERE law_id < ? ORDER BY law_id DESC"
+    assert params == [10]
+
+
+def test_keyset_query_by_date():
+    sql, params = keyset_query("dbo.Law", "law_id", "law_id", "issue_date", "date",
+                               ["2020-01-01", 10], 5)
+    assert "ORDER BY issue_date DESC, law_id DESC" in sql
+    assert params == ["2020-01-01", "2020-01-01", 10]
+
+    # past the last dated row, only NULL dates remain
+    sql, params = keyset_query("dbo.Law", "law_id", "law_id", "issue_date", "date", [None, 10], 5)
+    assert "WHERE issue_date IS NULL AND law_id < ?" in sql
+    assert params == [10]
+
+
+def test_rank_page_walks_every_row_once():
+    ranked = [(9, 2.0), (4, 2.0), (7, 1.5), (8, 1.0), (3, 1.0), (1, 0.5)]
+    seen = []
+    key = None
+    while True:
+        page = rank_page(ranked, key, 2)
+        seen.extend(page[:2])
+        if len(page) <= 2:
+            break
+        doc_id, score = page[1]
+        key = [score, doc_id]
+    assert seen == ranked
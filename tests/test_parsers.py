@@ -0,0 +1,114 @@
+import os
+import json
+
+import pytest
+
+from app.records import to_jsonable
+from app.parse_law import parse_law_paragraphs
+from app.parse_judgment import parse_judgment_paragraphs
+from app.parse_fatwa import parse_fatwa_paragraphs
+from export_all_clean_json import build_record
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = os.path.join(REPO, "legal_loader")
+REFERENCE = os.path.join(REPO, "json_clean_all")
+
+
+def sample_names() -> list[str]:
+    return sorted(
+        n for n in os.listdir(SAMPLES)
+        if n.endswith(".docx") and not n.startswith("~$")
+        and os.path.exists(os.path.join(REFERENCE, os.path.splitext(n)[0] + ".json"))
+    )
+
+
+@pytest.mark.parametrize("name", sample_names())
+def test_sample_exports_as_its_reference_json(name):
+    with open(os.path.join(REFERENCE, os.path.splitext(name)[0] + ".json"), encoding="utf-8") as fp:
+        expected = json.load(fp)
+    record = json.loads(json.dumps(build_record(os.path.join(SAMPLES, name)),
+                                   ensure_ascii=False, default=to_jsonable))
+    # the reference files predate parser_version
+    record.pop("parser_version", None)
+    expected.pop("parser_version", None)
+    assert record == expected
+
+
+def test_law_dates_after_a_greedy_title():
+    law, articles = parse_law_paragraphs([
+        "جمهورية مصر العربية - قانون - رقم 5 لسنة 2020 بشأن تنظيم العمل "
+        "الصادر بتاريخ 2020-03-01 نشر بتاريخ 2020-03-02",
+        "المادة 1",
+        "نص المادة",
+    ])
+    assert law["law_number"] == 5
+    assert law["law_year"] == 2020
+    assert law["issue_date"] == "2020-03-01"
+    assert law["publication_date"] == "2020-03-02"
+    assert law["title"] == "تنظيم العمل الصادر بتاريخ 2020-03-01 نشر بتاريخ 2020-03-02"
+    assert [(a["article_number"], a["final_text"]) for a in articles] == [("1", "نص المادة")]
+
+
+def test_law_effective_date():
+    law, _ = parse_law_paragraphs([
+        "جمهورية مصر العربية - قانون - رقم 7 لسنة 2019 بشأن تعديل بعض الأحكام "
+        "يعمل به إعتبارا من 2019-07-01",
+        "المادة 1",
+        "نص المادة",
+    ])
+    assert law["issue_date"] is None
+    assert law["effective_date"] == "2019-07-01"
+
+
+def test_law_field_first_seen_inside_the_title():
+    # every field takes its first occurrence, even when that is inside the title
+    law, _ = parse_law_paragraphs([
+        "جمهورية مصر العربية - قانون - رقم 9 لسنة 2021 بشأن ما نشر بتاريخ 2020-01-01 "
+        "الصادر بتاريخ 2021-02-01 نشر بتاريخ 2021-02-03",
+        "المادة 1",
+        "نص المادة",
+    ])
+    assert law["issue_date"] == "2021-02-01"
+    assert law["publication_date"] == "2020-01-01"
+
+
+def test_fatwa_header():
+    fatwa, principles = parse_fatwa_paragraphs([
+        "جمهورية مصر العربية - الفتوى رقم 12 لسنة 2018 تاريخ الجلسة 2018-05-02 "
+        "بتاريخ 2018-06-01 رقم الملف 86/4/1",
+        "الرأى",
+        "نص الرأي",
+    ])
+    assert (fatwa["fatwa_number"], fatwa["fatwa_year"]) == (12, 2018)
+    assert fatwa["issued_date"] == "2018-06-01"
+    assert fatwa["session_date"] == "2018-05-02"
+    assert fatwa["file_number"] == "86/4/1"
+    assert fatwa["opinion"] == "نص الرأي"
+    assert principles == []
+
+
+def test_judgment_header_over_several_paragraphs():
+    judgment, _ = parse_judgment_paragraphs([
+        "جمهورية مصر العربية - محكمة النقض - مدني",
+        "تاريخ الجلسة: 3 / 4 / 1990",
+        "الطعن رقم 17 لسنة 55 ق",
+        "الرقم المرجعي: 123",
+        "الوقائع",
+        "نص",
+    ])
+    assert (judgment["court_name"], judgment["case_type"]) == ("محكمة النقض", "مدني")
+    assert (judgment["appeal_number"], judgment["judicial_year"]) == (17, 55)
+    assert judgment["session_date"] == "1990-04-03"
+    assert judgment["reference_number"] == "123"
+    assert judgment["facts"] == "نص"
+
+
+def test_long_sections_keep_every_paragraph():
+    body = [f"فقرة {i}" for i in range(2000)]
+    fatwa, principles = parse_fatwa_paragraphs([
+        "جمهورية مصر العربية - الفتوى رقم 1 لسنة 2020 بتاريخ 2020-01-27",
+        "مبدأ 1", *body,
+        "الرأى", *body,
+    ])
+    assert principles[0]["principle_text"] == " ".join(body)
+    assert fatwa["opinion"] == " ".join(body)
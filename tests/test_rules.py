@@ -0,0 +1,52 @@
+import pytest
+
+from app.rules import HeaderRules, as_int, as_str, date_any
+from app.parse_law import LAW_HEADER
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("صدر في 2020-03-01", "2020-03-01"),
+    ("31/1/1990", "1990-01-31"),
+    ("5-6-2001", "2001-06-05"),
+    ("31/1-1990", None),
+    ("", None),
+    (None, None),
+])
+def test_date_any(text, expected):
+    assert date_any(text) == expected
+
+
+def test_extract_converts_and_fills_missing_fields():
+    rules = HeaderRules(
+        appeal_number=(r"الطعن\s+رقم\s+(\d+)", as_int),
+        court=(r"(محكمة\s+\S+)", as_str),
+        session_date=(r"تاريخ\s+الجلسة\s+([0-9/]+)", date_any),
+    )
+    out = rules.extract("محكمة النقض - الطعن رقم 17 لسنة 55 ق")
+    assert out == {"appeal_number": 17, "court": "محكمة النقض", "session_date": None}
+
+
+def test_rule_needs_one_capture_group():
+    with pytest.raises(ValueError):
+        HeaderRules(number=(r"\d+", as_int))
+    with pytest.raises(ValueError):
+        HeaderRules(number=(r"(\d+)-(\d+)", as_int))
+
+
+def test_fields_match_independently():
+    # a field takes its first match, even inside text another field also matches
+    rules = HeaderRules(
+        title=(r"بشأن\s+(.+)", as_str),
+        published=(r"نشر\s+بتاريخ\s+(\d{4}-\d{2}-\d{2})", date_any),
+    )
+    out = rules.extract("بشأن ما نشر بتاريخ 2020-01-01 نشر بتاريخ 2021-02-03")
+    assert out["title"] == "ما نشر بتاريخ 2020-01-01 نشر بتاريخ 2021-02-03"
+    assert out["published"] == "2020-01-01"
+
+
+def test_law_header_dates_after_a_greedy_title():
+    out = LAW_HEADER.extract("جمهورية مصر العربية - قانون - رقم 5 لسنة 2020 بشأن تنظيم العمل "
+                             "الصادر بتاريخ 2020-03-01 نشر بتاريخ 2020-03-02")
+    assert out["law_year"] == 2020
+    assert out["issue_date"] == "2020-03-01"
+    assert out["publication_date"] == "2020-03-02"
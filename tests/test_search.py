@@ -0,0 +1,83 @@
+from app.search import SearchIndex, refresh_index
+
+
+def test_search_ranks_and_requires_phrases():
+    index = SearchIndex()
+    index.add(1, "الطعن بالنقض في الحكم", None)
+    index.add(2, "مبدأ رقم واحد", "الطعن")
+    index.add(3, "رقم مبدأ", None)
+
+    assert {doc_id for doc_id, _ in index.search("الطعن")} == {1, 2}
+    assert [doc_id for doc_id, _ in index.search('"مبدأ رقم"')] == [2]
+    assert index.search('"مبدأ رقم" النقض') == index.search('"مبدأ رقم"')
+    assert index.search("غير موجود") == []
+
+
+def test_phrase_never_spans_two_fields():
+    index = SearchIndex()
+    index.add(1, "مبدأ", "رقم")
+    assert index.search('"مبدأ رقم"') == []
+
+
+def test_add_replaces_and_remove_drops():
+    index = SearchIndex()
+    index.add(1, "قانون العمل")
+    version = index.version
+    index.add(1, "قانون الضرائب")
+    assert index.version > version
+    assert index.search("العمل") == []
+    assert [doc_id for doc_id, _ in index.search("الضرائب")] == [1]
+
+    index.remove(1)
+    index.remove(1)
+    assert len(index) == 0
+    assert index.stats()["terms"] == 0
+
+
+class FakeCursor:
+    """
+    Serves the queries refresh_index runs against rows {id: (row_version, text)}.
+    """
+
+    def __init__(self, rows: dict, min_active: int):
+        self.rows = rows
+        self.min_active = min_active
+        self._result = []
+
+    def execute(self, sql, *params):
+        if "MIN_ACTIVE_ROWVERSION" in sql:
+            self._result = [(self.min_active.to_bytes(8, "big"),)]
+        elif "row_version" in sql:
+            low, high = (int.from_bytes(p, "big") for p in params)
+            self._result = [(i, None, text, None, None) for i, (rv, text) in self.rows.items()
+                            if low <= rv < high]
+        else:
+            self._result = [(i,) for i in self.rows]
+        return self
+
+    def fetchone(self):
+        return self._result.pop(0)
+
+    def fetchmany(self, n):
+        out, self._result = self._result[:n], self._result[n:]
+        return out
+
+
+def test_refresh_index_reindexes_changes_and_drops_deleted_rows():
+    index = SearchIndex()
+    index.add(1, None, "قانون العمل")
+    index.add(2, None, "قانون الضرائب")
+    index.high_water = (10).to_bytes(8, "big")
+
+    # row 1 changed, row 2 deleted, row 3 new, row 4 written by a still-open transaction
+    cur = FakeCursor({1: (11, "قانون التأمينات"), 3: (12, "حكم النقض"), 4: (20, "فتوى")},
+                     min_active=15)
+    assert refresh_index(cur, "fatwas", index) == 2
+    assert index.ids() == {1, 3}
+    assert index.search("العمل") == []
+    assert [doc_id for doc_id, _ in index.search("التأمينات")] == [1]
+
+    # the next refresh continues where this one stopped
+    cur.min_active = 30
+    assert refresh_index(cur, "fatwas", index) == 1
+    assert index.ids() == {1, 3, 4}
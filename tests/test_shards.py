@@ -0,0 +1,79 @@
+import os
+import json
+
+import pytest
+
+from app.shards import INDEX_NAME, STAGING_NAME, ShardWriter, shard_files, iter_records
+
+
+def records(doc_type: str, n: int) -> list[dict]:
+    return [{"doc_type": doc_type, "source_file": f"{doc_type}{i}.docx", "text": "نص " * 20}
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_rollover_and_read_back(tmp_path, compress):
+    out = str(tmp_path / "shards")
+    written = records("law", 10) + records("fatwa", 3)
+    with ShardWriter(out, max_bytes=500, compress=compress) as w:
+        for rec in written:
+            w.write(rec)
+
+    with open(os.path.join(out, INDEX_NAME), encoding="utf-8") as fp:
+        index = json.load(fp)
+    assert index["records"] == 13
+    law_shards = [s for s in index["shards"] if s["doc_type"] == "law"]
+    assert len(law_shards) > 1
+    assert all(s["bytes"] <= 500 or s["records"] == 1 for s in index["shards"])
+    assert not os.path.exists(os.path.join(out, STAGING_NAME))
+
+    assert [r for _, r in iter_records(out, "law")] == written[:10]
+    assert [r for _, r in iter_records(out)] == written[10:] + written[:10]
+
+
+def test_resume_after_a_label(tmp_path):
+    out = str(tmp_path / "shards")
+    with ShardWriter(out, max_bytes=500) as w:
+        for rec in records("law", 10):
+            w.write(rec)
+    labels = [label for label, _ in iter_records(out)]
+    assert labels == sorted(labels)
+    rest = [r["source_file"] for _, r in iter_records(out, after=labels[3])]
+    assert rest == [f"law{i}.docx" for i in range(4, 10)]
+
+
+def test_close_replaces_the_previous_set(tmp_path):
+    out = str(tmp_path / "shards")
+    with ShardWriter(out, max_bytes=200) as w:
+        for rec in records("law", 10):
+            w.write(rec)
+    with ShardWriter(out) as w:
+        for rec in records("judgment", 2):
+            w.write(rec)
+    assert sorted(os.listdir(out)) == [INDEX_NAME, "judgment-00001.ndjson"]
+    assert [r["doc_type"] for _, r in iter_records(out)] == ["judgment", "judgment"]
+
+
+def test_failed_run_keeps_the_previous_set(tmp_path):
+    out = str(tmp_path / "shards")
+    with ShardWriter(out) as w:
+        for rec in records("law", 2):
+            w.write(rec)
+    before = sorted(os.listdir(out))
+
+    with pytest.raises(RuntimeError):
+        with ShardWriter(out) as w:
+            w.write(records("fatwa", 1)[0])
+            raise RuntimeError("parser failed")
+    assert sorted(os.listdir(out)) == before
+    assert [r["doc_type"] for _, r in iter_records(out)] == ["law", "law"]
+
+
+def test_folder_without_index_is_refused(tmp_path):
+    out = tmp_path / "shards"
+    out.mkdir()
+    (out / "law-00001.ndjson").write_text('{"doc_type":"law"}\n', encoding="utf-8")
+    with pytest.raises(FileNotFoundError):
+        shard_files(str(out))
+    # a single shard file is still read directly
+    assert shard_files(str(out / "law-00001.ndjson")) == [str(out / "law-00001.ndjson")]